@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Compare the full and compact LLM output schemas.
+
+    python benchmark_output_schema.py offline   # re-encode saved LLM outputs
+    python benchmark_output_schema.py live --runs 3 --limit 5
+
+``offline`` re-encodes the JSON files in LLM_OUTPUT_DIR in both wire formats,
+checks that the compact form expands back to the same transactions and
+compares estimated output tokens; it makes no API calls. ``live`` sends the
+extracted texts in OUTPUT_DIR/texts to the configured provider once per
+schema and run, and compares latency, output tokens (estimated from the
+response JSON) and transaction counts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import statistics
+import time
+from pathlib import Path
+
+from config import app_settings
+from infrastructure.llm import LLMFactory, PromptManager
+from infrastructure.llm.pydantic_models.transactions import (
+    CompactTransactionHistory,
+    StatementOutput,
+    TransactionEntry,
+    TransactionHistory,
+    expand_output,
+)
+from services.text_compactor import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+FORMATS: dict[str, type[StatementOutput]] = {
+    "full": TransactionHistory,
+    "compact": CompactTransactionHistory,
+}
+
+
+def load_history(path: Path) -> TransactionHistory:
+    """Read an output file back into a ``TransactionHistory``."""
+    with open(path, encoding="utf-8") as f:
+        output = json.load(f)
+    return TransactionHistory(
+        transactions=[
+            TransactionEntry(
+                **{k: v for k, v in item.items() if k != "receiver"},
+                receiver_name=item.get("receiver"),
+            )
+            for item in output.get("transactions", [])
+        ]
+    )
+
+
+def run_offline(output_dir: Path) -> None:
+    """Compare estimated output tokens of saved outputs in both formats."""
+    totals = {"full": 0, "compact": 0}
+    for path in sorted(output_dir.glob("*.json")):
+        try:
+            history = load_history(path)
+        except Exception as e:
+            logger.warning(f"⚠️  Skipping {path.name}: {e}")
+            continue
+        compact = CompactTransactionHistory.from_history(history)
+        if compact.expand() != history:
+            raise AssertionError(f"Compact form of {path.name} is not lossless")
+
+        full_tokens = estimate_tokens(history.model_dump_json())
+        compact_tokens = estimate_tokens(compact.model_dump_json())
+        totals["full"] += full_tokens
+        totals["compact"] += compact_tokens
+        logger.info(
+            f"  {path.name}: {len(history.transactions)} transactions, "
+            f"~{full_tokens} -> ~{compact_tokens} tokens"
+        )
+
+    if totals["full"]:
+        logger.info(
+            f"📊 Output tokens: ~{totals['full']} -> ~{totals['compact']} "
+            f"(-{1 - totals['compact'] / totals['full']:.0%}), round trip lossless"
+        )
+    else:
+        logger.warning(f"⚠️  No outputs found in {output_dir}")
+
+
+def run_live(texts_dir: Path, runs: int, limit: int | None) -> None:
+    """Time real requests with both formats on the extracted texts."""
+    provider = LLMFactory.create_provider(
+        base_url=app_settings.llm_base_url,
+        provider_type=app_settings.llm_provider,
+        api_key=app_settings.llm_api_key,
+        model=app_settings.llm_model,
+        temperature=app_settings.llm_temperature,
+    )
+    system_prompt = PromptManager().get_prompt(app_settings.llm_prompt_id)
+    paths = sorted(texts_dir.glob("*.txt"))[:limit]
+    if not paths:
+        logger.warning(f"⚠️  No texts found in {texts_dir}")
+        return
+
+    latencies: dict[str, list[float]] = {name: [] for name in FORMATS}
+    tokens: dict[str, list[int]] = {name: [] for name in FORMATS}
+    for path in paths:
+        prompt = provider.create_prompt(system_prompt, path.read_text(encoding="utf-8"))
+        for run in range(runs):
+            # Alternate the order so neither format always runs on a warm cache
+            order = list(FORMATS) if run % 2 == 0 else list(reversed(FORMATS))
+            counts = {}
+            for name in order:
+                began = time.perf_counter()
+                response = provider._send_prompt_with_tracing(
+                    prompt, f"benchmark_{name}_{path.name}", FORMATS[name]
+                )
+                latencies[name].append(time.perf_counter() - began)
+                tokens[name].append(estimate_tokens(response.model_dump_json()))
+                counts[name] = len(expand_output(response).transactions)
+            logger.info(
+                f"  {path.name} run {run + 1}: "
+                + ", ".join(
+                    f"{name} {latencies[name][-1]:.1f}s/{counts[name]} tx"
+                    for name in FORMATS
+                )
+            )
+
+    for name in FORMATS:
+        logger.info(
+            f"📊 {name}: median {statistics.median(latencies[name]):.1f}s, "
+            f"~{sum(tokens[name])} output tokens over {len(tokens[name])} requests"
+        )
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=getattr(logging, app_settings.log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+    offline = subparsers.add_parser("offline", help="re-encode saved LLM outputs")
+    offline.add_argument("--dir", type=Path, default=Path(app_settings.llm_output_dir))
+    live = subparsers.add_parser("live", help="time requests with both schemas")
+    live.add_argument(
+        "--dir", type=Path, default=Path(app_settings.output_dir) / "texts"
+    )
+    live.add_argument("--runs", type=int, default=3)
+    live.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.mode == "offline":
+        run_offline(args.dir)
+    else:
+        run_live(args.dir, args.runs, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,39 @@ from __future__ import annotations
 
 from typing import Literal
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
+class LLMRouteSettings(BaseModel):
+    """One backend of the multi-provider LLM router."""
+
+    name: str | None = None
+    provider_type: Literal["openai", "gemini"]
+    api_key: str
+    base_url: str | None = None
+    model: str | None = None
+    temperature: float = 0.0
+    max_input_chars: int | None = None  # None = no upper bound
+    allow_tables: bool = True
+    timeout: float | None = None
+    max_retries: int = 2
+
+
+class TenantSettings(BaseModel):
+    """One (Drive account, folder) pair of the multi-tenant scheduler."""
+
+    name: str
+    gdrive_auth_mode: Literal["oauth", "service_account"] = "oauth"
+    gdrive_credentials: str
+    gdrive_token: str
+    gdrive_sa_key: str | None = None
+    target_folder_name: str
+    weight: float = 1.0  # share of the workers while other tenants have work
+    max_concurrency: int | None = None
+    rate_per_minute: float | None = None  # files started per minute
+
+
 class AppSettings(BaseSettings):
     """Enhanced application settings with environment variable support."""
 
@@ -16,15 +45,57 @@ class AppSettings(BaseSettings):
     gdrive_credentials: str = Field(validation_alias="GDRIVE_CREDENTIALS")
     gdrive_token: str = Field(validation_alias="GDRIVE_TOKEN")
     gdrive_sa_key: str | None = Field(None, validation_alias="GDRIVE_SA_KEY")
+    # Byte-range downloads: parallel connections for files of at least N MB
+    drive_download_workers: int = Field(4, validation_alias="DRIVE_DOWNLOAD_WORKERS")
+    drive_parallel_download_mb: int = Field(
+        8, validation_alias="DRIVE_PARALLEL_DOWNLOAD_MB"
+    )
 
     # Target folder settings
     target_folder_name: str = Field(validation_alias="TARGET_FOLDER_NAME")
 
     # PDF processing settings
-    pdf_engine: Literal["pymupdf", "pdfminer", "docling"] = Field(
+    pdf_engine: Literal["pymupdf", "pdfminer", "docling", "cascade", "ocr"] = Field(
         validation_alias="PDF_ENGINE"
     )
     pdf_password: str | None = Field(None, validation_alias="PDF_PASSWORD")
+    pymupdf_mode: Literal["text", "table"] = Field(
+        "text", validation_alias="PYMUPDF_MODE"
+    )
+
+    # OCR of scanned PDFs (Docling in-process, or EasyOCR on a process pool)
+    ocr_mode: Literal["docling", "process_pool"] = Field(
+        "docling", validation_alias="OCR_MODE"
+    )
+    ocr_dpi: int = Field(200, validation_alias="OCR_DPI")
+    ocr_workers: int | None = Field(None, validation_alias="OCR_WORKERS")
+    ocr_languages: str = Field("vi,en", validation_alias="OCR_LANGUAGES")
+    ocr_cache_dir: str | None = Field(None, validation_alias="OCR_CACHE_DIR")
+
+    # Extraction cache (keyed by PDF hash + extractor fingerprint)
+    extraction_cache_dir: str | None = Field(
+        None, validation_alias="EXTRACTION_CACHE_DIR"
+    )
+    extraction_cache_compress: bool = Field(
+        False, validation_alias="EXTRACTION_CACHE_COMPRESS"
+    )
+    extraction_cache_max_mb: int | None = Field(
+        None, validation_alias="EXTRACTION_CACHE_MAX_MB"
+    )
+
+    # Rule-based layout parser for known banks (replaces text extraction and
+    # the LLM when the running balance reconciles; categories by sign only)
+    layout_parser: bool = Field(False, validation_alias="LAYOUT_PARSER")
+    layout_parser_min_confidence: float = Field(
+        0.95, validation_alias="LAYOUT_PARSER_MIN_CONFIDENCE"
+    )
+    layout_parser_min_rows: int = Field(3, validation_alias="LAYOUT_PARSER_MIN_ROWS")
+
+    # Text compaction before the LLM
+    text_compaction: bool = Field(False, validation_alias="TEXT_COMPACTION")
+    text_compaction_tables: bool = Field(
+        False, validation_alias="TEXT_COMPACTION_TABLES"
+    )
 
     # Output settings
     output_dir: str = Field(validation_alias="OUTPUT_DIR")
@@ -32,6 +103,21 @@ class AppSettings(BaseSettings):
         None, validation_alias="MAX_FILES"
     )  # None = process all
 
+    # Memory budget: admit files only while RSS plus in-flight estimates fit
+    memory_budget_mb: int | None = Field(None, validation_alias="MEMORY_BUDGET_MB")
+    memory_pdf_factor: float = Field(20.0, validation_alias="MEMORY_PDF_FACTOR")
+
+    # Process copies of the same PDF (same Drive MD5 and size) only once
+    content_dedup: bool = Field(True, validation_alias="CONTENT_DEDUP")
+
+    # Cross-statement transaction deduplication
+    dedup_index: bool = Field(False, validation_alias="DEDUP_INDEX")
+    dedup_index_path: str | None = Field(None, validation_alias="DEDUP_INDEX_PATH")
+
+    # Incremental monthly aggregates
+    aggregates: bool = Field(True, validation_alias="AGGREGATES")
+    aggregates_path: str | None = Field(None, validation_alias="AGGREGATES_PATH")
+
     # Logging settings
     log_level: str = Field(validation_alias="LOG_LEVEL")
 
@@ -44,6 +130,68 @@ class AppSettings(BaseSettings):
     llm_output_dir: str = Field(validation_alias="LLM_OUTPUT_DIR")
     llm_prompt_id: str = Field(validation_alias="LLM_PROMPT_ID")
 
+    # LLM concurrency / retry settings
+    llm_max_concurrency: int = Field(16, validation_alias="LLM_MAX_CONCURRENCY")
+    llm_initial_concurrency: int = Field(2, validation_alias="LLM_INITIAL_CONCURRENCY")
+    llm_max_retries: int = Field(5, validation_alias="LLM_MAX_RETRIES")
+    llm_request_timeout: float | None = Field(
+        120.0, validation_alias="LLM_REQUEST_TIMEOUT"
+    )
+    llm_target_latency: float | None = Field(
+        None, validation_alias="LLM_TARGET_LATENCY"
+    )
+    llm_hedge_requests: bool = Field(False, validation_alias="LLM_HEDGE_REQUESTS")
+    llm_streaming: bool = Field(False, validation_alias="LLM_STREAMING")
+    llm_compact_output: bool = Field(False, validation_alias="LLM_COMPACT_OUTPUT")
+    llm_max_rejected_ratio: float = Field(
+        0.0, validation_alias="LLM_MAX_REJECTED_RATIO"
+    )
+
+    # Pack small statements into shared requests (needs PIPELINE_WORKERS > 1)
+    llm_packing: bool = Field(False, validation_alias="LLM_PACKING")
+    llm_pack_max_tokens: int = Field(6000, validation_alias="LLM_PACK_MAX_TOKENS")
+    llm_pack_max_doc_tokens: int = Field(
+        1500, validation_alias="LLM_PACK_MAX_DOC_TOKENS"
+    )
+    llm_pack_max_documents: int = Field(8, validation_alias="LLM_PACK_MAX_DOCUMENTS")
+    llm_pack_max_wait: float = Field(2.0, validation_alias="LLM_PACK_MAX_WAIT")
+
+    # Multi-provider routing (JSON list); overrides the single provider above
+    llm_routes: list[LLMRouteSettings] | None = Field(
+        None, validation_alias="LLM_ROUTES"
+    )
+
+    # Pipeline settings
+    pipeline_workers: int = Field(1, validation_alias="PIPELINE_WORKERS")
+
+    # Multi-tenant settings: JSON file with a list of TenantSettings
+    tenants_file: str | None = Field(None, validation_alias="TENANTS_FILE")
+    tenant_workers: int = Field(4, validation_alias="TENANT_WORKERS")
+
+    # Distributed work queue settings
+    work_queue_path: str | None = Field(None, validation_alias="WORK_QUEUE_PATH")
+    work_queue_lease_seconds: float = Field(
+        300.0, validation_alias="WORK_QUEUE_LEASE_SECONDS"
+    )
+    work_queue_max_attempts: int = Field(3, validation_alias="WORK_QUEUE_MAX_ATTEMPTS")
+
+    # Watch daemon settings
+    watch_interval: float = Field(30.0, validation_alias="WATCH_INTERVAL")
+    watch_use_changes_feed: bool = Field(
+        False, validation_alias="WATCH_USE_CHANGES_FEED"
+    )
+    watch_state_path: str | None = Field(None, validation_alias="WATCH_STATE_PATH")
+    watch_max_attempts: int = Field(3, validation_alias="WATCH_MAX_ATTEMPTS")
+
+    # HTTP ingestion service settings
+    server_host: str = Field("127.0.0.1", validation_alias="SERVER_HOST")
+    server_port: int = Field(8080, validation_alias="SERVER_PORT")
+    server_workers: int = Field(4, validation_alias="SERVER_WORKERS")
+    server_max_queue: int = Field(16, validation_alias="SERVER_MAX_QUEUE")
+    server_sync_timeout: float = Field(120.0, validation_alias="SERVER_SYNC_TIMEOUT")
+    server_max_upload_mb: int = Field(20, validation_alias="SERVER_MAX_UPLOAD_MB")
+    server_job_ttl: float = Field(3600.0, validation_alias="SERVER_JOB_TTL")
+
     # Langfuse settings
     langfuse_secret_key: str | None = Field(
         None, validation_alias="LANGFUSE_SECRET_KEY"
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Detect recurring charges across all saved LLM outputs.
+
+    python detect_subscriptions.py                      # LLM_OUTPUT_DIR
+    python detect_subscriptions.py --json subscriptions.json --as-of 2024-12-31
+
+Groups spending by normalized receiver and currency and reports the charges
+that recur at a weekly to yearly cadence with a stable amount, their price
+changes, and which are new or no longer charged. ``labeled`` is the share of
+a charge's transactions the LLM tagged with a ``service_subscription``.
+"""
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+
+from config import app_settings
+from services.subscription_detector import SubscriptionDetector, TransactionColumns
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=getattr(logging, app_settings.log_level.upper()),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", type=Path, default=Path(app_settings.llm_output_dir))
+    parser.add_argument(
+        "--as-of",
+        type=date.fromisoformat,
+        default=None,
+        help="day to evaluate new and active charges at (default last transaction)",
+    )
+    parser.add_argument("--min-occurrences", type=int, default=3)
+    parser.add_argument(
+        "--amount-tolerance",
+        type=float,
+        default=0.05,
+        help="relative amount change still counted as the same price",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="write the report")
+    args = parser.parse_args()
+
+    began = time.perf_counter()
+    columns = TransactionColumns.from_directory(args.dir)
+    loaded = time.perf_counter()
+    detector = SubscriptionDetector(
+        min_occurrences=args.min_occurrences,
+        amount_tolerance=args.amount_tolerance,
+    )
+    charges = detector.detect(columns, as_of=args.as_of)
+    logger.info(
+        f"🔁 {len(charges)} recurring charges in {len(columns)} transactions "
+        f"(load {loaded - began:.1f}s, detect {time.perf_counter() - loaded:.2f}s)"
+    )
+
+    for charge in charges:
+        flags = (" 🆕 new" if charge.is_new else "") + (
+            "" if charge.active else " ⏹️  stopped"
+        )
+        logger.info(
+            f"  {charge.receiver} [{charge.currency}]: {charge.amount:,.2f} "
+            f"{charge.cadence} x{charge.occurrences} "
+            f"{charge.first_date}..{charge.last_date}, "
+            f"labeled {charge.labeled_share:.0%}{flags}"
+        )
+        for change in charge.price_changes:
+            logger.info(
+                f"    💲 {change.date}: {change.old_amount:,.2f} -> "
+                f"{change.new_amount:,.2f}"
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                [asdict(charge) for charge in charges],
+                f,
+                ensure_ascii=False,
+                indent=2,
+                default=str,
+            )
+        logger.info(f"💾 Report saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import abc
 from collections.abc import Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Protocol
 
@@ -13,6 +13,9 @@ class DriveFile:
     name: str
     mime_type: str
     size: int | None = None
+    parents: list[str] = field(default_factory=list)
+    trashed: bool = False
+    md5_checksum: str | None = None
 
 
 class DriveGateway(Protocol):
@@ -24,3 +27,9 @@ class DriveGateway(Protocol):
 
     @abc.abstractmethod
     def list_files(self, query: str) -> Iterable[DriveFile]: ...
+
+    @abc.abstractmethod
+    def get_start_page_token(self) -> str: ...
+
+    @abc.abstractmethod
+    def list_changes(self, page_token: str) -> tuple[list[DriveFile], str]: ...
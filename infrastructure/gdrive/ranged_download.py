@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# fetch_range(start, end) returns the bytes of [start, end)
+RangeFetcher = Callable[[int, int], bytes]
+
+
+class DownloadError(Exception):
+    """Raised when a file cannot be downloaded completely."""
+
+    pass
+
+
+class ChecksumMismatchError(DownloadError):
+    """Raised when the downloaded bytes do not match the expected MD5."""
+
+    pass
+
+
+def _merge(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class _RangeAllocator:
+    """Hands out the missing byte ranges of a file and tracks completed ones."""
+
+    def __init__(self, size: int, done: list[tuple[int, int]]) -> None:
+        self.done = _merge(done)
+        self._gaps: list[tuple[int, int]] = []
+        cursor = 0
+        for start, end in self.done:
+            if start > cursor:
+                self._gaps.append((cursor, start))
+            cursor = end
+        if cursor < size:
+            self._gaps.append((cursor, size))
+        self._lock = threading.Lock()
+
+    @property
+    def missing(self) -> int:
+        with self._lock:
+            return sum(end - start for start, end in self._gaps)
+
+    def take(self, length: int) -> tuple[int, int] | None:
+        with self._lock:
+            if not self._gaps:
+                return None
+            start, end = self._gaps[0]
+            stop = min(end, start + length)
+            if stop == end:
+                self._gaps.pop(0)
+            else:
+                self._gaps[0] = (stop, end)
+            return start, stop
+
+    def release(self, start: int, end: int) -> None:
+        with self._lock:
+            self._gaps = _merge([*self._gaps, (start, end)])
+
+    def complete(self, start: int, end: int) -> list[tuple[int, int]]:
+        with self._lock:
+            self.done = _merge([*self.done, (start, end)])
+            return list(self.done)
+
+
+class RangedDownloader:
+    """Download a file of known size as byte ranges, in parallel and resumable.
+
+    Bytes are written into ``<output>.part``, preallocated to the full size,
+    and the completed ranges are recorded in ``<output>.part.json`` after
+    every chunk, so a failed download resumes with only the missing ranges
+    (as long as the size and MD5 are unchanged). Files of at least
+    ``parallel_threshold`` bytes are fetched by ``workers`` threads at once.
+
+    Each worker sizes its next chunk to take about ``target_seconds`` at the
+    throughput of its last one, between ``min_chunk`` and ``max_chunk``, so
+    fast links use few large requests and slow ones keep progress granular.
+    A failing chunk is retried ``max_retries`` times with exponential
+    backoff. The finished file is checked against ``md5_checksum`` before it
+    is moved into place.
+    """
+
+    def __init__(
+        self,
+        fetch_range: RangeFetcher,
+        *,
+        workers: int = 4,
+        parallel_threshold: int = 8 * 1024 * 1024,
+        min_chunk: int = 256 * 1024,
+        max_chunk: int = 16 * 1024 * 1024,
+        target_seconds: float = 2.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ) -> None:
+        self.fetch_range = fetch_range
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.target_seconds = target_seconds
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def download(
+        self, output_path: Path, size: int, md5_checksum: str | None = None
+    ) -> None:
+        """Download ``size`` bytes to ``output_path``.
+
+        Args:
+            output_path: Final location of the file
+            size: File size in bytes
+            md5_checksum: Expected hex MD5, or None to skip verification
+
+        Raises:
+            DownloadError: A chunk still failed after its retries; the
+                partial download is kept for the next attempt
+            ChecksumMismatchError: The downloaded file is corrupt; the
+                partial download is discarded
+        """
+        part_path = output_path.with_name(output_path.name + ".part")
+        state_path = output_path.with_name(output_path.name + ".part.json")
+        identity = {"size": size, "md5": md5_checksum}
+
+        done = self._load_state(state_path, part_path, identity)
+        if not part_path.exists():
+            with open(part_path, "wb") as fh:
+                if size and hasattr(os, "posix_fallocate"):
+                    os.posix_fallocate(fh.fileno(), 0, size)
+                else:
+                    fh.truncate(size)
+
+        allocator = _RangeAllocator(size, done)
+        if done:
+            logger.info(
+                f"Resuming {output_path.name}: {allocator.missing} of {size} bytes left"
+            )
+
+        state_lock = threading.Lock()
+        failed = threading.Event()
+
+        def complete(start: int, end: int) -> None:
+            # Snapshot and write under one lock so an older snapshot never
+            # overwrites a newer one
+            with state_lock:
+                completed = allocator.complete(start, end)
+                tmp_path = state_path.with_suffix(".tmp")
+                tmp_path.write_text(json.dumps({**identity, "done": completed}))
+                tmp_path.replace(state_path)
+
+        def worker() -> None:
+            chunk = self.min_chunk
+            with open(part_path, "r+b") as fh:
+                while not failed.is_set():
+                    claimed = allocator.take(chunk)
+                    if claimed is None:
+                        return
+                    start, end = claimed
+                    try:
+                        began = time.monotonic()
+                        data = self._fetch_with_retries(start, end)
+                        elapsed = time.monotonic() - began
+                    except Exception:
+                        allocator.release(start, end)
+                        failed.set()
+                        raise
+                    fh.seek(start)
+                    fh.write(data)
+                    fh.flush()
+                    complete(start, end)
+                    chunk = self._next_chunk(chunk, end - start, elapsed)
+
+        workers = self.workers if size >= self.parallel_threshold else 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(worker) for _ in range(workers)]
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            raise DownloadError(
+                f"Download of {output_path.name} interrupted, "
+                f"{allocator.missing} bytes left to resume"
+            ) from errors[0]
+
+        if md5_checksum is not None:
+            digest = hashlib.md5(usedforsecurity=False)
+            with open(part_path, "rb") as part:
+                while block := part.read(1024 * 1024):
+                    digest.update(block)
+            if digest.hexdigest() != md5_checksum:
+                part_path.unlink()
+                state_path.unlink(missing_ok=True)
+                raise ChecksumMismatchError(
+                    f"MD5 of {output_path.name} is {digest.hexdigest()}, "
+                    f"expected {md5_checksum}"
+                )
+
+        part_path.replace(output_path)
+        state_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _load_state(
+        state_path: Path, part_path: Path, identity: dict
+    ) -> list[tuple[int, int]]:
+        """Completed ranges of an earlier attempt at the same file version."""
+        try:
+            state = json.loads(state_path.read_text())
+        except (OSError, ValueError):
+            state = None
+        if (
+            state is None
+            or not part_path.exists()
+            or {k: state.get(k) for k in identity} != identity
+        ):
+            part_path.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            return []
+        return [(start, end) for start, end in state.get("done", [])]
+
+    def _fetch_with_retries(self, start: int, end: int) -> bytes:
+        for attempt in range(self.max_retries + 1):
+            try:
+                data = self.fetch_range(start, end)
+                if len(data) != end - start:
+                    raise DownloadError(
+                        f"Expected {end - start} bytes at {start}, got {len(data)}"
+                    )
+                return data
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2**attempt
+                logger.warning(
+                    f"Range {start}-{end} failed ({e}), retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def _next_chunk(self, chunk: int, fetched: int, elapsed: float) -> int:
+        """Size the next chunk to take about ``target_seconds``."""
+        if elapsed <= 0:
+            wanted = chunk * 2
+        else:
+            wanted = int(fetched / elapsed * self.target_seconds)
+        # Change gradually so one slow or fast response does not dominate
+        wanted = max(chunk // 2, min(chunk * 2, wanted))
+        return max(self.min_chunk, min(self.max_chunk, wanted))
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class BankTemplate(BaseModel):
+    """Layout description of one bank's statement table."""
+
+    name: str
+    detect: list[str] = Field(description="Phrases that identify the bank")
+    columns: dict[str, list[str]] = Field(
+        description=(
+            "Header labels per field: transaction_date, transaction_detail "
+            "and either amount or debit/credit"
+        )
+    )
+    date_formats: list[str]
+    currency: str = "VND"
+    thousands_separator: str = ","
+    decimal_separator: str = "."
+    stop_markers: list[str] = Field(
+        default_factory=list, description="Rows that end the transaction table"
+    )
+
+    def matches(self, text: str) -> bool:
+        """Check whether the first page text belongs to this bank."""
+        lowered = text.lower()
+        return any(phrase.lower() in lowered for phrase in self.detect)
+
+
+class TemplateLibrary:
+    """Loads bank templates from the template library file."""
+
+    def __init__(self, library_path: Path | None = None):
+        if library_path is None:
+            library_path = Path(__file__).parent / "templates" / "banks.json"
+        self.library_path = library_path
+        self.templates = self._load_templates()
+
+    def _load_templates(self) -> dict[str, BankTemplate]:
+        """Load templates from the library file."""
+        try:
+            with open(self.library_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            logger.error(f"Bank template library not found at {self.library_path}")
+            return {}
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing bank template library: {e}")
+            return {}
+        return {
+            template_id: BankTemplate.model_validate(info)
+            for template_id, info in data.items()
+        }
+
+    def detect(self, text: str) -> tuple[str, BankTemplate] | None:
+        """Find the template whose detection phrases appear in ``text``."""
+        for template_id, template in self.templates.items():
+            if template.matches(text):
+                return template_id, template
+        return None
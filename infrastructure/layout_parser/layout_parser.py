@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from infrastructure.llm.pydantic_models.transactions import (
+    TransactionEntry,
+    TransactionHistory,
+)
+from infrastructure.pdf_extractor.layout import (
+    Word,
+    group_rows,
+    join_words,
+    open_pdf,
+    page_words,
+)
+from services.pdf_extractor import PDFSource
+
+from .bank_template import BankTemplate, TemplateLibrary
+
+logger = logging.getLogger(__name__)
+
+
+class LayoutParseError(Exception):
+    """Raised when a known-bank statement cannot be parsed by its template."""
+
+    pass
+
+
+@dataclass
+class ParsedRow:
+    """One transaction row read from a statement table."""
+
+    transaction_date: datetime
+    transaction_detail: str
+    amount: Decimal
+    balance: Decimal | None
+
+
+@dataclass
+class LayoutParseResult:
+    """Transaction rows parsed from a statement with a bank template."""
+
+    template_id: str
+    currency: str
+    rows: list[ParsedRow]
+    candidate_rows: int
+    rejected_rows: int
+
+    @property
+    def reconciled_rows(self) -> int:
+        """Rows whose balance equals the previous balance plus their amount.
+
+        Statements list rows oldest or newest first, so both running
+        directions are checked and the better one counts.
+        """
+        forward = backward = 0
+        for previous, row in zip(self.rows, self.rows[1:]):
+            if previous.balance is None or row.balance is None:
+                continue
+            if previous.balance + row.amount == row.balance:
+                forward += 1
+            if row.balance + previous.amount == previous.balance:
+                backward += 1
+        return max(forward, backward)
+
+    @property
+    def confidence(self) -> float:
+        """Share of consecutive dated rows whose running balance reconciles.
+
+        Rows that could not be parsed break the chain, so they lower the
+        confidence too.
+        """
+        if self.candidate_rows < 2:
+            return 0.0
+        return self.reconciled_rows / (self.candidate_rows - 1)
+
+    def to_history(self) -> TransactionHistory:
+        """Turn the rows into transactions without asking the LLM.
+
+        Categories come from the amount's sign only: credits are
+        ``"Income"`` and debits ``"Miscellaneous/Other"``. Amounts keep
+        their sign, so debits are negative.
+        """
+        return TransactionHistory(
+            transactions=[
+                TransactionEntry(
+                    transaction_date=row.transaction_date,
+                    transaction_detail=row.transaction_detail,
+                    amount=format(row.amount, "f"),
+                    currency=self.currency,
+                    category="Income" if row.amount >= 0 else "Miscellaneous/Other",
+                    receiver_name=None,
+                )
+                for row in self.rows
+            ]
+        )
+
+
+class LayoutParser:
+    """Rule-based transaction parser for banks with fixed statement layouts.
+
+    Locates the transaction table by its header labels, assigns each word to
+    a column by its x position and turns every dated row (plus wrapped
+    continuation lines) into a ``ParsedRow`` with a signed amount. Callers
+    use the rows as transactions when the running balance reconciles, and
+    fall back to text extraction and the LLM when no template matches or it
+    does not.
+    """
+
+    def __init__(
+        self,
+        library: TemplateLibrary | None = None,
+        *,
+        y_tolerance: float = 3.0,
+        column_slack: float = 2.0,
+        max_row_gap: float = 2.5,
+    ) -> None:
+        self.library = library or TemplateLibrary()
+        self.y_tolerance = y_tolerance
+        self.column_slack = column_slack
+        self.max_row_gap = max_row_gap
+
+    def parse(
+        self, source: PDFSource, *, password: str | None = None
+    ) -> LayoutParseResult | None:
+        """Parse a statement, or return None when no template matches.
+
+        Args:
+            source: PDF file path or content as bytes
+            password: Optional password for encrypted PDFs
+
+        Returns:
+            LayoutParseResult, or None for statements of unknown banks
+        """
+        with open_pdf(source) as doc:
+            if doc.needs_pass and not doc.authenticate(password or ""):
+                raise LayoutParseError("Invalid password for encrypted PDF")
+            if doc.page_count == 0:
+                return None
+
+            detected = self.library.detect(doc[0].get_text("text"))
+            if detected is None:
+                return None
+            template_id, template = detected
+            pages = [page_words(page) for page in doc]
+
+        return self._parse_pages(template_id, template, pages)
+
+    def _parse_pages(
+        self, template_id: str, template: BankTemplate, pages: list[list[Word]]
+    ) -> LayoutParseResult:
+        entries: list[ParsedRow] = []
+        candidates = 0
+        rejected = 0
+        columns: list[tuple[str, float]] | None = None
+        current: dict[str, Any] | None = None
+
+        def flush() -> None:
+            nonlocal current, rejected
+            if current is None:
+                return
+            entry = self._build_row(template, current)
+            if entry is None:
+                rejected += 1
+            else:
+                entries.append(entry)
+            current = None
+
+        for words in pages:
+            in_table = False
+            last_bottom = 0.0
+            for row in group_rows(words, self.y_tolerance):
+                row_text = join_words(row)
+                top = min(word.y0 for word in row)
+                bottom = max(word.y1 for word in row)
+                header = self._match_header(template, row)
+                if header is not None:
+                    flush()
+                    columns = header
+                    in_table = True
+                    last_bottom = bottom
+                    continue
+                if columns is None:
+                    continue
+                if any(
+                    marker.lower() in row_text.lower()
+                    for marker in template.stop_markers
+                ):
+                    flush()
+                    in_table = False
+                    continue
+                if in_table and top - last_bottom > self.max_row_gap * (bottom - top):
+                    # A large vertical gap means the table ended (page footer)
+                    flush()
+                    in_table = False
+                if not in_table and not self._looks_dated(template, row, columns):
+                    # Pages without a repeated header start directly with rows
+                    continue
+                in_table = True
+                last_bottom = bottom
+
+                cells = self._assign_columns(row, columns)
+                date = self._parse_date(template, cells.get("transaction_date", ""))
+                if date is not None:
+                    flush()
+                    candidates += 1
+                    current = {**cells, "transaction_date": date}
+                elif current is not None:
+                    # Wrapped description or amount on the following line
+                    for field, text in cells.items():
+                        if field in ("transaction_date", "balance"):
+                            continue
+                        current[field] = f"{current.get(field, '')} {text}".strip()
+        flush()
+
+        logger.info(
+            f"Layout parser '{template_id}': {len(entries)}/{candidates} rows parsed"
+        )
+        return LayoutParseResult(
+            template_id=template_id,
+            currency=template.currency,
+            rows=entries,
+            candidate_rows=candidates,
+            rejected_rows=rejected,
+        )
+
+    def _match_header(
+        self, template: BankTemplate, row: list[Word]
+    ) -> list[tuple[str, float]] | None:
+        """Return (field, x0) column anchors if ``row`` is the table header."""
+        found: dict[str, float] = {}
+        lowered = [word.text.lower() for word in row]
+        for field, labels in template.columns.items():
+            for label in labels:
+                tokens = label.lower().split()
+                for i in range(len(lowered) - len(tokens) + 1):
+                    if lowered[i : i + len(tokens)] == tokens:
+                        found[field] = row[i].x0
+                        break
+                if field in found:
+                    break
+
+        has_amount = "amount" in found or "debit" in found or "credit" in found
+        if "transaction_date" in found and "transaction_detail" in found and has_amount:
+            return sorted(found.items(), key=lambda item: item[1])
+        return None
+
+    def _assign_columns(
+        self, row: list[Word], columns: list[tuple[str, float]]
+    ) -> dict[str, str]:
+        cells: dict[str, list[Word]] = {}
+        for word in row:
+            field = columns[0][0]
+            for name, x0 in columns:
+                if word.x_center >= x0 - self.column_slack:
+                    field = name
+            cells.setdefault(field, []).append(word)
+        return {field: join_words(words) for field, words in cells.items()}
+
+    def _looks_dated(
+        self, template: BankTemplate, row: list[Word], columns: list[tuple[str, float]]
+    ) -> bool:
+        cells = self._assign_columns(row, columns)
+        return self._parse_date(template, cells.get("transaction_date", "")) is not None
+
+    @staticmethod
+    def _parse_date(template: BankTemplate, text: str) -> datetime | None:
+        tokens = text.split()
+        for count in range(min(len(tokens), 3), 0, -1):
+            candidate = " ".join(tokens[:count])
+            for date_format in template.date_formats:
+                try:
+                    return datetime.strptime(candidate, date_format)
+                except ValueError:
+                    continue
+        return None
+
+    @staticmethod
+    def _parse_amount(template: BankTemplate, text: str) -> Decimal | None:
+        cleaned = "".join(
+            ch for ch in text if ch.isdigit() or ch in "-+" + template.decimal_separator
+        )
+        cleaned = cleaned.replace(template.decimal_separator, ".")
+        if not cleaned.strip("-+."):
+            return None
+        try:
+            return Decimal(cleaned)
+        except InvalidOperation:
+            return None
+
+    def _build_row(
+        self, template: BankTemplate, row: dict[str, Any]
+    ) -> ParsedRow | None:
+        detail = " ".join(str(row.get("transaction_detail", "")).split())
+        amount = self._parse_amount(template, row.get("amount", ""))
+        if amount is None:
+            debit = self._parse_amount(template, row.get("debit", ""))
+            credit = self._parse_amount(template, row.get("credit", ""))
+            if debit:
+                amount = -abs(debit)
+            elif credit:
+                amount = abs(credit)
+        if amount is None or not detail:
+            return None
+
+        return ParsedRow(
+            transaction_date=row["transaction_date"],
+            transaction_detail=detail,
+            amount=amount.normalize(),
+            balance=self._parse_amount(template, row.get("balance", "")),
+        )
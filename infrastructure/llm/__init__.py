@@ -1,13 +1,27 @@
 from .base import LLMProvider
+from .concurrency import AdaptiveConcurrencyController, ControlledProvider, RetryPolicy
+from .factory import LLMFactory
 from .gemini_provider import GeminiProvider
 from .langfuse_wrapper import LangfuseWrapper
 from .openai_provider import OpenAICompatibleProvider
+from .packing import StatementPacker
 from .prompt_manager import PromptManager
+from .router import RouteBackend, RoutingProvider
+from .validation import ResponseValidationError, validate_response_json
 
 __all__ = [
     "LLMProvider",
+    "LLMFactory",
     "OpenAICompatibleProvider",
     "GeminiProvider",
     "PromptManager",
     "LangfuseWrapper",
+    "AdaptiveConcurrencyController",
+    "ControlledProvider",
+    "RetryPolicy",
+    "RouteBackend",
+    "RoutingProvider",
+    "StatementPacker",
+    "ResponseValidationError",
+    "validate_response_json",
 ]
@@ -1,12 +1,24 @@
 import json
 import logging
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional, overload
 
 from .langfuse_wrapper import LangfuseWrapper
 from .prompt_manager import PromptManager
-from .pydantic_models.transactions import TransactionHistory
+from .pydantic_models.transactions import (
+    CompactTransactionHistory,
+    PackedTransactionHistory,
+    StatementOutput,
+    TransactionEntry,
+    TransactionHistory,
+    TransactionOutput,
+    expand_output,
+)
+from .streaming import IncrementalTransactionParser, JsonTransactionSink
+from .validation import RejectedEntry, check_rejected, entry_model
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +31,11 @@ class LLMProvider(ABC):
         self.provider_name = "unknown"
         self.model = "unknown"
         self.temperature = 0.0
+        # Ask for CompactTransactionHistory (short keys) in process_text_file
+        self.compact_output = False
+        # Share of a response's transactions that may fail validation and be
+        # dropped (and reported) instead of failing the whole response
+        self.max_rejected_ratio = 0.0
 
     @abstractmethod
     def create_prompt(self, system_prompt: str, user_content: str) -> dict[str, Any]:
@@ -29,17 +46,64 @@ class LLMProvider(ABC):
     def send_prompt(
         self,
         prompt: dict[str, Any],
-        output_format: type[TransactionHistory] = TransactionHistory,
-    ) -> TransactionHistory:
+        output_format: type[TransactionOutput] = TransactionHistory,
+    ) -> TransactionOutput:
         """Send prompt to LLM and get response."""
         pass
 
+    def stream_prompt(
+        self,
+        prompt: dict[str, Any],
+        output_format: type[StatementOutput] = TransactionHistory,
+    ) -> Iterator[str]:
+        """Send prompt to LLM and yield the raw JSON output as it is generated."""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support streaming responses"
+        )
+
+    def send_prompt_stream(
+        self,
+        prompt: dict[str, Any],
+        output_format: type[StatementOutput] = TransactionHistory,
+        rejected: Optional[list[RejectedEntry]] = None,
+    ) -> Iterator[TransactionEntry]:
+        """Send prompt to LLM and yield each transaction as soon as it is complete.
+
+        Entries that fail validation are skipped and appended to ``rejected``;
+        once the stream ends, more than ``max_rejected_ratio`` of them raises
+        ``ResponseValidationError``.
+        """
+        parser = IncrementalTransactionParser(entry_model(output_format))
+        if rejected is not None:
+            parser.rejected = rejected
+        for chunk in self.stream_prompt(prompt, output_format):
+            yield from parser.feed(chunk)
+        if not parser.done:
+            raise ValueError("Streamed response ended before the transaction list")
+        check_rejected(parser.rejected, parser.count, self.max_rejected_ratio)
+
+    @overload
+    def _send_prompt_with_tracing(
+        self,
+        prompt: dict[str, Any],
+        trace_name: str,
+        output_format: type[PackedTransactionHistory],
+    ) -> PackedTransactionHistory: ...
+
+    @overload
     def _send_prompt_with_tracing(
         self,
         prompt: dict[str, Any],
         trace_name: str,
-        output_format: type[TransactionHistory] = TransactionHistory,
-    ) -> TransactionHistory:
+        output_format: type[StatementOutput] = TransactionHistory,
+    ) -> StatementOutput: ...
+
+    def _send_prompt_with_tracing(
+        self,
+        prompt: dict[str, Any],
+        trace_name: str,
+        output_format: type[TransactionOutput] = TransactionHistory,
+    ) -> TransactionOutput:
         """Wrapper method to add Langfuse tracing to prompt sending."""
         if LangfuseWrapper.is_initialized():
             langfuse = LangfuseWrapper.get_instance()
@@ -80,26 +144,60 @@ class LLMProvider(ABC):
             # If Langfuse is not initialized, just call the method directly
             return self.send_prompt(prompt, output_format)
 
+    def _stream_prompt_with_tracing(
+        self,
+        prompt: dict[str, Any],
+        trace_name: str,
+        output_format: type[StatementOutput] = TransactionHistory,
+        rejected: Optional[list[RejectedEntry]] = None,
+    ) -> Iterator[TransactionEntry]:
+        """Streaming counterpart of ``_send_prompt_with_tracing``."""
+        langfuse = LangfuseWrapper.get_instance()
+        if langfuse is None:
+            yield from self.send_prompt_stream(prompt, output_format, rejected)
+            return
+
+        with langfuse.start_as_current_span(
+            name=trace_name,
+            metadata={
+                "provider": self.provider_name,
+                "model": self.model,
+                "temperature": self.temperature,
+                "streaming": True,
+            },
+        ) as _span:
+            with langfuse.start_as_current_generation(
+                name=f"{self.provider_name}_completion",
+                model=self.model,
+                input=prompt,
+                model_parameters={
+                    "temperature": str(self.temperature),
+                    "response_format": "json_object",
+                },
+            ) as generation:
+                transactions = []
+                try:
+                    for transaction in self.send_prompt_stream(
+                        prompt, output_format, rejected
+                    ):
+                        transactions.append(transaction)
+                        yield transaction
+                    generation.update(
+                        output=TransactionHistory(transactions=transactions)
+                    )
+                except Exception as e:
+                    generation.update(level="ERROR", status_message=str(e))
+                    raise
+
     def extract_json_from_response(
         self, response: TransactionHistory
     ) -> dict[str, Any]:
         """Extract JSON from LLM response."""
         try:
-            output = []
-            for transaction in response.transactions:
-                output.append(
-                    {
-                        "transaction_date": transaction.transaction_date.strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        ),
-                        "transaction_detail": transaction.transaction_detail,
-                        "amount": transaction.amount,
-                        "currency": transaction.currency,
-                        "category": transaction.category,
-                        "receiver": transaction.receiver_name,
-                        "service_subscription": transaction.service_subscription,
-                    }
-                )
+            output = [
+                self.transaction_to_dict(transaction)
+                for transaction in response.transactions
+            ]
             return {"transactions": output}
         except Exception as e:
             logger.error(f"No JSON found in response: {response}")
@@ -122,6 +220,21 @@ class LLMProvider(ABC):
         #         logger.error(f"No JSON found in response: {response}")
         #         raise ValueError("No JSON found in response")
 
+    @staticmethod
+    def transaction_to_dict(transaction: TransactionEntry) -> dict[str, Any]:
+        """Serialize one transaction in the output file format."""
+        return {
+            "transaction_date": transaction.transaction_date.strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "transaction_detail": transaction.transaction_detail,
+            "amount": transaction.amount,
+            "currency": transaction.currency,
+            "category": transaction.category,
+            "receiver": transaction.receiver_name,
+            "service_subscription": transaction.service_subscription,
+        }
+
     def save_result(self, result: dict[str, Any], output_path: Path) -> None:
         """Save result to file."""
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -154,10 +267,65 @@ class LLMProvider(ABC):
 
         # Use the tracing wrapper for the LLM call
         trace_name = f"process_file_{output_path.name}"
-        response = self._send_prompt_with_tracing(
-            prompt, trace_name, TransactionHistory
+        wire_format: type[StatementOutput] = (
+            CompactTransactionHistory if self.compact_output else TransactionHistory
         )
+        response = self._send_prompt_with_tracing(prompt, trace_name, wire_format)
 
-        result = self.extract_json_from_response(response)
+        history = expand_output(response)
+        result = self.extract_json_from_response(history)
+        if history._rejected:
+            result["rejected_transactions"] = history._rejected
         self.save_result(result, output_path)
         return result
+
+    def process_text_file_streaming(
+        self,
+        text_content: str,
+        system_prompt_or_id: str,
+        output_path: Path,
+        use_prompt_library: bool = True,
+        on_transaction: Optional[Callable[[dict[str, Any]], None]] = None,
+    ) -> dict[str, Any]:
+        """Process text file through a streaming LLM call.
+
+        Each transaction is appended to ``output_path`` and passed to
+        ``on_transaction`` as soon as it is parsed from the stream, instead of
+        after the whole response has arrived.
+
+        Args:
+            text_content: The text content to process
+            system_prompt_or_id: Either a prompt ID from the library or a direct system prompt
+            output_path: Path to save the output JSON
+            use_prompt_library: If True, treat system_prompt_or_id as a prompt ID
+            on_transaction: Optional callback for each serialized transaction
+        """
+        if use_prompt_library:
+            prompt_manager = PromptManager()
+            system_prompt = prompt_manager.get_prompt(system_prompt_or_id)
+        else:
+            system_prompt = system_prompt_or_id
+
+        prompt = self.create_prompt(system_prompt, text_content)
+
+        trace_name = f"process_file_{output_path.name}"
+        wire_format: type[StatementOutput] = (
+            CompactTransactionHistory if self.compact_output else TransactionHistory
+        )
+        output = []
+        rejected: list[RejectedEntry] = []
+        with JsonTransactionSink(output_path) as sink:
+            for transaction in self._stream_prompt_with_tracing(
+                prompt, trace_name, wire_format, rejected
+            ):
+                item = self.transaction_to_dict(transaction)
+                sink.write(item)
+                output.append(item)
+                if on_transaction is not None:
+                    on_transaction(item)
+            sink.rejected = [asdict(entry) for entry in rejected]
+
+        result: dict[str, Any] = {"transactions": output}
+        if sink.rejected:
+            result["rejected_transactions"] = sink.rejected
+        return result
@@ -0,0 +1,396 @@
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional, TypeVar
+
+from .base import LLMProvider
+from .pydantic_models.transactions import (
+    StatementOutput,
+    TransactionHistory,
+    TransactionOutput,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMRetryError(Exception):
+    """Raised when an LLM call still fails after all retry attempts."""
+
+    pass
+
+
+def get_status_code(exc: BaseException) -> Optional[int]:
+    """Best-effort HTTP status code lookup across the OpenAI and Gemini SDKs."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """Read the Retry-After hint (in seconds) from an SDK exception, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        retry_after = headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            retry_at = parsedate_to_datetime(retry_after)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def is_timeout(exc: BaseException) -> bool:
+    """Check whether an exception represents a request timeout."""
+    if isinstance(exc, (TimeoutError, FutureTimeoutError)):
+        return True
+    return "timeout" in type(exc).__name__.lower()
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """Check whether an exception is a provider throttling signal."""
+    if get_status_code(exc) == 429:
+        return True
+    name = type(exc).__name__.lower()
+    return "ratelimit" in name or "resourceexhausted" in name
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Check whether an exception is worth retrying."""
+    if is_timeout(exc) or is_rate_limited(exc):
+        return True
+    if "connection" in type(exc).__name__.lower():
+        return True
+    return get_status_code(exc) in RETRYABLE_STATUS_CODES
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Return the delay before retry number ``attempt`` (1-based).
+
+        A Retry-After hint from the provider takes precedence over the
+        computed backoff, but is still capped at ``max_delay``.
+        """
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)  # nosec B311 - jitter, not crypto
+
+
+class AdaptiveConcurrencyController:
+    """AIMD concurrency limiter with retries, timeouts and hedged requests.
+
+    The limit grows by one slot per fully successful window and is cut
+    multiplicatively when the provider throttles us (429 / Retry-After) or when
+    latency rises above ``target_latency``. Decreases are applied at most once
+    per cooldown so a burst of failures from in-flight calls counts as a single
+    congestion signal.
+
+    One controller is meant to be shared by every thread that talks to the same
+    provider quota.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        decrease_factor: float = 0.5,
+        target_latency: Optional[float] = None,
+        request_timeout: Optional[float] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.target_latency = target_latency
+        self.request_timeout = request_timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._latencies: deque[float] = deque(maxlen=200)
+        self._cond = threading.Condition()
+        # Attempts run on this pool so they can be timed out and hedged; the
+        # worker count covers the max limit plus one hedge per slot.
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_limit * 2, thread_name_prefix="llm-call"
+        )
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of attempts currently holding a slot."""
+        return self._in_flight
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the controller state for logging."""
+        with self._cond:
+            latencies = list(self._latencies)
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "latency_p50": statistics.median(latencies) if latencies else None,
+            "hedge_delay": self._hedge_delay(),
+        }
+
+    def _acquire(self, blocking: bool = True) -> bool:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    if not blocking:
+                        return False
+                    self._cond.wait(self._blocked_until - now)
+                    continue
+                if self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    return True
+                if not blocking:
+                    return False
+                self._cond.wait()
+
+    def _release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        with self._cond:
+            self._latencies.append(latency)
+            if self.target_latency is not None and latency > self.target_latency:
+                self._decrease("latency above target", latency)
+            elif self._limit < self.max_limit:
+                # Additive increase: +1 slot after ~limit successful calls
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def _on_throttle(self, reason: str, retry_after: Optional[float]) -> None:
+        with self._cond:
+            self._decrease(reason, retry_after)
+            if retry_after:
+                self._blocked_until = max(
+                    self._blocked_until, time.monotonic() + retry_after
+                )
+            self._cond.notify_all()
+
+    def _decrease(self, reason: str, detail: Optional[float]) -> None:
+        now = time.monotonic()
+        cooldown = statistics.median(self._latencies) if self._latencies else 1.0
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        previous = self._limit
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        logger.warning(
+            f"LLM concurrency {previous:.1f} -> {self._limit:.1f} ({reason}: {detail})"
+        )
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge or len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.hedge_quantile))
+        return ordered[index]
+
+    def _run_slot(self, fn: Callable[..., T], args: tuple[Any, ...]) -> T:
+        """Run one attempt inside an already acquired slot."""
+        started = time.monotonic()
+        try:
+            result = fn(*args)
+        finally:
+            self._release()
+        self._on_success(time.monotonic() - started)
+        return result
+
+    def _attempt(self, fn: Callable[..., T], args: tuple[Any, ...]) -> T:
+        """Run a single attempt with timeout and optional hedging."""
+        self._acquire()
+        primary = self._executor.submit(self._run_slot, fn, args)
+        futures: list[Future[T]] = [primary]
+
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is not None:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done and self._acquire(blocking=False):
+                logger.info(f"Hedging slow LLM call after {hedge_delay:.2f}s")
+                futures.append(self._executor.submit(self._run_slot, fn, args))
+
+        deadline = (
+            time.monotonic() + self.request_timeout if self.request_timeout else None
+        )
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            timeout = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The SDK call keeps running in its thread, but we stop waiting
+                raise TimeoutError(
+                    f"LLM request exceeded timeout of {self.request_timeout}s"
+                )
+            for future in done:
+                exc = future.exception()
+                if exc is None:
+                    return future.result()
+                error = exc
+        assert error is not None
+        raise error
+
+    def execute(self, fn: Callable[..., T], *args: Any) -> T:
+        """Call ``fn(*args)`` under the concurrency limit, retrying on failure.
+
+        Raises:
+            LLMRetryError: If every attempt fails with a retryable error
+            Exception: Non-retryable errors are re-raised immediately
+        """
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            try:
+                return self._attempt(fn, args)
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt))
+        raise AssertionError("unreachable")
+
+    def stream(self, fn: Callable[..., Iterable[T]], *args: Any) -> Iterator[T]:
+        """Iterate ``fn(*args)`` while holding a concurrency slot.
+
+        Failures are retried like ``execute`` as long as nothing has been
+        yielded yet; once output has been emitted the error is re-raised,
+        since the consumer has already acted on part of the response.
+        Per-request timeouts and hedging do not apply to streams.
+        """
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            emitted = False
+            self._acquire()
+            released = False
+            started = time.monotonic()
+            try:
+                for item in fn(*args):
+                    emitted = True
+                    yield item
+            except Exception as e:
+                self._release()
+                released = True
+                if emitted:
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+                continue
+            finally:
+                if not released:
+                    self._release()
+                    released = True
+            self._on_success(time.monotonic() - started)
+            return
+        raise AssertionError("unreachable")
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Feed an error into the limiter and return the backoff before retrying.
+
+        Re-raises ``error`` if it is not retryable and raises ``LLMRetryError``
+        once the attempts are exhausted.
+        """
+        if not is_retryable(error):
+            raise error
+        policy = self.retry_policy
+        retry_after = get_retry_after(error)
+        if is_rate_limited(error):
+            self._on_throttle("rate limited", retry_after)
+        elif is_timeout(error):
+            self._on_throttle("timed out", None)
+        if attempt == policy.max_attempts:
+            raise LLMRetryError(
+                f"LLM call failed after {attempt} attempts: {error}"
+            ) from error
+        delay = policy.backoff(attempt, retry_after)
+        logger.warning(
+            f"LLM call failed ({type(error).__name__}: {error}), "
+            f"retry {attempt}/{policy.max_attempts - 1} in {delay:.2f}s"
+        )
+        return delay
+
+    def shutdown(self) -> None:
+        """Stop the attempt pool without waiting for abandoned calls."""
+        self._executor.shutdown(wait=False)
+
+
+class ControlledProvider(LLMProvider):
+    """LLMProvider decorator that routes ``send_prompt`` through a controller."""
+
+    def __init__(
+        self, provider: LLMProvider, controller: AdaptiveConcurrencyController
+    ) -> None:
+        super().__init__()
+        self.provider = provider
+        self.controller = controller
+        self.base_url = provider.base_url
+        self.provider_name = provider.provider_name
+        self.model = provider.model
+        self.temperature = provider.temperature
+        self.max_rejected_ratio = provider.max_rejected_ratio
+
+    def create_prompt(self, system_prompt: str, user_content: str) -> dict[str, Any]:
+        """Create prompt structure using the wrapped provider."""
+        return self.provider.create_prompt(system_prompt, user_content)
+
+    def send_prompt(
+        self,
+        prompt: dict[str, Any],
+        output_format: type[TransactionOutput] = TransactionHistory,
+    ) -> TransactionOutput:
+        """Send prompt through the controller with retries and backoff."""
+        return self.controller.execute(self.provider.send_prompt, prompt, output_format)
+
+    def stream_prompt(
+        self,
+        prompt: dict[str, Any],
+        output_format: type[StatementOutput] = TransactionHistory,
+    ) -> Iterator[str]:
+        """Stream from the wrapped provider while holding a controller slot."""
+        yield from self.controller.stream(
+            self.provider.stream_prompt, prompt, output_format
+        )
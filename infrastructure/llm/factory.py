@@ -1,9 +1,10 @@
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from .base import LLMProvider
 from .gemini_provider import GeminiProvider
 from .langfuse_wrapper import LangfuseWrapper
 from .openai_provider import OpenAICompatibleProvider
+from .router import RouteBackend, RoutingProvider
 
 
 class LLMFactory:
@@ -25,6 +26,7 @@ class LLMFactory:
         api_key: str,
         model: Optional[str] = None,
         temperature: float = 0.0,
+        max_rejected_ratio: float = 0.0,
     ) -> LLMProvider:
         """Create an LLM provider instance.
 
@@ -33,6 +35,8 @@ class LLMFactory:
             api_key: API key for the provider
             model: Model name (optional, uses default if not provided)
             temperature: Temperature for generation (0.0 for deterministic)
+            max_rejected_ratio: Share of a response's transactions that may
+                be dropped as invalid instead of failing the response
 
         Returns:
             LLMProvider instance
@@ -40,15 +44,16 @@ class LLMFactory:
         Raises:
             ValueError: If provider type is not supported
         """
+        provider: LLMProvider
         if provider_type.lower() == "openai":
-            return OpenAICompatibleProvider(
+            provider = OpenAICompatibleProvider(
                 base_url=base_url or "https://api.openai.com/v1",
                 api_key=api_key,
                 model=model or "gpt-4o-mini",
                 temperature=temperature,
             )
         elif provider_type.lower() == "gemini":
-            return GeminiProvider(
+            provider = GeminiProvider(
                 base_url=base_url,
                 api_key=api_key,
                 model=model or "gemini-2.5-flash",
@@ -56,3 +61,48 @@ class LLMFactory:
             )
         else:
             raise ValueError(f"Unsupported provider type: {provider_type}")
+        provider.max_rejected_ratio = max_rejected_ratio
+        return provider
+
+    @staticmethod
+    def create_routing_provider(
+        routes: list[dict[str, Any]],
+        wrap: Optional[Callable[[LLMProvider, dict[str, Any]], LLMProvider]] = None,
+    ) -> RoutingProvider:
+        """Create a routing provider over several provider/model backends.
+
+        Args:
+            routes: Backend definitions with ``provider_type``, ``api_key`` and
+                optional ``name``, ``base_url``, ``model``, ``temperature``,
+                ``max_input_chars``, ``allow_tables``, ``timeout`` and
+                ``max_rejected_ratio`` keys
+            wrap: Optional decorator applied to each backend provider with its
+                route definition, e.g. to give every vendor its own
+                concurrency controller
+
+        Returns:
+            RoutingProvider instance
+        """
+        backends = []
+        for route in routes:
+            provider = LLMFactory.create_provider(
+                base_url=route.get("base_url"),
+                provider_type=route["provider_type"],
+                api_key=route["api_key"],
+                model=route.get("model"),
+                temperature=route.get("temperature", 0.0),
+                max_rejected_ratio=route.get("max_rejected_ratio", 0.0),
+            )
+            if wrap is not None:
+                provider = wrap(provider, route)
+            backends.append(
+                RouteBackend(
+                    name=route.get("name")
+                    or f"{provider.provider_name}:{provider.model}",
+                    provider=provider,
+                    max_input_chars=route.get("max_input_chars"),
+                    allow_tables=route.get("allow_tables", True),
+                    timeout=route.get("timeout"),
+                )
+            )
+        return RoutingProvider(backends)
@@ -1,15 +1,32 @@
 import logging
+from collections.abc import Iterator
+from functools import cache
 from typing import Any, Union
 
 from google import genai
 from google.genai import types
 
 from .base import LLMProvider
-from .pydantic_models.transactions import TransactionHistory
+from .pydantic_models.transactions import (
+    StatementOutput,
+    TransactionHistory,
+    TransactionOutput,
+)
+from .validation import validate_response_json
 
 logger = logging.getLogger(__name__)
 
 
+@cache
+def _response_schema(output_format: type[TransactionOutput]) -> dict[str, Any]:
+    """JSON schema of ``output_format``, built once.
+
+    Passed as ``response_json_schema`` rather than the model itself, so
+    the SDK does not validate the response with pydantic before we do.
+    """
+    return output_format.model_json_schema()
+
+
 class GeminiProvider(LLMProvider):
     """Google Gemini LLM provider implementation."""
 
@@ -39,8 +56,8 @@ class GeminiProvider(LLMProvider):
     def send_prompt(
         self,
         prompt: dict[str, Any],
-        output_format: type[TransactionHistory] = TransactionHistory,
-    ) -> TransactionHistory:
+        output_format: type[TransactionOutput] = TransactionHistory,
+    ) -> TransactionOutput:
         """Send prompt to Gemini and get response."""
         try:
             response = self.client.models.generate_content(
@@ -49,19 +66,38 @@ class GeminiProvider(LLMProvider):
                 config=types.GenerateContentConfig(
                     temperature=self.temperature,
                     response_mime_type="application/json",  # Force JSON response
-                    response_schema=output_format,
+                    response_json_schema=_response_schema(output_format),
                 ),
             )
-            # Return the parsed response directly as TransactionHistory
-            if response.parsed and hasattr(response.parsed, "transactions"):
-                if isinstance(response.parsed, TransactionHistory):
-                    return response.parsed
-                else:
-                    # Handle case where parsed is not TransactionHistory
-                    return TransactionHistory(transactions=[])
-            else:
-                # Fallback: create empty TransactionHistory if parsing fails
-                return TransactionHistory(transactions=[])
+            if not response.text:
+                raise ValueError("No output received from Gemini API")
+            return validate_response_json(
+                response.text,
+                output_format,
+                max_rejected_ratio=self.max_rejected_ratio,
+            )
         except Exception as e:
             logger.error(f"Error calling Gemini API: {str(e)}")
             raise
+
+    def stream_prompt(
+        self,
+        prompt: dict[str, Any],
+        output_format: type[StatementOutput] = TransactionHistory,
+    ) -> Iterator[str]:
+        """Send prompt to Gemini and yield output text chunks as they arrive."""
+        try:
+            for chunk in self.client.models.generate_content_stream(
+                model=self.model,
+                contents=prompt["prompt"],
+                config=types.GenerateContentConfig(
+                    temperature=self.temperature,
+                    response_mime_type="application/json",
+                    response_json_schema=_response_schema(output_format),
+                ),
+            ):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Error streaming from Gemini API: {str(e)}")
+            raise
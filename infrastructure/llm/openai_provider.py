@@ -1,14 +1,43 @@
 import logging
+from collections.abc import Iterator
+from functools import cache
 from typing import Any
 
 from openai import OpenAI
+from openai.lib import type_to_response_format_param
+from openai.types.responses import ResponseTextConfigParam
 
 from .base import LLMProvider
-from .pydantic_models.transactions import TransactionHistory
+from .pydantic_models.transactions import (
+    StatementOutput,
+    TransactionHistory,
+    TransactionOutput,
+)
+from .validation import validate_response_json
 
 logger = logging.getLogger(__name__)
 
 
+@cache
+def _text_format(output_format: type[TransactionOutput]) -> ResponseTextConfigParam:
+    """Structured-output parameter for ``output_format``, built once.
+
+    This is what ``responses.parse`` builds on every call; the strict
+    schema comes from the SDK's public Chat Completions helper.
+    """
+    response_format = type_to_response_format_param(output_format)
+    assert response_format and response_format["type"] == "json_schema"
+    json_schema = response_format["json_schema"]
+    return {
+        "format": {
+            "type": "json_schema",
+            "name": json_schema["name"],
+            "schema": json_schema.get("schema", {}),
+            "strict": True,
+        }
+    }
+
+
 class OpenAICompatibleProvider(LLMProvider):
     """OpenAI LLM provider implementation."""
 
@@ -38,20 +67,45 @@ class OpenAICompatibleProvider(LLMProvider):
     def send_prompt(
         self,
         prompt: dict[str, Any],
-        output_format: type[TransactionHistory] = TransactionHistory,
-    ) -> TransactionHistory:
-        """Send prompt to OpenAI and get response."""
+        output_format: type[TransactionOutput] = TransactionHistory,
+    ) -> TransactionOutput:
+        """Send prompt to OpenAI and validate the raw JSON output once."""
         try:
-            response = self.client.responses.parse(
+            response = self.client.responses.create(
                 model=self.model,
                 input=prompt["messages"],
                 temperature=self.temperature,
-                text_format=output_format,
+                text=_text_format(output_format),
+            )
+            if not response.output_text:
+                raise ValueError("No output received from OpenAI API")
+            return validate_response_json(
+                response.output_text,
+                output_format,
+                max_rejected_ratio=self.max_rejected_ratio,
             )
-            if response.output_parsed is None:
-                raise ValueError("No parsed output received from OpenAI API")
-            result: TransactionHistory = response.output_parsed
-            return result
         except Exception as e:
             logger.error(f"Error calling OpenAI API: {str(e)}")
             raise
+
+    def stream_prompt(
+        self,
+        prompt: dict[str, Any],
+        output_format: type[StatementOutput] = TransactionHistory,
+    ) -> Iterator[str]:
+        """Send prompt to OpenAI and yield output text deltas as they arrive."""
+        try:
+            stream = self.client.responses.create(
+                model=self.model,
+                input=prompt["messages"],
+                temperature=self.temperature,
+                text=_text_format(output_format),
+                stream=True,
+            )
+            with stream:
+                for event in stream:
+                    if event.type == "response.output_text.delta":
+                        yield event.delta
+        except Exception as e:
+            logger.error(f"Error streaming from OpenAI API: {str(e)}")
+            raise
@@ -0,0 +1,165 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from .base import LLMProvider
+from .pydantic_models.transactions import (
+    PackedTransactionHistory,
+    TransactionHistory,
+)
+
+logger = logging.getLogger(__name__)
+
+PACKING_INSTRUCTIONS = (
+    "The input contains {count} separate bank statements. Each starts with a "
+    '<<<DOCUMENT id="N">>> line and ends with a <<<END DOCUMENT id="N">>> '
+    "line. Return exactly one entry in `documents` per statement, with its "
+    "id as `document_id` and only the transactions of that statement."
+)
+
+
+@dataclass
+class _Slot:
+    name: str
+    text: str
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Optional[TransactionHistory] = None
+
+
+@dataclass
+class _Pack:
+    slots: list[_Slot] = field(default_factory=list)
+    tokens: int = 0
+
+
+class StatementPacker:
+    """Bundle small statements from concurrent callers into one LLM request.
+
+    ``submit`` adds a statement to the open pack and blocks until the pack
+    is sent. A pack is sent when the next statement would exceed
+    ``max_tokens``, when it holds ``max_documents`` statements, or
+    ``max_wait`` seconds after a caller joined it, by whichever caller gets
+    there first. The statements are separated by delimiters and the model
+    returns one transaction list per document id, which is split back to
+    each caller. Statement sizes are measured with ``estimate_tokens``, the
+    same estimate the caller uses to pick statements small enough to pack.
+
+    ``submit`` returns None when the caller should send a single request
+    instead: the pack held only its statement, the pack request failed or
+    did not validate, or the response lacked (or repeated) its document.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        system_prompt: str,
+        *,
+        estimate_tokens: Callable[[str], int],
+        max_tokens: int = 6000,
+        max_documents: int = 8,
+        max_wait: float = 2.0,
+    ) -> None:
+        self.provider = provider
+        self.system_prompt = system_prompt
+        self.estimate_tokens = estimate_tokens
+        self.max_tokens = max_tokens
+        self.max_documents = max_documents
+        self.max_wait = max_wait
+        self._open: Optional[_Pack] = None
+        self._lock = threading.Lock()
+
+    def _seal(self) -> _Pack:
+        pack = self._open
+        assert pack is not None
+        self._open = None
+        return pack
+
+    def submit(self, text: str, name: str) -> Optional[TransactionHistory]:
+        """Add a statement to a pack and wait for its transactions.
+
+        Args:
+            text: Extracted statement text
+            name: Statement name, used in logs and traces
+
+        Returns:
+            The statement's transactions, or None to fall back to a single
+            request
+        """
+        slot = _Slot(name, text)
+        tokens = self.estimate_tokens(text)
+        to_send: list[_Pack] = []
+        with self._lock:
+            if self._open and self._open.tokens + tokens > self.max_tokens:
+                to_send.append(self._seal())
+            if self._open is None:
+                self._open = _Pack()
+            pack = self._open
+            pack.slots.append(slot)
+            pack.tokens += tokens
+            if len(pack.slots) >= self.max_documents:
+                to_send.append(self._seal())
+        for sealed in to_send:
+            self._send(sealed)
+
+        if not slot.done.wait(self.max_wait):
+            with self._lock:
+                mine = self._open is pack
+                if mine:
+                    self._seal()
+            if mine:
+                self._send(pack)
+            slot.done.wait()
+        return slot.result
+
+    def _send(self, pack: _Pack) -> None:
+        """Send a pack and hand each caller its transactions."""
+        try:
+            if len(pack.slots) > 1:
+                self._send_packed(pack)
+        except Exception as e:
+            names = ", ".join(slot.name for slot in pack.slots)
+            logger.warning(
+                f"Packed request for {names} failed, falling back to single "
+                f"requests: {e}"
+            )
+        finally:
+            for slot in pack.slots:
+                slot.done.set()
+
+    def _send_packed(self, pack: _Pack) -> None:
+        content = "\n\n".join(
+            f'<<<DOCUMENT id="{i}">>>\n{slot.text}\n<<<END DOCUMENT id="{i}">>>'
+            for i, slot in enumerate(pack.slots, 1)
+        )
+        system_prompt = (
+            f"{self.system_prompt}\n\n"
+            f"{PACKING_INSTRUCTIONS.format(count=len(pack.slots))}"
+        )
+        prompt = self.provider.create_prompt(system_prompt, content)
+        logger.info(
+            f"Sending {len(pack.slots)} statements (~{pack.tokens} tokens) "
+            "in one request"
+        )
+        response = self.provider._send_prompt_with_tracing(
+            prompt,
+            f"process_pack_{pack.slots[0].name}+{len(pack.slots) - 1}",
+            PackedTransactionHistory,
+        )
+        if not isinstance(response, PackedTransactionHistory):
+            raise ValueError("Packed request returned an unexpected response")
+
+        by_id: dict[str, list[TransactionHistory]] = {}
+        for document in response.documents:
+            by_id.setdefault(document.document_id.strip(), []).append(
+                TransactionHistory(transactions=document.transactions)
+            )
+        for i, slot in enumerate(pack.slots, 1):
+            histories = by_id.get(str(i), [])
+            if len(histories) == 1:
+                slot.result = histories[0]
+            else:
+                logger.warning(
+                    f"Packed response has {len(histories)} results for "
+                    f"{slot.name}, falling back to a single request"
+                )
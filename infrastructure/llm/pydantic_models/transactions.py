@@ -1,7 +1,32 @@
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Any, Literal, Optional, Union, get_args
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+Category = Literal[
+    "Income",
+    "Housing",
+    "Transportation",
+    "Food & Dining",
+    "Personal Care & Health",
+    "Entertainment & Lifestyle",
+    "Education & Development",
+    "Debt & Loans",
+    "Children/Dependents",
+    "Miscellaneous/Other",
+]
+
+CATEGORIES: tuple[str, ...] = get_args(Category)
+
+# Compact wire code of each category. Codes are strings because Gemini only
+# accepts string enums in response schemas.
+CategoryCode = Literal["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
+_CODES: dict[Category, CategoryCode] = dict(
+    zip(get_args(Category), get_args(CategoryCode))
+)
+_CATEGORIES_BY_CODE: dict[CategoryCode, Category] = {
+    code: category for category, code in _CODES.items()
+}
 
 
 class TransactionEntry(BaseModel):
@@ -9,18 +34,7 @@ class TransactionEntry(BaseModel):
     transaction_detail: str
     amount: str
     currency: str
-    category: Literal[
-        "Income",
-        "Housing",
-        "Transportation",
-        "Food & Dining",
-        "Personal Care & Health",
-        "Entertainment & Lifestyle",
-        "Education & Development",
-        "Debt & Loans",
-        "Children/Dependents",
-        "Miscellaneous/Other",
-    ]
+    category: Category
     service_subscription: Optional[str] = Field(
         default=None, description="Services like Netflix, Spotify, ..."
     )
@@ -29,3 +43,95 @@ class TransactionEntry(BaseModel):
 
 class TransactionHistory(BaseModel):
     transactions: list[TransactionEntry]
+
+    # Entries dropped by validate_response_json: {"index", "error", "data"}
+    _rejected: list[dict[str, Any]] = PrivateAttr(default_factory=list)
+
+
+class CompactTransaction(BaseModel):
+    """A transaction with one-letter keys and the category as a code."""
+
+    # LLM wire format of TransactionEntry (this docstring and the field
+    # descriptions are part of the schema sent); expand() restores it
+
+    d: datetime = Field(description="transaction_date")
+    t: str = Field(description="transaction_detail")
+    a: str = Field(description="amount")
+    c: str = Field(description="currency")
+    k: CategoryCode = Field(
+        description="category code: "
+        + ", ".join(f"{code}={name}" for name, code in _CODES.items())
+    )
+    s: Optional[str] = Field(
+        default=None, description="service_subscription, e.g. Netflix, Spotify"
+    )
+    r: Optional[str] = Field(description="receiver_name")
+
+    @classmethod
+    def from_entry(cls, entry: TransactionEntry) -> "CompactTransaction":
+        return cls(
+            d=entry.transaction_date,
+            t=entry.transaction_detail,
+            a=entry.amount,
+            c=entry.currency,
+            k=_CODES[entry.category],
+            s=entry.service_subscription,
+            r=entry.receiver_name,
+        )
+
+    def expand(self) -> TransactionEntry:
+        return TransactionEntry(
+            transaction_date=self.d,
+            transaction_detail=self.t,
+            amount=self.a,
+            currency=self.c,
+            category=_CATEGORIES_BY_CODE[self.k],
+            service_subscription=self.s,
+            receiver_name=self.r,
+        )
+
+
+class CompactTransactionHistory(BaseModel):
+    transactions: list[CompactTransaction]
+
+    _rejected: list[dict[str, Any]] = PrivateAttr(default_factory=list)
+
+    @classmethod
+    def from_history(cls, history: TransactionHistory) -> "CompactTransactionHistory":
+        return cls(
+            transactions=[
+                CompactTransaction.from_entry(e) for e in history.transactions
+            ]
+        )
+
+    def expand(self) -> TransactionHistory:
+        history = TransactionHistory(
+            transactions=[entry.expand() for entry in self.transactions]
+        )
+        history._rejected = self._rejected
+        return history
+
+
+class PackedDocument(BaseModel):
+    document_id: str
+    transactions: list[TransactionEntry]
+
+
+class PackedTransactionHistory(BaseModel):
+    """Transactions of several statements sent in one request, per document."""
+
+    documents: list[PackedDocument]
+
+
+# What a request for a single statement produces
+StatementOutput = Union[TransactionHistory, CompactTransactionHistory]
+
+# What ``send_prompt`` can be asked to produce
+TransactionOutput = Union[StatementOutput, PackedTransactionHistory]
+
+
+def expand_output(response: StatementOutput) -> TransactionHistory:
+    """Return the full ``TransactionHistory`` of a single-statement response."""
+    if isinstance(response, CompactTransactionHistory):
+        return response.expand()
+    return response
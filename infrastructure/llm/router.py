@@ -0,0 +1,227 @@
+import logging
+import re
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from .base import LLMProvider
+from .pydantic_models.transactions import (
+    StatementOutput,
+    TransactionHistory,
+    TransactionOutput,
+)
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_RE = re.compile(r"\d[\d.,]*\d|\d")
+
+
+def is_table_heavy(text: str, threshold: float = 0.4) -> bool:
+    """Heuristic: most non-empty lines look like table rows.
+
+    A line counts as a row when it contains column delimiters (``|`` or tab)
+    or at least three numeric tokens such as dates and amounts.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return False
+    rows = sum(
+        1
+        for line in lines
+        if "|" in line or "\t" in line or len(_NUMBER_RE.findall(line)) >= 3
+    )
+    return rows / len(lines) >= threshold
+
+
+@dataclass
+class RouteBackend:
+    """One provider/model the router may send prompts to.
+
+    Backends are tiered by ``max_input_chars``: a statement goes to the
+    smallest tier that can hold it, ``None`` meaning no upper bound.
+    """
+
+    name: str
+    provider: LLMProvider
+    max_input_chars: Optional[int] = None
+    allow_tables: bool = True
+    timeout: Optional[float] = None
+
+    # Runtime health, updated by the router
+    latency_ewma: Optional[float] = field(default=None, repr=False)
+    consecutive_failures: int = field(default=0, repr=False)
+    unhealthy_until: float = field(default=0.0, repr=False)
+
+    def accepts(self, size: int, table_heavy: bool) -> bool:
+        """Check whether the backend is eligible for the given input."""
+        if table_heavy and not self.allow_tables:
+            return False
+        return self.max_input_chars is None or size <= self.max_input_chars
+
+
+class RoutingProvider(LLMProvider):
+    """LLMProvider that picks a backend per statement and fails over.
+
+    Short statements go to the cheapest tier that accepts them; long or
+    table-heavy ones go to a stronger model. Inside a tier, backends are
+    ordered by observed latency (seconds per 1k input characters, EWMA) and
+    recently failing backends are moved to the back of the queue. When a
+    backend errors or exceeds its timeout the next candidate is tried,
+    including backends of larger tiers.
+    """
+
+    def __init__(
+        self,
+        backends: list[RouteBackend],
+        *,
+        latency_alpha: float = 0.3,
+        failure_cooldown: float = 30.0,
+    ) -> None:
+        super().__init__()
+        if not backends:
+            raise ValueError("RoutingProvider requires at least one backend")
+        self.backends = sorted(
+            backends,
+            key=lambda b: (
+                float("inf") if b.max_input_chars is None else b.max_input_chars
+            ),
+        )
+        self.latency_alpha = latency_alpha
+        self.failure_cooldown = failure_cooldown
+        self.provider_name = "router"
+        self.model = ",".join(b.name for b in self.backends)
+        self.temperature = self.backends[0].provider.temperature
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(thread_name_prefix="llm-route")
+        logger.info(f"Initialized routing provider with backends: {self.model}")
+
+    def create_prompt(self, system_prompt: str, user_content: str) -> dict[str, Any]:
+        """Keep the raw parts; each backend builds its own prompt format."""
+        return {"system_prompt": system_prompt, "user_content": user_content}
+
+    def candidates(self, user_content: str) -> list[RouteBackend]:
+        """Return backends in the order they should be tried for this input."""
+        size = len(user_content)
+        table_heavy = is_table_heavy(user_content)
+        now = time.monotonic()
+
+        eligible = [b for b in self.backends if b.accepts(size, table_heavy)]
+        if not eligible:
+            # Nothing claims this size; fall back to the largest tiers
+            eligible = list(reversed(self.backends))
+
+        def rank(backend: RouteBackend) -> tuple[bool, float, float]:
+            tier = (
+                float("inf")
+                if backend.max_input_chars is None
+                else float(backend.max_input_chars)
+            )
+            # Unmeasured backends sort first so every backend gets sampled
+            latency = backend.latency_ewma or 0.0
+            return (backend.unhealthy_until > now, tier, latency)
+
+        with self._lock:
+            return sorted(eligible, key=rank)
+
+    def _record_success(self, backend: RouteBackend, elapsed: float, size: int) -> None:
+        per_kchar = elapsed / max(1.0, size / 1000.0)
+        with self._lock:
+            if backend.latency_ewma is None:
+                backend.latency_ewma = per_kchar
+            else:
+                backend.latency_ewma = (
+                    self.latency_alpha * per_kchar
+                    + (1 - self.latency_alpha) * backend.latency_ewma
+                )
+            backend.consecutive_failures = 0
+            backend.unhealthy_until = 0.0
+
+    def _record_failure(self, backend: RouteBackend) -> None:
+        with self._lock:
+            backend.consecutive_failures += 1
+            backend.unhealthy_until = time.monotonic() + min(
+                self.failure_cooldown * backend.consecutive_failures,
+                self.failure_cooldown * 10,
+            )
+
+    def _call_backend(
+        self,
+        backend: RouteBackend,
+        prompt: dict[str, Any],
+        output_format: type[TransactionOutput],
+    ) -> TransactionOutput:
+        backend_prompt = backend.provider.create_prompt(
+            prompt["system_prompt"], prompt["user_content"]
+        )
+        if backend.timeout is None:
+            return backend.provider.send_prompt(backend_prompt, output_format)
+        future = self._executor.submit(
+            backend.provider.send_prompt, backend_prompt, output_format
+        )
+        try:
+            return future.result(timeout=backend.timeout)
+        except FutureTimeoutError as e:
+            raise TimeoutError(
+                f"Backend '{backend.name}' exceeded {backend.timeout}s"
+            ) from e
+
+    def send_prompt(
+        self,
+        prompt: dict[str, Any],
+        output_format: type[TransactionOutput] = TransactionHistory,
+    ) -> TransactionOutput:
+        """Send prompt to the best backend, failing over on errors or timeouts."""
+        size = len(prompt["user_content"])
+        errors: list[str] = []
+        for backend in self.candidates(prompt["user_content"]):
+            started = time.monotonic()
+            try:
+                response = self._call_backend(backend, prompt, output_format)
+            except Exception as e:
+                self._record_failure(backend)
+                errors.append(f"{backend.name}: {e}")
+                logger.warning(f"Backend '{backend.name}' failed, failing over: {e}")
+                continue
+            self._record_success(backend, time.monotonic() - started, size)
+            logger.info(f"Routed {size} chars to backend '{backend.name}'")
+            return response
+        raise RuntimeError(f"All LLM backends failed: {'; '.join(errors)}")
+
+    def stream_prompt(
+        self,
+        prompt: dict[str, Any],
+        output_format: type[StatementOutput] = TransactionHistory,
+    ) -> Iterator[str]:
+        """Stream from the best backend, failing over until output starts.
+
+        Backend timeouts are not applied to streams.
+        """
+        size = len(prompt["user_content"])
+        errors: list[str] = []
+        for backend in self.candidates(prompt["user_content"]):
+            backend_prompt = backend.provider.create_prompt(
+                prompt["system_prompt"], prompt["user_content"]
+            )
+            started = time.monotonic()
+            emitted = False
+            try:
+                for chunk in backend.provider.stream_prompt(
+                    backend_prompt, output_format
+                ):
+                    emitted = True
+                    yield chunk
+            except Exception as e:
+                self._record_failure(backend)
+                if emitted:
+                    raise
+                errors.append(f"{backend.name}: {e}")
+                logger.warning(f"Backend '{backend.name}' failed, failing over: {e}")
+                continue
+            self._record_success(backend, time.monotonic() - started, size)
+            logger.info(f"Streamed {size} chars from backend '{backend.name}'")
+            return
+        raise RuntimeError(f"All LLM backends failed: {'; '.join(errors)}")
@@ -0,0 +1,170 @@
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+from pydantic import ValidationError
+
+from .pydantic_models.transactions import (
+    CompactTransaction,
+    TransactionEntry,
+)
+from .validation import RejectedEntry, get_adapter
+
+logger = logging.getLogger(__name__)
+
+_ARRAY_START_RE = re.compile(r'"transactions"\s*:\s*\[')
+
+
+class IncrementalTransactionParser:
+    """Incrementally parse a streamed ``TransactionHistory`` JSON document.
+
+    Feed raw text deltas as they arrive; every element of the
+    ``transactions`` array is validated as ``entry_model`` and returned as
+    soon as its closing brace is seen (compact entries expanded). Elements
+    that fail validation are collected in ``rejected`` instead of ending
+    the stream; ``count`` is the number of elements seen. Only the
+    unfinished element is kept in memory.
+    """
+
+    def __init__(self, entry_model: type = TransactionEntry) -> None:
+        self.entry_model = entry_model
+        self.count = 0
+        self.rejected: list[RejectedEntry] = []
+        self._buffer = ""
+        self._in_array = False
+        self._done = False
+        # Scanner state for the element currently being read
+        self._scan_pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        """True once the closing bracket of the array has been seen."""
+        return self._done
+
+    def feed(self, chunk: str) -> list[TransactionEntry]:
+        """Consume a text delta and return the entries it completed."""
+        if self._done:
+            return []
+        self._buffer += chunk
+
+        if not self._in_array:
+            match = _ARRAY_START_RE.search(self._buffer)
+            if match is None:
+                # Keep a short tail in case the key is split across chunks
+                self._buffer = self._buffer[-32:]
+                return []
+            self._buffer = self._buffer[match.end() :]
+            self._in_array = True
+
+        entries: list[TransactionEntry] = []
+        buffer = self._buffer
+        i = self._scan_pos
+        while i < len(buffer):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0 and ch == "{":
+                    self._start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0 and ch == "]":
+                    self._done = True
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._start is not None:
+                    entry = self._validate(buffer[self._start : i + 1])
+                    if entry is not None:
+                        entries.append(entry)
+                    buffer = buffer[i + 1 :]
+                    self._start = None
+                    i = 0
+                    continue
+            i += 1
+
+        self._buffer = buffer
+        self._scan_pos = i
+        return entries
+
+    def _validate(self, raw: str) -> Optional[TransactionEntry]:
+        index = self.count
+        self.count += 1
+        try:
+            entry = get_adapter(self.entry_model).validate_json(raw)
+        except ValidationError as e:
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError:
+                data = raw
+            self.rejected.append(RejectedEntry.from_error(index, data, e))
+            logger.warning(
+                f"Dropped invalid transaction #{index}: {self.rejected[-1].error}"
+            )
+            return None
+        if isinstance(entry, CompactTransaction):
+            return entry.expand()
+        return entry  # type: ignore[no-any-return]
+
+
+class JsonTransactionSink:
+    """Write transactions to the output JSON file as they are produced.
+
+    The file has the same ``{"transactions": [...]}`` shape as
+    ``LLMProvider.save_result`` and is flushed after every entry, so other
+    processes can follow it while the response is still streaming.
+    Entries set in ``rejected`` before the sink closes are written under
+    ``rejected_transactions``.
+    """
+
+    def __init__(self, output_path: Path) -> None:
+        self.output_path = output_path
+        self.count = 0
+        self.rejected: list[dict[str, Any]] = []
+        self._file: Optional[TextIO] = None
+
+    def __enter__(self) -> "JsonTransactionSink":
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.output_path, "w", encoding="utf-8")
+        self._file.write('{\n  "transactions": [')
+        self._file.flush()
+        return self
+
+    def write(self, transaction: dict[str, Any]) -> None:
+        """Append one serialized transaction to the file."""
+        assert self._file is not None, "sink must be used as a context manager"
+        body = json.dumps(transaction, ensure_ascii=False, indent=2)
+        body = "\n".join(f"    {line}" for line in body.splitlines())
+        self._file.write(("," if self.count else "") + "\n" + body)
+        self._file.flush()
+        self.count += 1
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        assert self._file is not None
+        if exc_type is not None:
+            # Don't leave a truncated file that looks like a complete result
+            self._file.close()
+            self._file = None
+            self.output_path.unlink(missing_ok=True)
+            return
+        self._file.write("\n  ]" if self.count else "]")
+        if self.rejected:
+            body = json.dumps(self.rejected, ensure_ascii=False, indent=2)
+            body = "\n".join(f"  {line}" for line in body.splitlines())
+            self._file.write(',\n  "rejected_transactions": ' + body.lstrip())
+        self._file.write("\n}")
+        self._file.close()
+        self._file = None
+        logger.info(f"Streamed {self.count} transactions to {self.output_path}")
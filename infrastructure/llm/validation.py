@@ -0,0 +1,133 @@
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from functools import cache
+from typing import Any, Optional, Union, get_args
+
+from pydantic import TypeAdapter, ValidationError
+
+from .pydantic_models.transactions import (
+    PackedTransactionHistory,
+    StatementOutput,
+    TransactionHistory,
+    TransactionOutput,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RejectedEntry:
+    """A transaction of the response that failed validation."""
+
+    index: int
+    error: str
+    data: Any = field(repr=False)
+
+    @classmethod
+    def from_error(
+        cls, index: int, data: Any, error: ValidationError
+    ) -> "RejectedEntry":
+        details = "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'entry'}: {err['msg']}"
+            for err in error.errors()
+        )
+        return cls(index, details, data)
+
+
+class ResponseValidationError(ValueError):
+    """Raised when an LLM response cannot be turned into transactions."""
+
+    def __init__(self, message: str, rejected: Optional[list[RejectedEntry]] = None):
+        super().__init__(message)
+        self.rejected = rejected or []
+
+
+@cache
+def get_adapter(model: type) -> TypeAdapter:
+    """Return a TypeAdapter for ``model``, building its validator only once."""
+    return TypeAdapter(model)
+
+
+def entry_model(output_format: type[StatementOutput]) -> type:
+    """The model of one element of ``output_format``'s transaction list."""
+    model: type = get_args(output_format.model_fields["transactions"].annotation)[0]
+    return model
+
+
+def check_rejected(rejected: list[RejectedEntry], total: int, max_ratio: float) -> None:
+    """Fail when more than ``max_ratio`` of ``total`` entries were rejected.
+
+    Raises:
+        ResponseValidationError: Too many transactions failed validation
+    """
+    if rejected and len(rejected) > max_ratio * total:
+        raise ResponseValidationError(
+            f"{len(rejected)} of {total} transactions failed validation "
+            f"(first: #{rejected[0].index} {rejected[0].error})",
+            rejected,
+        )
+
+
+def validate_response_json(
+    raw: Union[str, bytes],
+    output_format: type[TransactionOutput] = TransactionHistory,
+    *,
+    max_rejected_ratio: float = 0.0,
+) -> TransactionOutput:
+    """Validate raw response JSON straight into ``output_format``.
+
+    The whole document is validated in one pass from the JSON text, with no
+    intermediate dicts. If that fails, the transactions are validated one by
+    one: invalid entries are dropped as long as they are at most
+    ``max_rejected_ratio`` of the response (none by default), otherwise the
+    response is rejected. Dropped entries are logged and kept in the
+    result's ``_rejected`` list so callers can report them.
+
+    Raises:
+        ResponseValidationError: The response is not JSON, has no
+            transaction list, or has too many invalid transactions
+    """
+    try:
+        output: TransactionOutput = get_adapter(output_format).validate_json(raw)
+        return output
+    except ValidationError as e:
+        first_error = e.errors()[0]
+        if first_error["type"] == "json_invalid":
+            raise ResponseValidationError(
+                f"Response is not valid JSON: {first_error['msg']}"
+            ) from e
+        if issubclass(output_format, PackedTransactionHistory):
+            # Only flat transaction lists can be salvaged entry by entry
+            raise ResponseValidationError(
+                f"Response does not match {output_format.__name__}"
+            ) from e
+    return _salvage_transactions(raw, output_format, max_rejected_ratio)
+
+
+def _salvage_transactions(
+    raw: Union[str, bytes],
+    output_format: type[StatementOutput],
+    max_rejected_ratio: float,
+) -> StatementOutput:
+    """Validate the transactions of a response one by one, dropping invalid ones."""
+    document = json.loads(raw)
+    entries = document.get("transactions") if isinstance(document, dict) else None
+    if not isinstance(entries, list):
+        raise ResponseValidationError("Response has no 'transactions' list")
+
+    entry_adapter = get_adapter(entry_model(output_format))
+    valid: list[Any] = []
+    rejected: list[RejectedEntry] = []
+    for index, entry in enumerate(entries):
+        try:
+            valid.append(entry_adapter.validate_python(entry))
+        except ValidationError as e:
+            rejected.append(RejectedEntry.from_error(index, entry, e))
+
+    check_rejected(rejected, len(entries), max_rejected_ratio)
+    for entry in rejected:
+        logger.warning(f"Dropped invalid transaction #{entry.index}: {entry.error}")
+    history: StatementOutput = output_format(transactions=valid)
+    history._rejected = [asdict(entry) for entry in rejected]
+    return history
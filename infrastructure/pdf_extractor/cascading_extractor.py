@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import fitz
+
+from services.pdf_extractor import PDFExtractor, PDFSource
+from services.text_compactor import looks_like_transaction
+
+from .layout import open_pdf
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PageQuality:
+    """Quality signals of one extracted page."""
+
+    chars: int
+    garbled_ratio: float
+    numeric_rows: int
+    score: float
+
+
+def _is_garbled(ch: str) -> bool:
+    code = ord(ch)
+    return (
+        ch == "�"  # replacement character
+        or 0xE000 <= code <= 0xF8FF  # private use area (unmapped glyphs)
+        or (code < 32 and ch not in "\t\n\r\f")
+    )
+
+
+def score_page(
+    text: str,
+    *,
+    min_chars: int = 40,
+    max_garbled_ratio: float = 0.05,
+    no_numbers_factor: float = 0.6,
+) -> PageQuality:
+    """Score extracted page text between 0 (unusable) and 1.
+
+    The score is the product of:
+
+    - text density: non-whitespace characters relative to ``min_chars``
+      (scanned pages give little or no text),
+    - cleanliness: 1 minus the share of garbled glyphs (replacement and
+      private-use characters, control characters, pdfminer ``(cid:N)``
+      codes) relative to ``max_garbled_ratio``,
+    - structure: ``no_numbers_factor`` when no line looks like a
+      transaction row (date or amount), else 1.
+    """
+    visible = [ch for ch in text if not ch.isspace()]
+    chars = len(visible)
+    garbled = sum(1 for ch in visible if _is_garbled(ch)) + 5 * text.count("(cid:")
+    garbled_ratio = min(1.0, garbled / chars) if chars else 1.0
+    numeric_rows = sum(1 for line in text.splitlines() if looks_like_transaction(line))
+
+    density = min(1.0, chars / min_chars) if min_chars else 1.0
+    cleanliness = max(0.0, 1.0 - garbled_ratio / max_garbled_ratio)
+    structure = 1.0 if numeric_rows else no_numbers_factor
+    return PageQuality(
+        chars, garbled_ratio, numeric_rows, density * cleanliness * structure
+    )
+
+
+def select_pages(
+    source: PDFSource, pages: list[int], password: str | None = None
+) -> bytes:
+    """Build an unencrypted PDF holding only the given 0-based pages."""
+    with open_pdf(source) as doc:
+        if doc.needs_pass and not doc.authenticate(password or ""):
+            raise ValueError("Wrong password or insufficient privileges")
+        doc.select(pages)
+        data: bytes = doc.tobytes(encryption=fitz.PDF_ENCRYPT_NONE)
+        return data
+
+
+class CascadingExtractor(PDFExtractor):
+    """Run cheap extractors first and escalate only the pages they fail on.
+
+    The first tier extracts every page. Pages scoring below ``min_score``
+    (see ``score_page``) are copied into a smaller PDF and re-extracted by
+    the next tier, and so on; a page keeps whichever tier's text scored
+    best. A tier that errors is skipped. How many files (by the most
+    expensive tier used) and pages each tier handled is available from
+    ``tier_counts``.
+    """
+
+    def __init__(
+        self,
+        tiers: list[tuple[str, PDFExtractor]],
+        *,
+        min_score: float = 0.5,
+        min_chars: int = 40,
+        max_garbled_ratio: float = 0.05,
+        no_numbers_factor: float = 0.6,
+    ) -> None:
+        if not tiers:
+            raise ValueError("CascadingExtractor requires at least one tier")
+        self.tiers = tiers
+        self.min_score = min_score
+        self.min_chars = min_chars
+        self.max_garbled_ratio = max_garbled_ratio
+        self.no_numbers_factor = no_numbers_factor
+        self._file_counts: Counter[str] = Counter()
+        self._page_counts: Counter[str] = Counter()
+        self._counts_lock = threading.Lock()
+
+    def _score(self, text: str) -> PageQuality:
+        return score_page(
+            text,
+            min_chars=self.min_chars,
+            max_garbled_ratio=self.max_garbled_ratio,
+            no_numbers_factor=self.no_numbers_factor,
+        )
+
+    def cache_options(self) -> dict[str, Any]:
+        """Thresholds plus every tier's fingerprint."""
+        options = super().cache_options()
+        options["tiers"] = [
+            {"name": name, **extractor.cache_fingerprint()}
+            for name, extractor in self.tiers
+        ]
+        return options
+
+    def warm_up(self) -> None:
+        """Warm up every tier."""
+        for _, extractor in self.tiers:
+            extractor.warm_up()
+
+    def tier_counts(self) -> dict[str, dict[str, int]]:
+        """Files and pages handled by each tier so far."""
+        with self._counts_lock:
+            return {
+                name: {
+                    "files": self._file_counts[name],
+                    "pages": self._page_counts[name],
+                }
+                for name, _ in self.tiers
+            }
+
+    def extract(self, pdf_bytes: bytes, *, password: str | None = None) -> str:
+        """Extract text, escalating low-quality pages to stronger tiers.
+
+        Args:
+            pdf_bytes: PDF file content as bytes
+            password: Optional password for encrypted PDFs
+
+        Returns:
+            Extracted text content
+        """
+        return "\f".join(self.iter_pages(pdf_bytes, password=password))
+
+    def iter_pages(
+        self, source: PDFSource, *, password: str | None = None
+    ) -> Iterator[str]:
+        """Yield page text in order once every tier has had its turn.
+
+        Page texts are held until escalation finishes, since a later page
+        may replace an earlier one; the PDFs themselves are still streamed
+        by each tier.
+
+        Args:
+            source: PDF file path or content as bytes
+            password: Optional password for encrypted PDFs
+
+        Yields:
+            Text of one page
+        """
+        _, first = self.tiers[0]
+        pages = list(first.iter_pages(source, password=password))
+        scores = [self._score(text) for text in pages]
+        page_tiers = [0] * len(pages)
+
+        for tier_index, (name, extractor) in enumerate(self.tiers[1:], 1):
+            failing = [i for i, q in enumerate(scores) if q.score < self.min_score]
+            if not failing:
+                break
+            logger.info(f"Escalating {len(failing)} page(s) to {name}")
+            try:
+                subset = select_pages(source, failing, password)
+                retried = list(extractor.iter_pages(subset))
+            except Exception as e:
+                logger.warning(f"Extractor tier '{name}' failed, skipping: {e}")
+                continue
+            for page_index, text in zip(failing, retried):
+                quality = self._score(text)
+                if quality.score > scores[page_index].score:
+                    pages[page_index] = text
+                    scores[page_index] = quality
+                    page_tiers[page_index] = tier_index
+
+        with self._counts_lock:
+            top_tier = max(page_tiers, default=0)
+            self._file_counts[self.tiers[top_tier][0]] += 1
+            for tier_index in page_tiers:
+                self._page_counts[self.tiers[tier_index][0]] += 1
+
+        low = sum(1 for q in scores if q.score < self.min_score)
+        if low:
+            logger.warning(f"{low} page(s) still below quality threshold")
+        yield from pages
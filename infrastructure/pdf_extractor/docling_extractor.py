@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import logging
+import tempfile
+import threading
+from collections.abc import Iterator
+from contextlib import ExitStack
 from io import BytesIO
+from pathlib import Path
+from typing import Any
 
 import fitz
 from docling.datamodel.base_models import DocumentStream, InputFormat
 from docling.datamodel.pipeline_options import EasyOcrOptions, PdfPipelineOptions
 from docling.document_converter import DocumentConverter, PdfFormatOption
 
-from services.pdf_extractor import PDFExtractor
+from services.pdf_extractor import PDFExtractor, PDFSource
+
+from .layout import open_pdf
+from .ocr_extractor import OCRExtractor
 
 logger = logging.getLogger(__name__)
 
@@ -20,14 +29,87 @@ class ExtractionError(Exception):
 
 
 class DoclingExtractor(PDFExtractor):
-    """Docling text extraction using detection and OCR models"""
-
-    def __init__(self) -> None:
+    """Docling text extraction using detection and OCR models
+
+    If ``ocr_extractor`` is given, scanned PDFs are handed to it instead of
+    Docling's in-process full-page OCR.
+    """
+
+    library_name = "docling"
+
+    def __init__(
+        self,
+        *,
+        page_batch_size: int = 8,
+        ocr_extractor: OCRExtractor | None = None,
+    ) -> None:
+        self.page_batch_size = page_batch_size
+        self.ocr_extractor = ocr_extractor
         self.pipeline_options = PdfPipelineOptions()
         self.pipeline_options.do_ocr = True
         self.pipeline_options.do_table_structure = True
         self.pipeline_options.table_structure_options.do_cell_matching = True
         self.pipeline_options.ocr_options = EasyOcrOptions(force_full_page_ocr=False)
+        # Converters hold the loaded layout/table/OCR models; build each once
+        self._converters: dict[bool, DocumentConverter] = {}
+        self._converters_lock = threading.Lock()
+
+    def cache_options(self) -> dict[str, Any]:
+        """Pipeline options that change the extracted text."""
+        options: dict[str, Any] = self.pipeline_options.model_dump(
+            mode="json", exclude={"ocr_options"}
+        )
+        # OCR options are a polymorphic model; keep the fields that matter
+        ocr_options = self.pipeline_options.ocr_options
+        options["ocr_options"] = {
+            "kind": getattr(ocr_options, "kind", type(ocr_options).__name__),
+            "lang": list(getattr(ocr_options, "lang", [])),
+            "force_full_page_ocr": ocr_options.force_full_page_ocr,
+        }
+        if self.ocr_extractor is not None:
+            options["scanned"] = self.ocr_extractor.cache_fingerprint()
+        return options
+
+    @staticmethod
+    def _is_scanned(doc: fitz.Document, text_threshold: int = 50) -> bool:
+        """Heuristic check if PDF is scanned (almost no embedded text)."""
+        chars = 0
+        for page in doc:
+            chars += len(page.get_text().strip())
+            if chars >= text_threshold:
+                break
+        is_scanned = chars < text_threshold
+        logger.info(f"PDF is {'scanned' if is_scanned else 'not scanned'}")
+        return is_scanned
+
+    def _make_converter(self, is_scanned: bool) -> DocumentConverter:
+        """Return the converter for this kind of PDF, building it on first use.
+
+        Scanned PDFs get a converter that forces full-page OCR.
+        """
+        with self._converters_lock:
+            converter = self._converters.get(is_scanned)
+            if converter is None:
+                pipeline_options = self.pipeline_options.model_copy(deep=True)
+                # Keep the configured OCR engine and languages
+                pipeline_options.ocr_options.force_full_page_ocr = is_scanned
+                converter = DocumentConverter(
+                    format_options={
+                        InputFormat.PDF: PdfFormatOption(
+                            pipeline_options=pipeline_options,
+                        )
+                    }
+                )
+                self._converters[is_scanned] = converter
+            return converter
+
+    def warm_up(self) -> None:
+        """Load the models of both converters ahead of the first document."""
+        self._make_converter(False).initialize_pipeline(InputFormat.PDF)
+        if self.ocr_extractor is not None:
+            self.ocr_extractor.warm_up()
+        else:
+            self._make_converter(True).initialize_pipeline(InputFormat.PDF)
 
     def extract(self, pdf_bytes: bytes, *, password: str | None = None) -> str:
         """Extract plain text from PDF bytes using Docling.
@@ -45,31 +127,10 @@ class DoclingExtractor(PDFExtractor):
                 if not doc.authenticate(password):
                     raise ValueError("Wrong password or insufficient privileges")
 
-            # Heuristic check if PDF is scanned
-            is_scanned = False
-            text_threshold = 50
-            full_text = "".join(page.get_text() for page in doc).strip()
-            is_scanned = len(full_text) < text_threshold
-
-            logger.info(f"PDF is {'scanned' if is_scanned else 'not scanned'}")
-
-            # Force OCR is scanned
-            if is_scanned:
-                self.pipeline_options.ocr_options = EasyOcrOptions(
-                    force_full_page_ocr=True
-                )
-            else:
-                self.pipeline_options.ocr_options = EasyOcrOptions(
-                    force_full_page_ocr=False
-                )
-
-            converter = DocumentConverter(
-                format_options={
-                    InputFormat.PDF: PdfFormatOption(
-                        pipeline_options=self.pipeline_options,
-                    )
-                }
-            )
+            is_scanned = self._is_scanned(doc)
+            if is_scanned and self.ocr_extractor is not None:
+                return self.ocr_extractor.extract(pdf_bytes, password=password)
+            converter = self._make_converter(is_scanned)
 
             decrypted = doc.tobytes(encryption=fitz.PDF_ENCRYPT_NONE)
             buf = BytesIO(decrypted)
@@ -82,3 +143,51 @@ class DoclingExtractor(PDFExtractor):
         except Exception as exc:
             logger.exception("PDF extraction failed with Docling")
             raise ExtractionError("Failed to extract text from PDF") from exc
+
+    def iter_pages(
+        self, source: PDFSource, *, password: str | None = None
+    ) -> Iterator[str]:
+        """Yield page markdown, converting ``page_batch_size`` pages at a time.
+
+        Only one batch of page images and layout predictions is alive at
+        once. Unencrypted files given by path are converted in place; bytes
+        and encrypted files are spooled to a temporary file instead of being
+        copied in memory.
+
+        Args:
+            source: PDF file path or content as bytes
+            password: Optional password for encrypted PDFs
+
+        Yields:
+            Markdown of one page
+        """
+        try:
+            with ExitStack() as stack:
+                doc = stack.enter_context(open_pdf(source))
+                encrypted = doc.needs_pass
+                if encrypted and not doc.authenticate(password or ""):
+                    raise ValueError("Wrong password or insufficient privileges")
+
+                is_scanned = self._is_scanned(doc)
+                if is_scanned and self.ocr_extractor is not None:
+                    yield from self.ocr_extractor.iter_pages(source, password=password)
+                    return
+                converter = self._make_converter(is_scanned)
+                page_count = doc.page_count
+
+                if isinstance(source, (str, Path)) and not encrypted:
+                    pdf_path = Path(source)
+                else:
+                    tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+                    pdf_path = Path(tmp_dir) / "file.pdf"
+                    doc.save(pdf_path, encryption=fitz.PDF_ENCRYPT_NONE)
+
+                for start in range(1, page_count + 1, self.page_batch_size):
+                    end = min(page_count, start + self.page_batch_size - 1)
+                    result = converter.convert(pdf_path, page_range=(start, end))
+                    for page_no in range(start, end + 1):
+                        yield result.document.export_to_markdown(page_no=page_no)
+
+        except Exception as exc:
+            logger.exception("PDF extraction failed with Docling")
+            raise ExtractionError("Failed to extract text from PDF") from exc
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import fitz  # PyMuPDF
+
+
+@dataclass
+class Word:
+    """A word with its bounding box, as reported by PyMuPDF."""
+
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    text: str
+
+    @property
+    def y_center(self) -> float:
+        return (self.y0 + self.y1) / 2
+
+    @property
+    def x_center(self) -> float:
+        return (self.x0 + self.x1) / 2
+
+
+def open_pdf(source: bytes | str | Path) -> Any:
+    """Open a PDF from bytes or from a path without reading it into memory."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(str(source), filetype="pdf")
+
+
+def page_words(page: Any) -> list[Word]:
+    """Read the words of a ``fitz.Page`` with their positions."""
+    return [
+        Word(x0, y0, x1, y1, text)
+        for x0, y0, x1, y1, text, *_ in page.get_text("words")
+        if text.strip()
+    ]
+
+
+def group_rows(words: list[Word], y_tolerance: float = 3.0) -> list[list[Word]]:
+    """Group words into visual rows (top to bottom, each left to right).
+
+    Words whose vertical centers are within ``y_tolerance`` points of the
+    row's running center belong to the same row, which absorbs the small
+    baseline jitter between columns of the same table line.
+    """
+    rows: list[list[Word]] = []
+    centers: list[float] = []
+    for word in sorted(words, key=lambda w: (w.y_center, w.x0)):
+        if rows and abs(word.y_center - centers[-1]) <= y_tolerance:
+            rows[-1].append(word)
+            row = rows[-1]
+            centers[-1] = sum(w.y_center for w in row) / len(row)
+        else:
+            rows.append([word])
+            centers.append(word.y_center)
+    return [sorted(row, key=lambda w: w.x0) for row in rows]
+
+
+def split_cells(row: list[Word], min_gap: float = 8.0) -> list[list[Word]]:
+    """Split a row into cells wherever the horizontal gap exceeds ``min_gap``."""
+    cells: list[list[Word]] = []
+    for word in row:
+        if cells and word.x0 - cells[-1][-1].x1 <= min_gap:
+            cells[-1].append(word)
+        else:
+            cells.append([word])
+    return cells
+
+
+def join_words(words: list[Word]) -> str:
+    """Join words of a cell or row into text."""
+    return " ".join(word.text for word in words)
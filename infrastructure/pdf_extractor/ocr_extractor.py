@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import logging
+import os
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from services.pdf_extractor import PDFExtractor, PDFSource
+
+from .layout import open_pdf
+
+logger = logging.getLogger(__name__)
+
+# EasyOCR reader of the current worker process, loaded once by the initializer
+_reader: Any = None
+
+
+class ExtractionError(Exception):
+    """Custom domain error for PDF extraction failures."""
+
+    pass
+
+
+def _init_worker(languages: tuple[str, ...]) -> None:
+    global _reader
+    import easyocr
+
+    _reader = easyocr.Reader(list(languages), gpu=False, verbose=False)
+
+
+def _ocr_image(png: bytes, y_tolerance: float) -> str:
+    """OCR one rendered page and rebuild its lines from box positions."""
+    results = _reader.readtext(png, detail=1, paragraph=False)
+    boxes = []
+    for bbox, text, _confidence in results:
+        ys = [point[1] for point in bbox]
+        boxes.append((sum(ys) / len(ys), min(point[0] for point in bbox), text))
+
+    lines: list[list[tuple[float, float, str]]] = []
+    for box in sorted(boxes):
+        if lines and abs(box[0] - lines[-1][0][0]) <= y_tolerance:
+            lines[-1].append(box)
+        else:
+            lines.append([box])
+    return "\n".join(
+        "\t".join(text for _, _, text in sorted(line, key=lambda b: b[1]))
+        for line in lines
+    )
+
+
+class OCRExtractor(PDFExtractor):
+    """CPU OCR of rendered pages on a pool of worker processes.
+
+    Pages are rendered with PyMuPDF at ``dpi`` in this process and OCRed by
+    EasyOCR in ``workers`` processes, each loading the models once when it
+    starts; at most ``2 * workers`` rendered pages are in flight. Results
+    are cached by the SHA-256 of the rendered image, so a page seen before
+    (e.g. a re-sent statement or a repeated cover page) is not OCRed again.
+    Words on one visual line are joined with tabs.
+    """
+
+    library_name = "easyocr"
+
+    def __init__(
+        self,
+        *,
+        dpi: int = 200,
+        workers: int | None = None,
+        languages: tuple[str, ...] = ("vi", "en"),
+        cache_dir: Path | None = None,
+        y_tolerance: float = 12.0,
+    ) -> None:
+        # The workers import EasyOCR; fail here rather than in every worker
+        if importlib.util.find_spec("easyocr") is None:
+            raise ImportError(
+                "OCR extraction needs EasyOCR, which is an optional dependency: "
+                "pip install 'personal-finance-report[ocr]'"
+            )
+        self.dpi = dpi
+        self.workers = workers or os.cpu_count() or 1
+        self.languages = tuple(languages)
+        self.cache_dir = cache_dir
+        self.y_tolerance = y_tolerance
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def cache_options(self) -> dict[str, Any]:
+        """Options that change the OCR text."""
+        return {
+            "dpi": self.dpi,
+            "languages": list(self.languages),
+            "y_tolerance": self.y_tolerance,
+        }
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.languages,),
+                )
+            return self._pool
+
+    def warm_up(self) -> None:
+        """Start the workers so every one loads its models up front."""
+        pool = self._get_pool()
+        futures = [pool.submit(os.getpid) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _cache_path(self, digest: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / digest[:2] / f"{digest}.txt"
+
+    def _cached(self, digest: str) -> str | None:
+        path = self._cache_path(digest)
+        if path is None or not path.exists():
+            return None
+        return path.read_text(encoding="utf-8")
+
+    def _store(self, digest: str, text: str) -> None:
+        path = self._cache_path(digest)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        tmp_path.replace(path)
+
+    def extract(self, pdf_bytes: bytes, *, password: str | None = None) -> str:
+        """OCR every page of PDF bytes.
+
+        Args:
+            pdf_bytes: PDF file content as bytes
+            password: Optional password for encrypted PDFs
+
+        Returns:
+            Extracted text content
+        """
+        return "\f".join(self.iter_pages(pdf_bytes, password=password))
+
+    def iter_pages(
+        self, source: PDFSource, *, password: str | None = None
+    ) -> Iterator[str]:
+        """Yield the OCR text of each page in order.
+
+        Args:
+            source: PDF file path or content as bytes
+            password: Optional password for encrypted PDFs
+
+        Yields:
+            Text of one page
+        """
+        try:
+            with open_pdf(source) as doc:
+                if doc.needs_pass and not doc.authenticate(password or ""):
+                    raise ValueError("Wrong password or insufficient privileges")
+
+                pool = self._get_pool()
+                pending: deque[tuple[str, Future[str] | str]] = deque()
+                in_flight: dict[str, Future[str]] = {}
+                for page in doc:
+                    png = page.get_pixmap(dpi=self.dpi).tobytes("png")
+                    digest = hashlib.sha256(png).hexdigest()
+                    cached = self._cached(digest)
+                    if cached is not None:
+                        pending.append((digest, cached))
+                    else:
+                        if digest not in in_flight:
+                            in_flight[digest] = pool.submit(
+                                _ocr_image, png, self.y_tolerance
+                            )
+                        pending.append((digest, in_flight[digest]))
+
+                    while len(pending) > 2 * self.workers:
+                        yield self._resolve(*pending.popleft())
+                while pending:
+                    yield self._resolve(*pending.popleft())
+
+        except Exception as exc:
+            logger.exception("PDF extraction failed with OCR")
+            raise ExtractionError("Failed to OCR PDF") from exc
+
+    def _resolve(self, digest: str, item: Future[str] | str) -> str:
+        if isinstance(item, str):
+            return item
+        text = item.result()
+        self._store(digest, text)
+        return text
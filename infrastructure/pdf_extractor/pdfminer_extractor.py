@@ -1,11 +1,19 @@
 from __future__ import annotations
 
 import logging
-from io import BytesIO
+from collections.abc import Iterator
+from contextlib import ExitStack
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import BinaryIO
 
+from pdfminer.converter import TextConverter
 from pdfminer.high_level import extract_text
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
 
-from services.pdf_extractor import PDFExtractor
+from services.pdf_extractor import PDFExtractor, PDFSource
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +27,8 @@ class ExtractionError(Exception):
 class PDFMinerExtractor(PDFExtractor):
     """Pure Python PDF text extraction using pdfminer.six."""
 
+    library_name = "pdfminer.six"
+
     def extract(self, pdf_bytes: bytes, *, password: str | None = None) -> str:
         """Extract plain text from PDF bytes using pdfminer.
 
@@ -40,3 +50,38 @@ class PDFMinerExtractor(PDFExtractor):
         except Exception as exc:
             logger.exception("PDF extraction failed with pdfminer")
             raise ExtractionError("Failed to extract text from PDF") from exc
+
+    def iter_pages(
+        self, source: PDFSource, *, password: str | None = None
+    ) -> Iterator[str]:
+        """Yield page text using pdfminer, reading paths through a file handle.
+
+        Args:
+            source: PDF file path or content as bytes
+            password: Optional password for encrypted PDFs
+
+        Yields:
+            Text of one page
+        """
+        try:
+            with ExitStack() as stack:
+                fp: BinaryIO
+                if isinstance(source, (str, Path)):
+                    fp = stack.enter_context(open(source, "rb"))
+                else:
+                    fp = BytesIO(source)
+                output = StringIO()
+                resources = PDFResourceManager()
+                device = stack.enter_context(
+                    TextConverter(resources, output, laparams=LAParams())
+                )
+                interpreter = PDFPageInterpreter(resources, device)
+                for page in PDFPage.get_pages(fp, password=password or ""):
+                    interpreter.process_page(page)
+                    # TextConverter ends each page with a form feed
+                    yield output.getvalue().rstrip("\f")
+                    output.seek(0)
+                    output.truncate()
+        except Exception as exc:
+            logger.exception("PDF extraction failed with pdfminer")
+            raise ExtractionError("Failed to extract text from PDF") from exc
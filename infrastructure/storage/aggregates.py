@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from .normalize import parse_day, signed_amount
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS statement_transactions (
+    source TEXT NOT NULL,
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    amount TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS statement_transactions_source
+    ON statement_transactions (source);
+CREATE INDEX IF NOT EXISTS statement_transactions_month
+    ON statement_transactions (month);
+CREATE TABLE IF NOT EXISTS monthly_aggregates (
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    income TEXT NOT NULL,
+    spending TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (month, category, currency)
+) WITHOUT ROWID;
+"""
+
+
+class MonthlyAggregateStore:
+    """Materialized per-month, per-category totals of all statements.
+
+    Each statement's transactions are stored under its source name, and the
+    aggregates of a month are recomputed from that month's rows only when
+    a statement touching the month is ingested. Re-ingesting a statement
+    replaces its rows, so months it no longer touches are refreshed too.
+    The cost of an update depends on the months involved, not on the size
+    of the history.
+
+    Amounts are summed as ``Decimal`` and stored as text to stay exact.
+    Income and spending are told apart by ``signed_amount``: the
+    ``"Income"`` category is income, everything else spending.
+
+    ``journal_mode="DELETE"`` uses the rollback journal instead of WAL, for
+    a store on shared storage opened by processes on several hosts.
+    """
+
+    def __init__(self, path: Path, *, journal_mode: str = "WAL") -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=30.0, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._conn.close()
+
+    def ingest(self, transactions: list[dict[str, Any]], source: str) -> list[str]:
+        """Replace a statement's transactions and refresh the months involved.
+
+        Args:
+            transactions: Transactions in the output file format
+            source: Identifier of the statement (e.g. its file name)
+
+        Returns:
+            Months (``YYYY-MM``) whose aggregates were recomputed
+        """
+        rows = []
+        for transaction in transactions:
+            try:
+                day = parse_day(transaction["transaction_date"])
+                amount = signed_amount(transaction)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping transaction in aggregates: {e}")
+                continue
+            if amount is None:
+                continue
+            rows.append(
+                (
+                    source,
+                    day.strftime("%Y-%m"),
+                    transaction.get("category") or "Miscellaneous/Other",
+                    (transaction.get("currency") or "").strip().upper(),
+                    str(amount),
+                )
+            )
+
+        with self._lock, self._conn:
+            old_months = {
+                month
+                for (month,) in self._conn.execute(
+                    "SELECT DISTINCT month FROM statement_transactions "
+                    "WHERE source = ?",
+                    (source,),
+                )
+            }
+            self._conn.execute(
+                "DELETE FROM statement_transactions WHERE source = ?", (source,)
+            )
+            self._conn.executemany(
+                "INSERT INTO statement_transactions VALUES (?, ?, ?, ?, ?)", rows
+            )
+            months = sorted(old_months | {row[1] for row in rows})
+            for month in months:
+                self._recompute_month(month)
+        return months
+
+    def _recompute_month(self, month: str) -> None:
+        totals: dict[tuple[str, str], list[Any]] = defaultdict(
+            lambda: [Decimal(0), Decimal(0), 0]
+        )
+        for category, currency, amount in self._conn.execute(
+            "SELECT category, currency, amount FROM statement_transactions "
+            "WHERE month = ?",
+            (month,),
+        ):
+            value = Decimal(amount)
+            total = totals[(category, currency)]
+            if value >= 0:
+                total[0] += value
+            else:
+                total[1] -= value
+            total[2] += 1
+
+        self._conn.execute("DELETE FROM monthly_aggregates WHERE month = ?", (month,))
+        self._conn.executemany(
+            "INSERT INTO monthly_aggregates VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (month, category, currency, str(income), str(spending), count)
+                for (category, currency), (income, spending, count) in totals.items()
+            ],
+        )
+
+    def monthly_summary(
+        self, start: str | None = None, end: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Read the aggregates of months in ``[start, end]`` (``YYYY-MM``)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT month, category, currency, income, spending, count "
+                "FROM monthly_aggregates WHERE month >= ? AND month <= ? "
+                "ORDER BY month, category, currency",
+                (start or "", end or "9999-99"),
+            ).fetchall()
+        return [
+            {
+                "month": month,
+                "category": category,
+                "currency": currency,
+                "income": income,
+                "spending": spending,
+                "net": str(Decimal(income) - Decimal(spending)),
+                "count": count,
+            }
+            for month, category, currency, income, spending, count in rows
+        ]
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from .normalize import detail_tokens, fold_text, parse_amount, parse_day
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    key BLOB PRIMARY KEY,
+    bucket TEXT NOT NULL,
+    receiver TEXT NOT NULL,
+    tokens TEXT NOT NULL,
+    source TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transactions_bucket ON transactions (bucket);
+CREATE INDEX IF NOT EXISTS transactions_source ON transactions (source);
+"""
+
+
+@dataclass
+class DedupResult:
+    """Outcome of checking one statement against the index."""
+
+    unique: list[dict[str, Any]] = field(default_factory=list)
+    # Transactions already ingested, with the source that contributed them
+    duplicates: list[tuple[dict[str, Any], str]] = field(default_factory=list)
+    # Unique transactions that resemble one of another statement, with the
+    # source of the match; kept, only flagged for review
+    near_duplicates: list[tuple[dict[str, Any], str]] = field(default_factory=list)
+
+
+class TransactionDedupIndex:
+    """Persistent index of every ingested transaction, keyed by content.
+
+    Each transaction is normalized to (day, amount, currency, receiver,
+    detail fingerprint) and hashed; the hash is the primary key of a SQLite
+    table, so a lookup is a single index probe regardless of history size
+    and nothing has to be reloaded from the JSON outputs. Only exact key
+    matches are duplicates. When the exact key misses, rows with the same
+    amount and currency within ``date_window_days`` are compared by
+    detail-token similarity, and similar ones (e.g. a description truncated
+    differently by two statements) are reported as near duplicates but
+    kept: the same coffee bought on consecutive days looks just like one.
+
+    Identical transactions inside one statement are legitimate (two equal
+    payments on the same day), so keys include the occurrence number of the
+    key within its statement. Re-ingesting a statement replaces its rows.
+
+    ``journal_mode="DELETE"`` uses the rollback journal instead of WAL, for
+    an index on shared storage opened by processes on several hosts (WAL
+    needs shared memory, which only works on one host).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        fuzzy_threshold: float = 0.8,
+        date_window_days: int = 1,
+        journal_mode: str = "WAL",
+    ) -> None:
+        self.path = path
+        self.fuzzy_threshold = fuzzy_threshold
+        self.date_window_days = date_window_days
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=30.0, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()
+        return int(row[0])
+
+    @staticmethod
+    def _bucket(day: Any, amount: Any, currency: str) -> str:
+        return f"{day.isoformat()}|{amount}|{currency}"
+
+    def _normalize(
+        self, transaction: dict[str, Any]
+    ) -> tuple[str, str, frozenset[str]]:
+        day = parse_day(transaction["transaction_date"])
+        amount = parse_amount(transaction.get("amount"))
+        amount_text = "" if amount is None else format(amount.normalize(), "f")
+        currency = (transaction.get("currency") or "").strip().upper()
+        receiver = fold_text(transaction.get("receiver"))
+        tokens = detail_tokens(transaction.get("transaction_detail"))
+        return self._bucket(day, amount_text, currency), receiver, tokens
+
+    @staticmethod
+    def _key(
+        bucket: str, receiver: str, tokens: frozenset[str], occurrence: int
+    ) -> bytes:
+        raw = "|".join([bucket, receiver, " ".join(sorted(tokens)), str(occurrence)])
+        return hashlib.sha256(raw.encode("utf-8")).digest()
+
+    def _fuzzy_match(
+        self, bucket: str, receiver: str, tokens: frozenset[str], source: str
+    ) -> str | None:
+        """Source of a similar transaction from another statement, if any."""
+        day_text, amount, currency = bucket.split("|")
+        day = parse_day(day_text)
+        buckets = [
+            self._bucket(day + timedelta(days=offset), amount, currency)
+            for offset in range(-self.date_window_days, self.date_window_days + 1)
+        ]
+        placeholders = ",".join("?" * len(buckets))
+        rows = self._conn.execute(
+            f"SELECT receiver, tokens, source FROM transactions "  # nosec B608
+            f"WHERE bucket IN ({placeholders}) AND source != ?",
+            (*buckets, source),
+        ).fetchall()
+        for other_receiver, other_tokens, other_source in rows:
+            if receiver and other_receiver and receiver != other_receiver:
+                continue
+            other = frozenset(other_tokens.split())
+            union = tokens | other
+            if not union or len(tokens & other) / len(union) >= self.fuzzy_threshold:
+                return str(other_source)
+        return None
+
+    def ingest(self, transactions: list[dict[str, Any]], source: str) -> DedupResult:
+        """Split a statement's transactions into new ones and duplicates.
+
+        New transactions are added to the index under ``source``; previous
+        rows of the same source are replaced first.
+
+        Args:
+            transactions: Transactions in the output file format
+            source: Identifier of the statement (e.g. its file name)
+
+        Returns:
+            DedupResult with unique and duplicate transactions, and the
+            unique ones that look like near duplicates
+        """
+        result = DedupResult()
+        occurrences: Counter[bytes] = Counter()
+        rows = []
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions WHERE source = ?", (source,))
+            for transaction in transactions:
+                try:
+                    bucket, receiver, tokens = self._normalize(transaction)
+                except (KeyError, ValueError) as e:
+                    logger.warning(f"Cannot normalize transaction for dedup: {e}")
+                    result.unique.append(transaction)
+                    continue
+
+                base_key = self._key(bucket, receiver, tokens, 0)
+                key = self._key(bucket, receiver, tokens, occurrences[base_key])
+                occurrences[base_key] += 1
+
+                existing = self._conn.execute(
+                    "SELECT source FROM transactions WHERE key = ?", (key,)
+                ).fetchone()
+                if existing:
+                    result.duplicates.append((transaction, str(existing[0])))
+                    continue
+                match = self._fuzzy_match(bucket, receiver, tokens, source)
+                if match is not None:
+                    result.near_duplicates.append((transaction, match))
+
+                result.unique.append(transaction)
+                rows.append((key, bucket, receiver, " ".join(sorted(tokens)), source))
+
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO transactions VALUES (?, ?, ?, ?, ?)", rows
+            )
+        return result
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file in chunks without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Content-addressed cache of extracted PDF text.
+
+    Entries are keyed by the PDF's SHA-256 together with the extractor's
+    fingerprint (class, options, library version), so renaming a file is a
+    hit while editing it, switching ``PDF_ENGINE`` or upgrading the library
+    is a miss. Entries can be gzip-compressed; when ``max_bytes`` is set the
+    least recently used entries (by modification time, refreshed on every
+    hit) are evicted.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        compress: bool = False,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.directory = directory
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(pdf_sha256: str, fingerprint: dict[str, Any]) -> str:
+        """Build the cache key for a PDF digest and extractor fingerprint."""
+        payload = json.dumps(
+            {"pdf": pdf_sha256, "extractor": fingerprint}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        shard = self.directory / key[:2]
+        return shard / f"{key}.txt.gz", shard / f"{key}.txt"
+
+    def get(self, key: str) -> str | None:
+        """Return cached text for ``key`` or None on a miss."""
+        for path in self._paths(key):
+            try:
+                if path.suffix == ".gz":
+                    with gzip.open(path, "rt", encoding="utf-8") as f:
+                        text = f.read()
+                else:
+                    text = path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            os.utime(path)  # mark as recently used
+            return text
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        """Store text for ``key`` and evict old entries if over budget."""
+        compressed_path, plain_path = self._paths(key)
+        path = compressed_path if self.compress else plain_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = text.encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data)
+        # Write to a temp file first so readers never see a partial entry
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+
+        if self.max_bytes is not None:
+            self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for shard in self.directory.iterdir():
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard):
+                    if entry.name.endswith(".tmp"):
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if self.max_bytes is None or total <= self.max_bytes:
+                return
+
+            entries.sort()
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted += 1
+            logger.info(f"Evicted {evicted} extraction cache entries")
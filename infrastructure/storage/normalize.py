@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+_NON_WORD_RE = re.compile(r"[^0-9a-z]+")
+
+
+def fold_text(text: str | None) -> str:
+    """Lowercase, strip Vietnamese diacritics and collapse punctuation."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.replace("đ", "d").replace("Đ", "D"))
+    ascii_text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub(" ", ascii_text.lower()).strip()
+
+
+def detail_tokens(text: str | None) -> frozenset[str]:
+    """Order-insensitive token set used to fingerprint transaction details."""
+    return frozenset(fold_text(text).split())
+
+
+def parse_amount(value: str | float | int | None) -> Decimal | None:
+    """Parse an amount written with either thousands/decimal convention.
+
+    ``"1,000,000"``, ``"1.000.000"`` and ``"1000000"`` all give 1000000;
+    ``"12.50"`` and ``"12,50"`` give 12.5.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    text = "".join(ch for ch in value if ch.isdigit() or ch in "-.,")
+    negative = text.startswith("-") or value.strip().startswith("(")
+    text = text.replace("-", "")
+    if not text:
+        return None
+
+    if "," in text and "." in text:
+        decimal_sep = "," if text.rfind(",") > text.rfind(".") else "."
+    else:
+        sep = "," if "," in text else "." if "." in text else ""
+        # A single separator followed by exactly three digits is a thousands
+        # separator (VND amounts); otherwise it marks decimals
+        if sep and text.count(sep) == 1 and len(text.rsplit(sep, 1)[1]) != 3:
+            decimal_sep = sep
+        else:
+            decimal_sep = ""
+    thousands = {",", "."} - {decimal_sep}
+    for sep in thousands:
+        text = text.replace(sep, "")
+    if decimal_sep:
+        text = text.replace(decimal_sep, ".")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        return None
+    return -amount if negative else amount
+
+
+def signed_amount(transaction: dict[str, Any]) -> Decimal | None:
+    """Amount of an output-format transaction, negative for money going out.
+
+    LLM outputs usually carry unsigned amounts, so the direction comes from
+    the category: ``"Income"`` is money in and every other category money
+    out. An explicitly negative amount is always money out.
+    """
+    amount = parse_amount(transaction.get("amount"))
+    if amount is None:
+        return None
+    if amount < 0 or transaction.get("category") != "Income":
+        return -abs(amount)
+    return amount
+
+
+def parse_day(value: str | datetime | date) -> date:
+    """Return the calendar day of an output-format transaction date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(value.strip().replace("T", " ")[:19]).date()
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ..gdrive.drive_gateway import DriveFile
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    file_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mime_type TEXT NOT NULL,
+    size INTEGER,
+    md5_checksum TEXT,
+    aliases TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, enqueued_at);
+"""
+
+# Columns added after the first release, with their type
+_ADDED_COLUMNS = {"md5_checksum": "TEXT", "aliases": "TEXT"}
+
+
+def _encode_aliases(files: list[DriveFile]) -> str | None:
+    if not files:
+        return None
+    return json.dumps(
+        [[f.id, f.name, f.mime_type, f.size, f.md5_checksum] for f in files]
+    )
+
+
+class WorkQueue:
+    """Work queue of Drive files shared by many worker processes.
+
+    Backed by a SQLite file that every worker opens, e.g. on shared
+    storage. A worker claims a file with a time-limited lease and extends
+    it with heartbeats while it works; if the worker crashes the lease
+    expires and the file goes back to ``pending`` for another worker.
+    Files whose processing failed (or whose lease expired)
+    ``max_attempts`` times are marked ``failed``. A file may carry aliases,
+    copies of it that are not queued themselves and share its result.
+
+    The rollback journal is used instead of WAL because WAL needs shared
+    memory, which only works when all processes are on one host.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3,
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(path), timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self) -> None:
+        """Add the columns a queue created by an older version lacks."""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        for column, column_type in _ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(
+                    f"ALTER TABLE tasks ADD COLUMN {column} {column_type}"  # nosec B608
+                )
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self._conn.close()
+
+    def enqueue(
+        self,
+        files: list[DriveFile],
+        aliases: dict[str, list[DriveFile]] | None = None,
+    ) -> int:
+        """Add files to the queue; return how many were new or changed.
+
+        Known files are left alone unless their size or MD5 changed, in
+        which case they are queued again with a fresh attempt count.
+        ``aliases`` maps a file ID to the copies that share its result;
+        the stored list is replaced on every call.
+        """
+        encoded = {f.id: _encode_aliases((aliases or {}).get(f.id, [])) for f in files}
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO tasks (file_id, name, mime_type, size,
+                                       md5_checksum, aliases,
+                                       enqueued_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (file_id) DO UPDATE SET
+                        name = excluded.name,
+                        size = excluded.size,
+                        md5_checksum = excluded.md5_checksum,
+                        status = 'pending',
+                        attempts = 0,
+                        lease_owner = NULL,
+                        lease_expires = NULL,
+                        error = NULL,
+                        updated_at = excluded.updated_at
+                    WHERE tasks.size IS NOT excluded.size
+                        OR (tasks.md5_checksum IS NOT NULL
+                            AND tasks.md5_checksum IS NOT excluded.md5_checksum)
+                    """,
+                    [
+                        (
+                            f.id,
+                            f.name,
+                            f.mime_type,
+                            f.size,
+                            f.md5_checksum,
+                            encoded[f.id],
+                            now,
+                            now,
+                        )
+                        for f in files
+                    ],
+                )
+                changed = self._conn.total_changes - before
+                self._conn.executemany(
+                    "UPDATE tasks SET aliases = ? "
+                    "WHERE file_id = ? AND aliases IS NOT ?",
+                    [(value, file_id, value) for file_id, value in encoded.items()],
+                )
+                # Files queued before MD5s were recorded only learn theirs
+                self._conn.executemany(
+                    "UPDATE tasks SET md5_checksum = ? "
+                    "WHERE file_id = ? AND md5_checksum IS NULL",
+                    [(f.md5_checksum, f.id) for f in files if f.md5_checksum],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return changed
+
+    def _requeue_expired(self, now: float) -> None:
+        cursor = self._conn.execute(
+            """
+            UPDATE tasks SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                error = CASE WHEN attempts >= ? THEN 'lease expired' ELSE error END,
+                lease_owner = NULL,
+                lease_expires = NULL,
+                updated_at = ?
+            WHERE status = 'leased' AND lease_expires < ?
+            """,
+            (self.max_attempts, self.max_attempts, now, now),
+        )
+        if cursor.rowcount:
+            logger.warning(f"Re-queued {cursor.rowcount} files with expired leases")
+
+    def claim(self, owner: str) -> DriveFile | None:
+        """Lease the oldest pending file to ``owner``, or return None."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._requeue_expired(now)
+                row = self._conn.execute(
+                    """
+                    SELECT file_id, name, mime_type, size, md5_checksum
+                    FROM tasks
+                    WHERE status = 'pending'
+                    ORDER BY enqueued_at, file_id
+                    LIMIT 1
+                    """
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        """
+                        UPDATE tasks SET
+                            status = 'leased',
+                            attempts = attempts + 1,
+                            lease_owner = ?,
+                            lease_expires = ?,
+                            updated_at = ?
+                        WHERE file_id = ?
+                        """,
+                        (owner, now + self.lease_seconds, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        return DriveFile(row[0], row[1], row[2], row[3], md5_checksum=row[4])
+
+    def aliases(self, file_id: str) -> list[DriveFile]:
+        """Return the copies queued along with ``file_id``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT aliases FROM tasks WHERE file_id = ?", (file_id,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return []
+        return [
+            DriveFile(file_id, name, mime_type, size, md5_checksum=md5_checksum)
+            for file_id, name, mime_type, size, md5_checksum in json.loads(row[0])
+        ]
+
+    def _update_leased(self, sql: str, params: tuple, file_id: str, owner: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                f"{sql} WHERE file_id = ? AND lease_owner = ? "  # nosec B608
+                "AND status = 'leased'",
+                (*params, file_id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, file_id: str, owner: str) -> bool:
+        """Extend a lease; return False if ``owner`` no longer holds it."""
+        now = time.time()
+        return self._update_leased(
+            "UPDATE tasks SET lease_expires = ?, updated_at = ?",
+            (now + self.lease_seconds, now),
+            file_id,
+            owner,
+        )
+
+    def complete(self, file_id: str, owner: str) -> bool:
+        """Mark a leased file as done."""
+        return self._update_leased(
+            "UPDATE tasks SET status = 'done', lease_owner = NULL, "
+            "lease_expires = NULL, error = NULL, updated_at = ?",
+            (time.time(),),
+            file_id,
+            owner,
+        )
+
+    def fail(self, file_id: str, owner: str, error: str) -> bool:
+        """Release a leased file after an error, retrying it if attempts remain."""
+        return self._update_leased(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' "
+            "ELSE 'pending' END, lease_owner = NULL, lease_expires = NULL, "
+            "error = ?, updated_at = ?",
+            (self.max_attempts, error, time.time()),
+            file_id,
+            owner,
+        )
+
+    def stats(self) -> dict[str, int]:
+        """Count files per status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ).fetchall()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
@@ -8,15 +8,40 @@ Main script to process bank statements from Google Drive:
 5. Save extracted text
 """
 
+from __future__ import annotations
+
+import hashlib
+import json
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
 from config import app_settings
 from infrastructure.gdrive.drive_gateway import DriveFile
 from infrastructure.gdrive.google_drive_gateway import GoogleDriveGateway
-from infrastructure.llm import LLMFactory
+from infrastructure.layout_parser.layout_parser import LayoutParser
+from infrastructure.llm import (
+    AdaptiveConcurrencyController,
+    ControlledProvider,
+    LLMFactory,
+    LLMProvider,
+    PromptManager,
+    RetryPolicy,
+    StatementPacker,
+)
+from infrastructure.llm.pydantic_models.transactions import TransactionHistory
+from infrastructure.pdf_extractor.cascading_extractor import CascadingExtractor
+from infrastructure.storage.aggregates import MonthlyAggregateStore
+from infrastructure.storage.dedup_index import TransactionDedupIndex
+from infrastructure.storage.extraction_cache import ExtractionCache, file_sha256
+from services.content_dedup import ContentGroup, alias_result, group_by_content
 from services.factory import Settings, make_pdf_extractor
+from services.memory_governor import MemoryGovernor
+from services.pdf_extractor import PDFExtractor
+from services.text_compactor import TextCompactor, estimate_tokens
 
 # Configure logging
 logging.basicConfig(
@@ -26,54 +51,195 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def create_drive_gateway(
+    auth_mode: str,
+    creds_path: str,
+    token_path: str,
+    sa_key: str | None = None,
+) -> GoogleDriveGateway:
+    """Create a Google Drive gateway for one account."""
+    if not os.path.exists(creds_path):
+        raise FileNotFoundError(
+            f"{creds_path} not found. Please download OAuth credentials "
+            "from Google Cloud Console and place them in the project root."
+        )
+
+    logger.info("🔐 Initializing Google Drive connection...")
+
+    options = {
+        "download_workers": app_settings.drive_download_workers,
+        "parallel_threshold": app_settings.drive_parallel_download_mb * 1024 * 1024,
+    }
+    if auth_mode == "oauth":
+        return GoogleDriveGateway.from_oauth(creds_path, token_path, **options)
+    else:
+        if not sa_key:
+            raise ValueError(
+                "Service account key path is required when using service account authentication"
+            )
+        return GoogleDriveGateway.from_service_account(sa_key, **options)
+
+
 class StatementProcessor:
     """Main processor for bank statement files."""
 
-    def __init__(self):
-        self.output_dir = Path(app_settings.output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+    def __init__(
+        self,
+        *,
+        drive_gateway: GoogleDriveGateway | None = None,
+        target_folder_name: str | None = None,
+        output_dir: Path | None = None,
+        llm_output_dir: Path | None = None,
+        pdf_extractor: PDFExtractor | None = None,
+        pdf_engine: str | None = None,
+        llm_provider: LLMProvider | None = None,
+        memory_governor: MemoryGovernor | None = None,
+        llm_prompt_id: str | None = None,
+        shared_storage: bool = False,
+        postprocess_dir: Path | None = None,
+    ):
+        """Create a processor from the app settings.
+
+        Every argument overrides the corresponding setting, which lets
+        several processors (e.g. one per tenant) share one PDF extractor, one
+        LLM provider and one memory budget while reading from different
+        accounts and folders.
+        A processor given its own ``output_dir`` keeps its dedup index there.
+        ``shared_storage`` opens the dedup index and aggregates without WAL,
+        which is unsafe when processes on several hosts share the files.
+        ``postprocess_dir`` holds the dedup index, aggregates and dedup flags
+        instead of ``output_dir``, e.g. to keep an experiment's outputs out
+        of the production stores.
+        The Drive gateway is only connected when first used, so runs over
+        local files need no Drive credentials.
+        """
+        self.output_dir = output_dir or Path(app_settings.output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # Create subdirectories
         (self.output_dir / "pdfs").mkdir(exist_ok=True)
         (self.output_dir / "texts").mkdir(exist_ok=True)
 
         # LLM output directory
-        self.llm_output_dir = Path(app_settings.llm_output_dir)
-        self.llm_output_dir.mkdir(exist_ok=True)
+        self.llm_output_dir = llm_output_dir or Path(app_settings.llm_output_dir)
+        self.llm_output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Initialize components
-        self.drive_gateway = self._init_drive_gateway()
-        self.pdf_extractor = self._init_pdf_extractor()
-        self.llm_provider = self._init_llm_provider()
+        self.target_folder_name = target_folder_name or app_settings.target_folder_name
+        self.llm_prompt_id = llm_prompt_id or app_settings.llm_prompt_id
 
-    def _init_drive_gateway(self) -> GoogleDriveGateway:
-        """Initialize Google Drive gateway."""
-        creds_path = app_settings.gdrive_credentials
-        if not os.path.exists(creds_path):
-            raise FileNotFoundError(
-                f"{creds_path} not found. Please download OAuth credentials "
-                "from Google Cloud Console and place them in the project root."
+        # Initialize components
+        self._drive_gateway = drive_gateway
+        self._drive_init_lock = threading.Lock()
+        self.pdf_extractor = pdf_extractor or self._init_pdf_extractor(pdf_engine)
+        self.llm_provider = llm_provider or self._init_llm_provider()
+        # Packs fill up from statements processed at the same time, so packing
+        # needs several pipeline workers
+        self.packer = (
+            StatementPacker(
+                self.llm_provider,
+                PromptManager().get_prompt(self.llm_prompt_id),
+                estimate_tokens=estimate_tokens,
+                max_tokens=app_settings.llm_pack_max_tokens,
+                max_documents=min(
+                    app_settings.llm_pack_max_documents, app_settings.pipeline_workers
+                ),
+                max_wait=app_settings.llm_pack_max_wait,
             )
+            if app_settings.llm_packing and app_settings.pipeline_workers > 1
+            else None
+        )
+        self.extraction_cache = ExtractionCache(
+            Path(app_settings.extraction_cache_dir)
+            if app_settings.extraction_cache_dir
+            else self.output_dir / "cache" / "extraction",
+            compress=app_settings.extraction_cache_compress,
+            max_bytes=(
+                app_settings.extraction_cache_max_mb * 1024 * 1024
+                if app_settings.extraction_cache_max_mb
+                else None
+            ),
+        )
+        self.layout_parser = LayoutParser() if app_settings.layout_parser else None
+        self.memory = memory_governor or MemoryGovernor(
+            (
+                app_settings.memory_budget_mb * 1024 * 1024
+                if app_settings.memory_budget_mb
+                else None
+            ),
+            pdf_factor=app_settings.memory_pdf_factor,
+        )
+        # Dedup and aggregation state, normally next to the outputs
+        self.postprocess_dir = postprocess_dir or self.output_dir
+        own_stores = output_dir is not None or postprocess_dir is not None
+        # WAL needs shared memory, so only processes on one host can share it
+        journal_mode = "DELETE" if shared_storage else "WAL"
+        self.dedup_index = (
+            TransactionDedupIndex(
+                Path(app_settings.dedup_index_path)
+                if app_settings.dedup_index_path and not own_stores
+                else self.postprocess_dir / "dedup_index.sqlite3",
+                journal_mode=journal_mode,
+            )
+            if app_settings.dedup_index
+            else None
+        )
+        self.aggregates = (
+            MonthlyAggregateStore(
+                Path(app_settings.aggregates_path)
+                if app_settings.aggregates_path and not own_stores
+                else self.postprocess_dir / "aggregates.sqlite3",
+                journal_mode=journal_mode,
+            )
+            if app_settings.aggregates
+            else None
+        )
+        self.text_compactor = (
+            TextCompactor(tables=app_settings.text_compaction_tables)
+            if app_settings.text_compaction
+            else None
+        )
 
-        logger.info("🔐 Initializing Google Drive connection...")
+    @property
+    def drive_gateway(self) -> GoogleDriveGateway:
+        """Drive gateway, connected on first use."""
+        with self._drive_init_lock:
+            if self._drive_gateway is None:
+                self._drive_gateway = self._init_drive_gateway()
+            return self._drive_gateway
 
-        if app_settings.gdrive_auth_mode == "oauth":
-            return GoogleDriveGateway.from_oauth(
-                app_settings.gdrive_credentials, app_settings.gdrive_token
-            )
-        else:
-            if not app_settings.gdrive_sa_key:
-                raise ValueError(
-                    "Service account key path is required when using service account authentication"
-                )
-            return GoogleDriveGateway.from_service_account(app_settings.gdrive_sa_key)
+    def _init_drive_gateway(self) -> GoogleDriveGateway:
+        """Initialize Google Drive gateway."""
+        return create_drive_gateway(
+            app_settings.gdrive_auth_mode,
+            app_settings.gdrive_credentials,
+            app_settings.gdrive_token,
+            app_settings.gdrive_sa_key,
+        )
 
-    def _init_pdf_extractor(self):
+    def _init_pdf_extractor(self, pdf_engine: str | None = None):
         """Initialize PDF extractor."""
-        settings = Settings(pdf_engine=app_settings.pdf_engine)
+        settings = Settings(
+            pdf_engine=pdf_engine or app_settings.pdf_engine,
+            pymupdf_mode=app_settings.pymupdf_mode,
+            # The text compactor needs form feeds to see page boundaries
+            pymupdf_joiner="\f" if app_settings.text_compaction else "\n",
+            ocr_mode=app_settings.ocr_mode,
+            ocr_dpi=app_settings.ocr_dpi,
+            ocr_workers=app_settings.ocr_workers,
+            ocr_languages=tuple(
+                lang.strip()
+                for lang in app_settings.ocr_languages.split(",")
+                if lang.strip()
+            ),
+            ocr_cache_dir=(
+                Path(app_settings.ocr_cache_dir)
+                if app_settings.ocr_cache_dir
+                else self.output_dir / "cache" / "ocr"
+            ),
+        )
         return make_pdf_extractor(settings)
 
-    def _init_llm_provider(self):
+    def _init_llm_provider(self) -> LLMProvider:
         """Initialize LLM provider."""
         logger.info(f"🤖 Initializing LLM provider: {app_settings.llm_provider}")
 
@@ -86,17 +252,54 @@ class StatementProcessor:
                 host=app_settings.langfuse_host,
             )
 
-        return LLMFactory.create_provider(
-            base_url=app_settings.llm_base_url,
-            provider_type=app_settings.llm_provider,
-            api_key=app_settings.llm_api_key,
-            model=app_settings.llm_model,
-            temperature=app_settings.llm_temperature,
+        if app_settings.llm_routes:
+
+            def wrap(provider: LLMProvider, route: dict[str, Any]) -> LLMProvider:
+                # Each vendor has its own quota, so each gets its own controller
+                controller = self._make_controller(route["max_retries"])
+                return ControlledProvider(provider, controller)
+
+            provider: LLMProvider = LLMFactory.create_routing_provider(
+                [
+                    {
+                        **route.model_dump(),
+                        "max_rejected_ratio": app_settings.llm_max_rejected_ratio,
+                    }
+                    for route in app_settings.llm_routes
+                ],
+                wrap=wrap,
+            )
+        else:
+            provider = ControlledProvider(
+                LLMFactory.create_provider(
+                    base_url=app_settings.llm_base_url,
+                    provider_type=app_settings.llm_provider,
+                    api_key=app_settings.llm_api_key,
+                    model=app_settings.llm_model,
+                    temperature=app_settings.llm_temperature,
+                    max_rejected_ratio=app_settings.llm_max_rejected_ratio,
+                ),
+                self._make_controller(app_settings.llm_max_retries),
+            )
+        provider.compact_output = app_settings.llm_compact_output
+        # The streaming path checks the ratio on the outermost provider
+        provider.max_rejected_ratio = app_settings.llm_max_rejected_ratio
+        return provider
+
+    def _make_controller(self, max_retries: int) -> AdaptiveConcurrencyController:
+        """Create a concurrency controller from the app settings."""
+        return AdaptiveConcurrencyController(
+            initial_limit=app_settings.llm_initial_concurrency,
+            max_limit=app_settings.llm_max_concurrency,
+            target_latency=app_settings.llm_target_latency,
+            request_timeout=app_settings.llm_request_timeout,
+            hedge=app_settings.llm_hedge_requests,
+            retry_policy=RetryPolicy(max_attempts=max_retries),
         )
 
     def find_target_folder(self) -> DriveFile:
         """Find the target folder in Google Drive."""
-        folder_name = app_settings.target_folder_name
+        folder_name = self.target_folder_name
         logger.info(f"📁 Searching for '{folder_name}' folder...")
 
         folder_query = f"name = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder'"
@@ -127,10 +330,16 @@ class StatementProcessor:
         return files
 
     def download_file(self, file: DriveFile) -> Path:
-        """Download a file and save it locally."""
+        """Download a file and save it locally.
+
+        The Drive ID, size and MD5 of the local copy are recorded next to it
+        in ``<name>.drive.json``; the copy is reused only while they match
+        the Drive file, so a file changed on Drive is downloaded again.
+        """
         pdf_path = self.output_dir / "pdfs" / file.name
+        meta_path = pdf_path.with_name(f"{pdf_path.name}.drive.json")
 
-        if pdf_path.exists():
+        if pdf_path.exists() and self._is_current_copy(file, meta_path):
             logger.info(f"⏭️  Skipping download: {file.name} (already exists)")
             return pdf_path
 
@@ -138,51 +347,118 @@ class StatementProcessor:
 
         try:
             # Use download_to_file method for direct file saving
+            meta_path.unlink(missing_ok=True)
             self.drive_gateway.download_to_file(file.id, pdf_path)
-            logger.info(f"✅ Downloaded: {file.name} ({pdf_path.stat().st_size} bytes)")
+            digest = hashlib.md5(usedforsecurity=False)
+            with open(pdf_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            meta = {
+                "id": file.id,
+                "size": pdf_path.stat().st_size,
+                "md5_checksum": digest.hexdigest(),
+            }
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            logger.info(f"✅ Downloaded: {file.name} ({meta['size']} bytes)")
             return pdf_path
         except Exception as e:
             logger.error(f"❌ Failed to download {file.name}: {e}")
             raise
 
-    def extract_text(self, pdf_path: Path, file_name: str) -> str:
-        """Extract text from a PDF file."""
-        # Create text filename (replace .pdf with .txt)
-        text_filename = file_name.replace(".pdf", ".txt")
-        text_path = self.output_dir / "texts" / text_filename
+    @staticmethod
+    def _is_current_copy(file: DriveFile, meta_path: Path) -> bool:
+        """Check the recorded local copy against the Drive file's metadata.
 
-        # Check if text file already exists
-        if text_path.exists():
-            logger.info(f"⏭️  Skipping extraction: {file_name} (text already exists)")
-            text = text_path.read_text(encoding="utf-8")
+        Without an MD5 or size from Drive the copy cannot be checked, so it
+        counts as stale.
+        """
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if meta.get("id") != file.id:
+            return False
+        if file.md5_checksum is not None:
+            return bool(meta.get("md5_checksum") == file.md5_checksum)
+        if file.size is not None:
+            return bool(meta.get("size") == file.size)
+        return False
+
+    def parse_with_layout(
+        self, pdf_path: Path, file_name: str, result: dict
+    ) -> TransactionHistory | None:
+        """Read the transactions of a known-bank statement by template.
+
+        Returns the transactions, categorized by sign only, when the running
+        balance reconciles; or None when the statement should go through
+        text extraction and the LLM: no template matches, too few rows were
+        found, or too few balances reconcile with the amounts.
+        """
+        if self.layout_parser is None:
+            return None
+
+        try:
+            parsed = self.layout_parser.parse(
+                pdf_path, password=app_settings.pdf_password
+            )
+        except Exception as e:
+            logger.warning(f"⚠️  Layout parser failed for {file_name}: {e}")
+            return None
+
+        if parsed is None:
+            return None
+        if len(parsed.rows) < app_settings.layout_parser_min_rows:
             logger.info(
-                f"✅ Loaded existing text: {len(text)} characters from {text_filename}"
+                f"↩️  Layout parser found {len(parsed.rows)} rows in {file_name}, "
+                "sending it to the LLM"
             )
-            return text
+            return None
+        if parsed.confidence < app_settings.layout_parser_min_confidence:
+            logger.info(
+                f"↩️  Layout parser reconciled {parsed.confidence:.0%} of "
+                f"{file_name}, sending it to the LLM"
+            )
+            return None
 
-        logger.info(f"📄 Extracting text from: {file_name}")
+        result["parser"] = f"layout:{parsed.template_id}"
+        logger.info(
+            f"⚡ Parsed {file_name} with '{parsed.template_id}' template "
+            f"({len(parsed.rows)} rows, {parsed.confidence:.0%} reconciled), "
+            "skipping the LLM"
+        )
+        return parsed.to_history()
 
-        # Check if text file already exists
-        if text_path.exists():
-            logger.info(f"⏭️  Skipping extraction: {file_name} (text already exists)")
-            text = text_path.read_text(encoding="utf-8")
+    def extract_text(self, pdf_path: Path, file_name: str) -> str:
+        """Extract text from a PDF file, reusing cached text when possible."""
+        cache_key = ExtractionCache.make_key(
+            file_sha256(pdf_path), self.pdf_extractor.cache_fingerprint()
+        )
+        text = self.extraction_cache.get(cache_key)
+        if text is not None:
             logger.info(
-                f"✅ Loaded existing text: {len(text)} characters from {text_filename}"
+                f"⏭️  Skipping extraction: {file_name} (cached, {len(text)} characters)"
             )
             return text
 
+        logger.info(f"📄 Extracting text from: {file_name}")
+
         try:
-            pdf_bytes = pdf_path.read_bytes()
-            text = self.pdf_extractor.extract(
-                pdf_bytes, password=app_settings.pdf_password
+            # Stream pages from the file instead of loading the whole PDF
+            pages = self.pdf_extractor.iter_pages(
+                pdf_path, password=app_settings.pdf_password
             )
+            text = self.pdf_extractor.joiner.join(pages)
 
             logger.info(f"✅ Extracted {len(text)} characters from {file_name}")
-            return text
         except Exception as e:
             logger.error(f"❌ Failed to extract text from {file_name}: {e}")
             raise
 
+        self.extraction_cache.put(cache_key, text)
+        return text
+
     def save_text(self, text: str, file_name: str) -> Path:
         """Save extracted text to a file."""
         # Create text filename (replace .pdf with .txt)
@@ -193,6 +469,22 @@ class StatementProcessor:
         logger.info(f"💾 Saved text: {text_path}")
         return text_path
 
+    def compact_text(self, text: str, file_name: str, result: dict) -> str:
+        """Strip repeated headers, boilerplate and padding before the LLM."""
+        if self.text_compactor is None:
+            return text
+
+        compaction = self.text_compactor.compact(text)
+        result["input_tokens"] = compaction.original_tokens
+        result["compacted_tokens"] = compaction.compacted_tokens
+        logger.info(
+            f"📉 Compacted {file_name}: ~{compaction.original_tokens} -> "
+            f"~{compaction.compacted_tokens} tokens "
+            f"(-{compaction.token_reduction:.0%}, "
+            f"{compaction.removed_lines} lines removed)"
+        )
+        return compaction.text
+
     def process_with_llm(self, text: str, file_name: str) -> Path:
         """Process text with LLM to extract structured transaction data."""
         # Create JSON filename (replace .pdf with .json)
@@ -202,57 +494,262 @@ class StatementProcessor:
         logger.info(f"🤖 Processing with LLM: {file_name}")
 
         try:
+            # Small statements share a request with others when packing is on
+            if (
+                self.packer is not None
+                and estimate_tokens(text) <= app_settings.llm_pack_max_doc_tokens
+            ):
+                history = self.packer.submit(text, file_name)
+                if history is not None:
+                    result = self.llm_provider.extract_json_from_response(history)
+                    self.llm_provider.save_result(result, json_path)
+                    logger.info(f"✅ LLM processing complete (packed): {json_path}")
+                    return json_path
+
             # Process text with LLM using prompt ID from config
-            self.llm_provider.process_text_file(
-                text_content=text,
-                system_prompt_or_id=app_settings.llm_prompt_id,
-                output_path=json_path,
-                use_prompt_library=True,
-            )
+            if app_settings.llm_streaming:
+                self.llm_provider.process_text_file_streaming(
+                    text_content=text,
+                    system_prompt_or_id=self.llm_prompt_id,
+                    output_path=json_path,
+                    use_prompt_library=True,
+                )
+            else:
+                self.llm_provider.process_text_file(
+                    text_content=text,
+                    system_prompt_or_id=self.llm_prompt_id,
+                    output_path=json_path,
+                    use_prompt_library=True,
+                )
             logger.info(f"✅ LLM processing complete: {json_path}")
             return json_path
         except Exception as e:
             logger.error(f"❌ LLM processing failed for {file_name}: {e}")
             raise
 
+    def deduplicate(self, json_path: Path, file_name: str, result: dict) -> None:
+        """Remove transactions that other statements already contributed.
+
+        Removed duplicates and kept near duplicates are listed, with the
+        statement they match, in ``dedup_flags`` of the postprocess directory.
+        """
+        if self.dedup_index is None:
+            return
+
+        with open(json_path, encoding="utf-8") as f:
+            output = json.load(f)
+        dedup = self.dedup_index.ingest(output["transactions"], source=file_name)
+        result["duplicates"] = len(dedup.duplicates)
+        result["near_duplicates"] = len(dedup.near_duplicates)
+        if dedup.duplicates:
+            self.llm_provider.save_result(
+                {**output, "transactions": dedup.unique}, json_path
+            )
+            logger.info(
+                f"🧹 Removed {len(dedup.duplicates)} duplicate transactions from "
+                f"{file_name}"
+            )
+
+        flags_path = self.postprocess_dir / "dedup_flags" / json_path.name
+        if dedup.duplicates or dedup.near_duplicates:
+            flags = {
+                "duplicates": [
+                    {"transaction": transaction, "duplicate_of": source}
+                    for transaction, source in dedup.duplicates
+                ],
+                "near_duplicates": [
+                    {"transaction": transaction, "similar_in": source}
+                    for transaction, source in dedup.near_duplicates
+                ],
+            }
+            flags_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(flags_path, "w", encoding="utf-8") as f:
+                json.dump(flags, f, ensure_ascii=False, indent=2)
+            result["dedup_flags_path"] = str(flags_path)
+            if dedup.near_duplicates:
+                logger.info(
+                    f"🚩 Flagged {len(dedup.near_duplicates)} possible duplicates "
+                    f"in {file_name}: {flags_path}"
+                )
+        else:
+            flags_path.unlink(missing_ok=True)
+
+    def report_rejected(self, json_path: Path, file_name: str, result: dict) -> None:
+        """Count the transactions the LLM returned that failed validation.
+
+        They are not in ``transactions``; the output lists them, with the
+        validation error, under ``rejected_transactions``.
+        """
+        with open(json_path, encoding="utf-8") as f:
+            output = json.load(f)
+        rejected = output.get("rejected_transactions", [])
+        result["rejected_transactions"] = len(rejected)
+        if rejected:
+            logger.warning(
+                f"⚠️  {len(rejected)} transactions of {file_name} failed "
+                f"validation and were left out: {json_path}"
+            )
+
+    def update_aggregates(self, json_path: Path, file_name: str, result: dict) -> None:
+        """Recompute the monthly aggregates affected by this statement."""
+        if self.aggregates is None:
+            return
+
+        with open(json_path, encoding="utf-8") as f:
+            output = json.load(f)
+        months = self.aggregates.ingest(output["transactions"], source=file_name)
+        result["months"] = months
+        logger.info(
+            f"📅 Updated aggregates for {len(months)} month(s) from {file_name}"
+        )
+
     def process_file(self, file: DriveFile) -> dict:
         """Process a single file: download -> extract -> save -> LLM."""
         logger.info(f"\n🔄 Processing: {file.name}")
 
-        result = {
-            "file_name": file.name,
-            "file_id": file.id,
+        result = self._new_result(file.name, file.id)
+
+        try:
+            # Wait until the file fits in the memory budget
+            with self.memory.admit(file.size or 0):
+                # Download PDF
+                with self.memory.stage("download"):
+                    pdf_path = self.download_file(file)
+                result["pdf_path"] = str(pdf_path)
+
+                self._process_pdf(pdf_path, file.name, result)
+
+        except Exception as e:
+            result["error"] = str(e)
+            logger.error(f"❌ Failed to process {file.name}: {e}")
+
+        return result
+
+    def process_local_file(self, pdf_path: Path, file_name: str) -> dict:
+        """Process a PDF that is already on disk (e.g. an uploaded file)."""
+        logger.info(f"\n🔄 Processing: {file_name}")
+
+        result = self._new_result(file_name, None)
+        result["pdf_path"] = str(pdf_path)
+
+        try:
+            with self.memory.admit(pdf_path.stat().st_size):
+                self._process_pdf(pdf_path, file_name, result)
+        except Exception as e:
+            result["error"] = str(e)
+            logger.error(f"❌ Failed to process {file_name}: {e}")
+
+        return result
+
+    @staticmethod
+    def _new_result(file_name: str, file_id: str | None) -> dict:
+        return {
+            "file_name": file_name,
+            "file_id": file_id,
             "success": False,
             "error": None,
             "pdf_path": None,
             "text_path": None,
             "json_path": None,
             "text_length": 0,
+            "parser": "llm",
         }
 
-        try:
-            # Download PDF
-            pdf_path = self.download_file(file)
-            result["pdf_path"] = str(pdf_path)
-
-            # Extract text
-            text = self.extract_text(pdf_path, file.name)
+    def _process_pdf(self, pdf_path: Path, file_name: str, result: dict) -> None:
+        """Run a local PDF through extraction, the LLM and deduplication."""
+        # Known bank layouts are read by template instead of the LLM
+        with self.memory.stage("layout"):
+            history = self.parse_with_layout(pdf_path, file_name, result)
+        if history is not None:
+            json_path = self.llm_output_dir / file_name.replace(".pdf", ".json")
+            self.llm_provider.save_result(
+                self.llm_provider.extract_json_from_response(history), json_path
+            )
+        else:
+            with self.memory.stage("extract"):
+                text = self.extract_text(pdf_path, file_name)
             result["text_length"] = len(text)
+            self.memory.note_text(len(text.encode("utf-8")))
 
             # Save text
-            text_path = self.save_text(text, file.name)
+            text_path = self.save_text(text, file_name)
             result["text_path"] = str(text_path)
 
-            # Process with LLM
-            json_path = self.process_with_llm(text, file.name)
-            result["json_path"] = str(json_path)
+            # Compact extracted text and process with LLM
+            with self.memory.stage("llm"):
+                text = self.compact_text(text, file_name, result)
+                json_path = self.process_with_llm(text, file_name)
+        result["json_path"] = str(json_path)
+
+        self.postprocess(json_path, file_name, result)
+
+        result["success"] = True
+        logger.info(f"✅ Successfully processed: {file_name}")
+
+    def postprocess(self, json_path: Path, file_name: str, result: dict) -> None:
+        """Deduplicate an LLM output and fold it into the aggregates."""
+        with self.memory.stage("postprocess"):
+            # Surface transactions dropped by response validation
+            self.report_rejected(json_path, file_name, result)
+
+            # Drop transactions already ingested from other statements
+            self.deduplicate(json_path, file_name, result)
+
+            # Refresh the monthly totals of the months this statement touches
+            self.update_aggregates(json_path, file_name, result)
+
+    def extract_local(self, pdf_path: Path) -> dict:
+        """Run only the extraction stage on a downloaded PDF."""
+        file_name = pdf_path.name
+        result = self._new_result(file_name, None)
+        result["pdf_path"] = str(pdf_path)
+
+        try:
+            with self.memory.admit(pdf_path.stat().st_size):
+                with self.memory.stage("extract"):
+                    text = self.extract_text(pdf_path, file_name)
+            result["text_length"] = len(text)
+            result["text_path"] = str(self.save_text(text, file_name))
+            result["success"] = True
+        except Exception as e:
+            result["error"] = str(e)
+            logger.error(f"❌ Failed to extract {file_name}: {e}")
+
+        return result
 
+    def llm_from_text(self, text_path: Path) -> dict:
+        """Run the LLM stage (and post-processing) on a saved text."""
+        file_name = text_path.with_suffix(".pdf").name
+        result = self._new_result(file_name, None)
+        result["text_path"] = str(text_path)
+
+        try:
+            text = text_path.read_text(encoding="utf-8")
+            result["text_length"] = len(text)
+            with self.memory.stage("llm"):
+                text = self.compact_text(text, file_name, result)
+                json_path = self.process_with_llm(text, file_name)
+            result["json_path"] = str(json_path)
+            self.postprocess(json_path, file_name, result)
             result["success"] = True
-            logger.info(f"✅ Successfully processed: {file.name}")
+        except Exception as e:
+            result["error"] = str(e)
+            logger.error(f"❌ Failed to process {file_name} with LLM: {e}")
+
+        return result
 
+    def postprocess_local(self, json_path: Path) -> dict:
+        """Run only deduplication and aggregation on a saved LLM output."""
+        file_name = json_path.with_suffix(".pdf").name
+        result = self._new_result(file_name, None)
+        result["json_path"] = str(json_path)
+
+        try:
+            self.postprocess(json_path, file_name, result)
+            result["success"] = True
         except Exception as e:
             result["error"] = str(e)
-            logger.error(f"❌ Failed to process {file.name}: {e}")
+            logger.error(f"❌ Failed to post-process {file_name}: {e}")
 
         return result
 
@@ -260,31 +757,18 @@ class StatementProcessor:
         """Process all files in the target folder."""
         logger.info("🚀 Starting bank statement processing pipeline...")
 
-        summary = {"total_files": 0, "successful": 0, "failed": 0, "results": []}
-
         try:
             # Find target folder
             folder = self.find_target_folder()
 
             # List PDF files
             files = self.list_pdf_files(folder)
-            summary["total_files"] = len(files)
 
             if not files:
                 logger.warning("⚠️  No PDF files found to process")
-                return summary
+                return {"total_files": 0, "successful": 0, "failed": 0, "results": []}
 
-            # Process each file
-            for i, file in enumerate(files, 1):
-                logger.info(f"\n📊 Progress: {i}/{len(files)}")
-
-                result = self.process_file(file)
-                summary["results"].append(result)
-
-                if result["success"]:
-                    summary["successful"] += 1
-                else:
-                    summary["failed"] += 1
+            summary = self.process_files(files)
 
             # Print final summary
             self.print_summary(summary)
@@ -295,12 +779,102 @@ class StatementProcessor:
 
         return summary
 
+    def process_files(self, files: list[DriveFile]) -> dict:
+        """Process the given files, in parallel when configured."""
+        summary = {
+            "total_files": len(files),
+            "successful": 0,
+            "failed": 0,
+            "content_duplicates": 0,
+            "results": [],
+        }
+
+        # Copies of the same PDF (by Drive MD5 and size) are processed once
+        if app_settings.content_dedup:
+            groups = group_by_content(files)
+        else:
+            groups = [ContentGroup(file) for file in files]
+        unique = [group.primary for group in groups]
+        summary["content_duplicates"] = len(files) - len(unique)
+        if summary["content_duplicates"]:
+            logger.info(
+                f"🪞 {summary['content_duplicates']} files are copies of other "
+                f"files; processing {len(unique)} unique statements"
+            )
+
+        workers = max(1, app_settings.pipeline_workers)
+        if workers == 1:
+            unique_results = []
+            for i, file in enumerate(unique, 1):
+                logger.info(f"\n📊 Progress: {i}/{len(unique)}")
+                unique_results.append(self.process_file(file))
+        else:
+            logger.info(f"⚙️  Processing with {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                unique_results = list(executor.map(self.process_file, unique))
+
+        results_by_id = {}
+        for group, result in zip(groups, unique_results):
+            results_by_id[group.primary.id] = result
+            for alias in group.aliases:
+                results_by_id[alias.id] = alias_result(result, alias)
+        results = [results_by_id[file.id] for file in files]
+
+        for result in results:
+            summary["results"].append(result)
+
+            if result["success"]:
+                summary["successful"] += 1
+            else:
+                summary["failed"] += 1
+
+        summary["memory"] = self.memory.report()
+        return summary
+
     def print_summary(self, summary: dict):
         """Print processing summary."""
         logger.info("\n📊 Processing Summary:")
         logger.info(f"  Total files: {summary['total_files']}")
         logger.info(f"  Successful: {summary['successful']}")
         logger.info(f"  Failed: {summary['failed']}")
+        if summary.get("content_duplicates"):
+            logger.info(
+                f"  Duplicate copies (processed once): {summary['content_duplicates']}"
+            )
+
+        rejected = sum(r.get("rejected_transactions", 0) for r in summary["results"])
+        if rejected:
+            logger.info(f"  Transactions failing validation (left out): {rejected}")
+
+        input_tokens = sum(r.get("input_tokens", 0) for r in summary["results"])
+        compacted_tokens = sum(r.get("compacted_tokens", 0) for r in summary["results"])
+        if input_tokens:
+            logger.info(
+                f"  Input tokens: ~{input_tokens} -> ~{compacted_tokens} "
+                f"(-{1 - compacted_tokens / input_tokens:.0%})"
+            )
+        if isinstance(self.pdf_extractor, CascadingExtractor):
+            for tier, counts in self.pdf_extractor.tier_counts().items():
+                logger.info(
+                    f"  Extractor {tier}: {counts['files']} files, "
+                    f"{counts['pages']} pages"
+                )
+        memory = summary.get("memory")
+        if memory:
+            budget = (
+                f" of {memory['budget_mb']} MB budget" if memory["budget_mb"] else ""
+            )
+            logger.info(
+                f"  Peak memory: {memory['peak_rss_mb']} MB RSS{budget}, "
+                f"{memory['peak_in_flight_mb']} MB of PDFs/text in flight"
+            )
+            for stage, peak in memory["stage_peak_rss_mb"].items():
+                logger.info(f"    {stage}: {peak} MB")
+            if memory["admission_waits"]:
+                logger.info(
+                    f"  Admission waits: {memory['admission_waits']} "
+                    f"({memory['admission_wait_seconds']}s)"
+                )
         logger.info(f"  Output directory: {self.output_dir.absolute()}")
 
         if summary["failed"] > 0:
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Distributed processing over a shared work queue.
+
+    python run_distributed.py coordinator   # list the folder into the queue
+    python run_distributed.py worker        # claim and process files
+
+Run one coordinator and any number of workers, on any hosts that can open
+WORK_QUEUE_PATH. Workers hold a lease on each file and renew it while they
+work; files of crashed workers are picked up again once the lease expires.
+For the outputs to end up in one place, OUTPUT_DIR and LLM_OUTPUT_DIR
+should point at shared storage as well; the dedup index and aggregates
+there are then opened with the rollback journal instead of WAL.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import threading
+from pathlib import Path
+
+from config import app_settings
+from infrastructure.gdrive.drive_gateway import DriveFile
+from infrastructure.llm.langfuse_wrapper import LangfuseWrapper
+from infrastructure.storage.work_queue import WorkQueue
+from main import StatementProcessor
+from services.content_dedup import alias_result, group_by_content
+
+logger = logging.getLogger(__name__)
+
+
+def open_queue() -> WorkQueue:
+    """Open the shared work queue configured in the app settings."""
+    path = (
+        Path(app_settings.work_queue_path)
+        if app_settings.work_queue_path
+        else Path(app_settings.output_dir) / "work_queue.sqlite3"
+    )
+    return WorkQueue(
+        path,
+        lease_seconds=app_settings.work_queue_lease_seconds,
+        max_attempts=app_settings.work_queue_max_attempts,
+    )
+
+
+def run_coordinator(processor: StatementProcessor, queue: WorkQueue) -> None:
+    """List the target folder and enqueue new or changed files."""
+    files = processor.list_pdf_files(processor.find_target_folder())
+    aliases: dict[str, list[DriveFile]] = {}
+    if app_settings.content_dedup:
+        # Copies of the same PDF are queued once, as aliases of the first
+        groups = group_by_content(files)
+        files = [group.primary for group in groups]
+        aliases = {group.primary.id: group.aliases for group in groups}
+    added = queue.enqueue(files, aliases)
+    logger.info(f"📥 Enqueued {added} new or changed files; queue: {queue.stats()}")
+
+
+def process_leased(
+    processor: StatementProcessor, queue: WorkQueue, file: DriveFile, owner: str
+) -> list[dict]:
+    """Process one leased file, renewing the lease until it is done.
+
+    Returns the file's result followed by one for each of its aliases.
+    """
+    done = threading.Event()
+
+    def keep_alive() -> None:
+        while not done.wait(queue.lease_seconds / 3):
+            if not queue.heartbeat(file.id, owner):
+                logger.warning(f"⚠️  Lost lease on {file.name}")
+                return
+
+    heartbeat = threading.Thread(target=keep_alive, daemon=True)
+    heartbeat.start()
+    try:
+        result = processor.process_file(file)
+    finally:
+        done.set()
+        heartbeat.join()
+
+    if not result["success"]:
+        queue.fail(file.id, owner, result["error"] or "unknown error")
+        return [result]
+    queue.complete(file.id, owner)
+    aliases = queue.aliases(file.id)
+    if aliases:
+        logger.info(f"🪞 {file.name} also stands for {len(aliases)} copies")
+    return [result] + [alias_result(result, alias) for alias in aliases]
+
+
+def run_worker(
+    processor: StatementProcessor,
+    queue: WorkQueue,
+    *,
+    poll_interval: float | None = None,
+) -> list[dict]:
+    """Claim and process files until the queue is empty.
+
+    With ``poll_interval`` the worker keeps waiting for new files instead.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    results: list[dict] = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def loop(slot: int) -> None:
+        slot_owner = f"{owner}:{slot}"
+        while not stop.is_set():
+            file = queue.claim(slot_owner)
+            if file is None:
+                if poll_interval is None:
+                    return
+                stop.wait(poll_interval)
+                continue
+            logger.info(f"🔒 {slot_owner} leased {file.name}")
+            file_results = process_leased(processor, queue, file, slot_owner)
+            with lock:
+                results.extend(file_results)
+
+    workers = max(1, app_settings.pipeline_workers)
+    threads = [threading.Thread(target=loop, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        logger.info("🛑 Stopping after the files in progress...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("role", choices=["coordinator", "worker"])
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=None,
+        help="keep polling every N seconds instead of exiting when idle",
+    )
+    args = parser.parse_args()
+
+    processor = StatementProcessor(shared_storage=True)
+    queue = open_queue()
+    try:
+        if args.role == "coordinator":
+            run_coordinator(processor, queue)
+            return
+
+        results = run_worker(processor, queue, poll_interval=args.poll)
+        successful = sum(1 for result in results if result["success"])
+        processor.print_summary(
+            {
+                "total_files": len(results),
+                "successful": successful,
+                "failed": len(results) - successful,
+                "content_duplicates": sum(
+                    1 for result in results if "duplicate_of" in result
+                ),
+                "results": results,
+            }
+        )
+        logger.info(f"📦 Queue: {queue.stats()}")
+    finally:
+        queue.close()
+        LangfuseWrapper.flush()
+
+
+if __name__ == "__main__":
+    main()
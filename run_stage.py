@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Re-run a single pipeline stage over local artifacts, without Google Drive.
+
+    python run_stage.py extract [--engine docling]   # OUTPUT_DIR/pdfs -> texts
+    python run_stage.py llm [--prompt-id ID]         # OUTPUT_DIR/texts -> JSON
+    python run_stage.py postprocess                  # LLM JSON -> dedup, totals
+
+Every stage takes ``--glob`` (repeatable, matched against file names),
+``--limit``, ``--workers`` (defaults to PIPELINE_WORKERS) and ``--dry-run``,
+which only lists the files and where their outputs would go. Re-extraction
+reuses the extraction cache unless the engine or its options changed. The
+``llm`` stage can write to another directory with ``--llm-output-dir`` so a
+prompt experiment does not overwrite the current outputs; the ``llm`` and
+``postprocess`` stages then keep their dedup index, aggregates and dedup
+flags in that directory too, leaving the production stores untouched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from config import app_settings
+from infrastructure.llm.langfuse_wrapper import LangfuseWrapper
+from main import StatementProcessor
+
+logger = logging.getLogger(__name__)
+
+# Stage name -> (input directory, input suffix, output directory, output suffix)
+STAGES = {
+    "extract": ("pdfs", ".pdf", "texts", ".txt"),
+    "llm": ("texts", ".txt", "llm", ".json"),
+    "postprocess": ("llm", ".json", None, None),
+}
+
+
+def select_files(
+    directory: Path, suffix: str, patterns: list[str], limit: int | None
+) -> list[Path]:
+    """Files in ``directory`` with ``suffix`` whose names match any pattern."""
+    files = [
+        path
+        for path in sorted(directory.glob(f"*{suffix}"))
+        if any(fnmatch.fnmatch(path.name, pattern) for pattern in patterns)
+    ]
+    return files[:limit] if limit else files
+
+
+def run_parallel(
+    fn: Callable[[Path], dict], files: list[Path], workers: int
+) -> list[dict]:
+    """Apply a stage to every file with ``workers`` threads, keeping order."""
+    if workers <= 1:
+        results = []
+        for i, path in enumerate(files, 1):
+            logger.info(f"\n📊 Progress: {i}/{len(files)}")
+            results.append(fn(path))
+        return results
+
+    logger.info(f"⚙️  Processing with {workers} workers")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fn, files))
+
+
+def main() -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("stage", choices=list(STAGES))
+    parser.add_argument(
+        "--glob",
+        action="append",
+        default=None,
+        help="file name pattern, e.g. 'VPBank_2024*' (repeatable; default all)",
+    )
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--workers", type=int, default=max(1, app_settings.pipeline_workers)
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--engine",
+        choices=["pymupdf", "pdfminer", "docling", "cascade", "ocr"],
+        default=None,
+        help="PDF engine for the extract stage (default PDF_ENGINE)",
+    )
+    parser.add_argument(
+        "--prompt-id",
+        default=None,
+        help="prompt for the llm stage (default LLM_PROMPT_ID)",
+    )
+    parser.add_argument(
+        "--llm-output-dir",
+        type=Path,
+        default=None,
+        help="where the llm stage writes and postprocess reads (default LLM_OUTPUT_DIR)",
+    )
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="skip files whose output already exists",
+    )
+    args = parser.parse_args()
+
+    output_dir = Path(app_settings.output_dir)
+    llm_output_dir = args.llm_output_dir or Path(app_settings.llm_output_dir)
+    directories = {
+        "pdfs": output_dir / "pdfs",
+        "texts": output_dir / "texts",
+        "llm": llm_output_dir,
+    }
+    input_name, input_suffix, output_name, output_suffix = STAGES[args.stage]
+
+    def output_path(path: Path) -> Path | None:
+        if output_name is None:
+            return None
+        return (directories[output_name] / path.name).with_suffix(output_suffix)
+
+    files = select_files(
+        directories[input_name], input_suffix, args.glob or ["*"], args.limit
+    )
+    if args.skip_existing and output_name is not None:
+        files = [path for path in files if not output_path(path).exists()]
+    logger.info(
+        f"📋 {len(files)} files for the {args.stage} stage in {directories[input_name]}"
+    )
+
+    if args.dry_run:
+        for path in files:
+            target = output_path(path)
+            logger.info(f"  {path.name}" + (f" -> {target}" if target else ""))
+        return {"total_files": len(files), "successful": 0, "failed": 0, "results": []}
+
+    processor = StatementProcessor(
+        llm_output_dir=llm_output_dir,
+        pdf_engine=args.engine,
+        llm_prompt_id=args.prompt_id,
+        postprocess_dir=args.llm_output_dir,
+    )
+    stage_fn = {
+        "extract": processor.extract_local,
+        "llm": processor.llm_from_text,
+        "postprocess": processor.postprocess_local,
+    }[args.stage]
+
+    try:
+        if args.stage == "extract":
+            processor.pdf_extractor.warm_up()
+        results = run_parallel(stage_fn, files, args.workers)
+    finally:
+        LangfuseWrapper.flush()
+
+    successful = sum(1 for result in results if result["success"])
+    summary = {
+        "total_files": len(results),
+        "successful": successful,
+        "failed": len(results) - successful,
+        "results": results,
+        "memory": processor.memory.report(),
+    }
+    processor.print_summary(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    summary = main()
+    if summary["failed"]:
+        exit(1)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Process the statement folders of many tenants in one process.
+
+Each tenant is a (Drive account, folder) pair listed in TENANTS_FILE. All
+tenants share one PDF extractor, one LLM provider (and so one LLM quota)
+and a pool of TENANT_WORKERS workers, scheduled with weighted fair queuing
+so a large backfill of one tenant cannot starve the others.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from config import TenantSettings, app_settings
+from infrastructure.gdrive.drive_gateway import DriveFile
+from infrastructure.llm.langfuse_wrapper import LangfuseWrapper
+from main import StatementProcessor, create_drive_gateway
+from services.fair_scheduler import FairScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def load_tenants(path: Path) -> list[TenantSettings]:
+    """Read and validate the tenants file."""
+    tenants = TypeAdapter(list[TenantSettings]).validate_json(path.read_bytes())
+    names = [tenant.name for tenant in tenants]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate tenant names: {', '.join(sorted(duplicates))}")
+    return tenants
+
+
+def build_processors(tenants: list[TenantSettings]) -> dict[str, StatementProcessor]:
+    """Create one processor per tenant sharing extractor, LLM and memory budget."""
+    processors: dict[str, StatementProcessor] = {}
+    shared: StatementProcessor | None = None
+    for tenant in tenants:
+        gateway = create_drive_gateway(
+            tenant.gdrive_auth_mode,
+            tenant.gdrive_credentials,
+            tenant.gdrive_token,
+            tenant.gdrive_sa_key,
+        )
+        processor = StatementProcessor(
+            drive_gateway=gateway,
+            target_folder_name=tenant.target_folder_name,
+            output_dir=Path(app_settings.output_dir) / "tenants" / tenant.name,
+            llm_output_dir=Path(app_settings.llm_output_dir) / tenant.name,
+            pdf_extractor=shared.pdf_extractor if shared else None,
+            llm_provider=shared.llm_provider if shared else None,
+            memory_governor=shared.memory if shared else None,
+        )
+        shared = shared or processor
+        processors[tenant.name] = processor
+    return processors
+
+
+def main() -> dict[str, dict]:
+    """Process every tenant's folder and return a summary per tenant."""
+    if not app_settings.tenants_file:
+        raise ValueError("TENANTS_FILE is required for multi-tenant processing")
+
+    tenants = load_tenants(Path(app_settings.tenants_file))
+    processors = build_processors(tenants)
+    scheduler = FairScheduler(workers=app_settings.tenant_workers)
+
+    for tenant in tenants:
+        scheduler.add_tenant(
+            tenant.name,
+            weight=tenant.weight,
+            max_concurrency=tenant.max_concurrency,
+            rate_per_minute=tenant.rate_per_minute,
+        )
+        processor = processors[tenant.name]
+        try:
+            files = processor.list_pdf_files(processor.find_target_folder())
+        except Exception as e:
+            logger.error(f"❌ Cannot list files for tenant '{tenant.name}': {e}")
+            continue
+        for file in files:
+            scheduler.submit(tenant.name, file)
+        logger.info(f"🏢 Tenant '{tenant.name}': {len(files)} files queued")
+
+    def handle(tenant: str, file: DriveFile) -> dict:
+        return processors[tenant].process_file(file)
+
+    try:
+        outcomes = scheduler.run(handle)
+    finally:
+        LangfuseWrapper.flush()
+
+    summaries: dict[str, dict] = {}
+    for name, pairs in outcomes.items():
+        results = [result for _, result in pairs]
+        successful = sum(1 for result in results if result["success"])
+        summaries[name] = {
+            "total_files": len(results),
+            "successful": successful,
+            "failed": len(results) - successful,
+            "results": results,
+        }
+        logger.info(f"\n🏢 Tenant: {name}")
+        processors[name].print_summary(summaries[name])
+    return summaries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+HTTP ingestion service: submit a statement PDF (upload or Drive file ID)
+and get its transactions back, synchronously or through a job ID.
+
+Endpoints:
+    POST /statements            PDF body (Content-Type: application/pdf,
+                                optional ?name=file.pdf) or JSON
+                                {"drive_file_id": "...", "name": "..."}.
+                                Add ?mode=async to get a job ID right away.
+    GET  /jobs/<job_id>         Job status and, once done, its result.
+    GET  /health                Queue depth and capacity.
+
+Uploads are stored and processed as ``upload-<content hash>.pdf`` and Drive
+files as ``<file id>.pdf``, so a client-supplied name is only echoed back
+and never overwrites another statement. Transactions that other statements
+already contributed are returned under ``duplicates`` rather than dropped,
+and those that failed validation under ``rejected_transactions``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import signal
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from config import app_settings
+from infrastructure.gdrive.drive_gateway import DriveFile
+from infrastructure.llm.langfuse_wrapper import LangfuseWrapper
+from main import StatementProcessor
+from services.job_queue import Job, JobQueue, QueueFullError
+
+logger = logging.getLogger(__name__)
+
+
+def run_statement(processor: StatementProcessor, source: dict[str, Any]) -> dict:
+    """Process one submitted statement and return its transactions."""
+    if "pdf_path" in source:
+        result = processor.process_local_file(
+            Path(source["pdf_path"]), source["file_name"]
+        )
+    else:
+        file = DriveFile(
+            source["drive_file_id"], source["file_name"], "application/pdf"
+        )
+        result = processor.process_file(file)
+
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+
+    with open(result["json_path"], encoding="utf-8") as f:
+        output = json.load(f)
+    flags: dict[str, list] = {"duplicates": [], "near_duplicates": []}
+    if result.get("dedup_flags_path"):
+        with open(result["dedup_flags_path"], encoding="utf-8") as f:
+            flags = json.load(f)
+    return {
+        "name": source["name"],
+        "file_name": result["file_name"],
+        "parser": result["parser"],
+        "transactions": output["transactions"],
+        "duplicates": flags["duplicates"],
+        "near_duplicates": flags["near_duplicates"],
+        "rejected_transactions": output.get("rejected_transactions", []),
+    }
+
+
+class IngestionServer(ThreadingHTTPServer):
+    """HTTP server sharing one warm StatementProcessor across requests."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        processor: StatementProcessor,
+        queue: JobQueue,
+        *,
+        sync_timeout: float = 120.0,
+        max_upload_bytes: int = 20 * 1024 * 1024,
+    ) -> None:
+        super().__init__(address, IngestionHandler)
+        self.processor = processor
+        self.queue = queue
+        self.sync_timeout = sync_timeout
+        self.max_upload_bytes = max_upload_bytes
+        self.upload_dir = processor.output_dir / "uploads"
+
+
+class IngestionHandler(BaseHTTPRequestHandler):
+    server: IngestionServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info(f"{self.address_string()} - {format % args}")
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        body: dict[str, Any],
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: HTTPStatus, message: str, **headers: str) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def _job_body(self, job: Job) -> dict[str, Any]:
+        body = job.to_dict()
+        if job.status == "done":
+            body["result"] = job.result
+        return body
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path == "/health":
+            queue = self.server.queue
+            self._send_json(
+                HTTPStatus.OK,
+                {
+                    "status": "ok",
+                    "queue_depth": queue.depth,
+                    "capacity": queue.workers + queue.max_queued,
+                },
+            )
+            return
+
+        if path.startswith("/jobs/"):
+            job = self.server.queue.get(path[len("/jobs/") :])
+            if job is None:
+                self._send_error(HTTPStatus.NOT_FOUND, "Unknown job")
+                return
+            self._send_json(HTTPStatus.OK, self._job_body(job))
+            return
+
+        self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/statements":
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        queue = self.server.queue
+        # Reject before reading the upload when there is no room anyway
+        if queue.depth >= queue.workers + queue.max_queued:
+            self._send_error(
+                HTTPStatus.SERVICE_UNAVAILABLE, "Server busy", **{"Retry-After": "5"}
+            )
+            return
+
+        try:
+            source = self._read_source(params)
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        if source is None:
+            return  # error already sent
+
+        try:
+            job = queue.submit(run_statement, self.server.processor, source)
+        except QueueFullError as e:
+            self._send_error(
+                HTTPStatus.SERVICE_UNAVAILABLE, str(e), **{"Retry-After": "5"}
+            )
+            return
+
+        location = {"Location": f"/jobs/{job.id}"}
+        if params.get("mode") == "async":
+            self._send_json(HTTPStatus.ACCEPTED, job.to_dict(), location)
+            return
+
+        if not queue.wait(job, timeout=self.server.sync_timeout):
+            # Too slow to answer inline; the client can poll the job
+            self._send_json(HTTPStatus.ACCEPTED, job.to_dict(), location)
+            return
+        status = HTTPStatus.OK if job.status == "done" else HTTPStatus.BAD_GATEWAY
+        self._send_json(status, self._job_body(job), location)
+
+    def _read_source(self, params: dict[str, str]) -> dict[str, Any] | None:
+        """Read the request body into a job source, or send an error."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            raise ValueError("Request body is empty")
+        if length > self.server.max_upload_bytes:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Upload too large")
+            return None
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        body = self.rfile.read(length)
+
+        if content_type == "application/json":
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON: {e}") from e
+            if not isinstance(payload, dict):
+                raise ValueError("JSON body must be an object")
+            file_id = payload.get("drive_file_id")
+            if not file_id:
+                raise ValueError("drive_file_id is required")
+            return {
+                "drive_file_id": file_id,
+                "file_name": _safe_name(f"{file_id}.pdf"),
+                "name": _safe_name(payload.get("name") or f"{file_id}.pdf"),
+            }
+
+        if content_type == "application/pdf":
+            if not body.startswith(b"%PDF"):
+                raise ValueError("Body is not a PDF")
+            # Same content, same statement: a re-upload replaces its own rows
+            file_name = f"upload-{hashlib.sha256(body).hexdigest()[:16]}.pdf"
+            pdf_path = self.server.upload_dir / file_name
+            if not pdf_path.exists():
+                self.server.upload_dir.mkdir(parents=True, exist_ok=True)
+                # Concurrent uploads of the same PDF never see a partial file
+                part_path = pdf_path.with_name(
+                    f"{file_name}.{threading.get_ident()}.part"
+                )
+                part_path.write_bytes(body)
+                part_path.replace(pdf_path)
+            return {
+                "pdf_path": str(pdf_path),
+                "file_name": file_name,
+                "name": _safe_name(params.get("name") or file_name),
+            }
+
+        self._send_error(
+            HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+            "Use application/pdf or application/json",
+        )
+        return None
+
+
+def _safe_name(name: str) -> str:
+    """Strip directories from a client-supplied file name."""
+    name = Path(name).name
+    if not name or name.startswith("."):
+        raise ValueError(f"Invalid file name: {name!r}")
+    return name if name.lower().endswith(".pdf") else f"{name}.pdf"
+
+
+def main() -> None:
+    """Serve until SIGINT/SIGTERM."""
+    processor = StatementProcessor()
+    processor.pdf_extractor.warm_up()
+    queue = JobQueue(
+        app_settings.server_workers,
+        max_queued=app_settings.server_max_queue,
+        result_ttl=app_settings.server_job_ttl,
+    )
+    server = IngestionServer(
+        (app_settings.server_host, app_settings.server_port),
+        processor,
+        queue,
+        sync_timeout=app_settings.server_sync_timeout,
+        max_upload_bytes=app_settings.server_max_upload_mb * 1024 * 1024,
+    )
+
+    def handle_signal(signum: int, frame: Any) -> None:
+        logger.info("🛑 Shutdown requested")
+        # shutdown() blocks until serve_forever() returns, so call it elsewhere
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    host, port = server.server_address[:2]
+    logger.info(
+        f"🌐 Listening on http://{host}:{port} "
+        f"({queue.workers} workers, {queue.max_queued} queued max)"
+    )
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        queue.shutdown()
+        LangfuseWrapper.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from infrastructure.gdrive.drive_gateway import DriveFile
+
+
+@dataclass
+class ContentGroup:
+    """Drive files with identical content, processed once through ``primary``."""
+
+    primary: DriveFile
+    aliases: list[DriveFile] = field(default_factory=list)
+
+
+def group_by_content(files: Iterable[DriveFile]) -> list[ContentGroup]:
+    """Group files by ``(md5_checksum, size)``, keeping listing order.
+
+    The first file of each group is its primary. Files without a checksum
+    (e.g. Google Docs files) are never grouped.
+    """
+    groups: list[ContentGroup] = []
+    by_content: dict[tuple[str, int | None], ContentGroup] = {}
+    for file in files:
+        if file.md5_checksum is None:
+            groups.append(ContentGroup(file))
+            continue
+        key = (file.md5_checksum, file.size)
+        group = by_content.get(key)
+        if group is None:
+            group = by_content[key] = ContentGroup(file)
+            groups.append(group)
+        else:
+            group.aliases.append(file)
+    return groups
+
+
+def alias_result(result: dict[str, Any], alias: DriveFile) -> dict[str, Any]:
+    """Copy a primary's processing result for one of its aliases.
+
+    The alias shares the primary's outputs; per-run costs such as token
+    counts stay with the primary so totals are not counted twice.
+    """
+    return {
+        **result,
+        "file_name": alias.name,
+        "file_id": alias.id,
+        "duplicate_of": result["file_name"],
+        "input_tokens": 0,
+        "compacted_tokens": 0,
+    }
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Literal
 
 from pydantic import BaseModel
 
+from infrastructure.pdf_extractor.cascading_extractor import CascadingExtractor
 from infrastructure.pdf_extractor.docling_extractor import DoclingExtractor
+from infrastructure.pdf_extractor.ocr_extractor import OCRExtractor
 from infrastructure.pdf_extractor.pdfminer_extractor import PDFMinerExtractor
 from infrastructure.pdf_extractor.pymupdf_extractor import PyMuPDFExtractor
 from services.pdf_extractor import PDFExtractor
@@ -13,15 +16,51 @@ from services.pdf_extractor import PDFExtractor
 class Settings(BaseModel):
     """Settings for PDF extraction engine selection."""
 
-    pdf_engine: Literal["pymupdf", "pdfminer", "docling"] = "pymupdf"
+    pdf_engine: Literal["pymupdf", "pdfminer", "docling", "cascade", "ocr"] = "pymupdf"
+    pymupdf_mode: Literal["text", "table"] = "text"
+    pymupdf_joiner: str = "\n"
+    ocr_mode: Literal["docling", "process_pool"] = "docling"
+    ocr_dpi: int = 200
+    ocr_workers: int | None = None
+    ocr_languages: tuple[str, ...] = ("vi", "en")
+    ocr_cache_dir: Path | None = None
+
+
+def _make_ocr_extractor(settings: Settings) -> OCRExtractor:
+    return OCRExtractor(
+        dpi=settings.ocr_dpi,
+        workers=settings.ocr_workers,
+        languages=settings.ocr_languages,
+        cache_dir=settings.ocr_cache_dir,
+    )
+
+
+def _make_docling_extractor(settings: Settings) -> DoclingExtractor:
+    """Docling, handing scanned PDFs to the process-pool OCR if enabled."""
+    if settings.ocr_mode == "process_pool":
+        return DoclingExtractor(ocr_extractor=_make_ocr_extractor(settings))
+    return DoclingExtractor()
 
 
 def make_pdf_extractor(settings: Settings) -> PDFExtractor:
     """Factory function to create PDF extractor based on settings."""
+    pymupdf = PyMuPDFExtractor(
+        joiner=settings.pymupdf_joiner, mode=settings.pymupdf_mode
+    )
     if settings.pdf_engine == "pymupdf":
-        return PyMuPDFExtractor()
+        return pymupdf
     if settings.pdf_engine == "pdfminer":
         return PDFMinerExtractor()
     if settings.pdf_engine == "docling":
-        return DoclingExtractor()
+        return _make_docling_extractor(settings)
+    if settings.pdf_engine == "ocr":
+        return _make_ocr_extractor(settings)
+    if settings.pdf_engine == "cascade":
+        return CascadingExtractor(
+            [
+                ("pymupdf", pymupdf),
+                ("pdfminer", PDFMinerExtractor()),
+                ("docling", _make_docling_extractor(settings)),
+            ]
+        )
     raise ValueError(f"Unsupported pdf_engine={settings.pdf_engine}")
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TenantQueue:
+    """Per-tenant scheduling state."""
+
+    name: str
+    weight: float = 1.0
+    max_concurrency: int | None = None
+    rate_per_minute: float | None = None
+
+    # (virtual start, virtual finish, item)
+    items: deque[tuple[float, float, Any]] = field(default_factory=deque, repr=False)
+    last_finish: float = field(default=0.0, repr=False)
+    running: int = field(default=0, repr=False)
+    tokens: float = field(default=0.0, repr=False)
+    refilled_at: float = field(default_factory=time.monotonic, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.weight <= 0:
+            raise ValueError(f"Tenant '{self.name}' weight must be positive")
+        self.tokens = self.burst
+
+    @property
+    def burst(self) -> float:
+        return float(max(1, self.max_concurrency or 1))
+
+    def refill(self, now: float) -> None:
+        if self.rate_per_minute is None:
+            return
+        elapsed = now - self.refilled_at
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate_per_minute / 60)
+        self.refilled_at = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until the tenant may start another item (0 = now)."""
+        if self.max_concurrency is not None and self.running >= self.max_concurrency:
+            return float("inf")  # woken up when one of its items finishes
+        if self.rate_per_minute is None:
+            return 0.0
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * 60 / self.rate_per_minute
+
+
+class FairScheduler:
+    """Weighted fair queuing of work items across tenants.
+
+    Each item gets a virtual finish time ``max(V, tenant's last finish) +
+    cost / weight`` when it is submitted, and the shared worker pool always
+    starts the eligible item with the smallest finish time. A tenant with a
+    large backlog therefore only gets its weighted share of the workers
+    while other tenants have work, instead of running ahead of them. Each
+    tenant can additionally be capped to ``max_concurrency`` running items
+    and ``rate_per_minute`` item starts (a token bucket).
+    """
+
+    def __init__(self, workers: int = 4) -> None:
+        self.workers = workers
+        self.tenants: dict[str, TenantQueue] = {}
+        self._virtual_time = 0.0
+        self._running = 0
+        self._cond = threading.Condition()
+
+    def add_tenant(
+        self,
+        name: str,
+        *,
+        weight: float = 1.0,
+        max_concurrency: int | None = None,
+        rate_per_minute: float | None = None,
+    ) -> None:
+        """Register a tenant and its share and caps."""
+        with self._cond:
+            self.tenants[name] = TenantQueue(
+                name, weight, max_concurrency, rate_per_minute
+            )
+
+    def submit(self, tenant: str, item: Any, cost: float = 1.0) -> None:
+        """Queue an item for ``tenant``."""
+        with self._cond:
+            queue = self.tenants[tenant]
+            start = max(self._virtual_time, queue.last_finish)
+            queue.last_finish = start + cost / queue.weight
+            queue.items.append((start, queue.last_finish, item))
+            self._cond.notify_all()
+
+    def _pending(self) -> int:
+        return sum(len(queue.items) for queue in self.tenants.values())
+
+    def _next(self) -> tuple[TenantQueue | None, float]:
+        """Pick the eligible tenant whose head item finishes first.
+
+        Returns the tenant (or None) and, when no tenant is eligible, how
+        long to wait before checking again.
+        """
+        now = time.monotonic()
+        best: TenantQueue | None = None
+        wait = float("inf")
+        for queue in self.tenants.values():
+            if not queue.items:
+                continue
+            tenant_wait = queue.wait_time(now)
+            if tenant_wait > 0:
+                wait = min(wait, tenant_wait)
+                continue
+            if best is None or queue.items[0][1] < best.items[0][1]:
+                best = queue
+        return best, wait
+
+    def run(
+        self, handler: Callable[[str, Any], Any]
+    ) -> dict[str, list[tuple[Any, Any]]]:
+        """Process every queued item with ``handler(tenant, item)``.
+
+        Returns ``(item, handler result)`` pairs per tenant in completion
+        order. Handler exceptions are logged and returned as the result.
+        """
+        results: dict[str, list[tuple[Any, Any]]] = {name: [] for name in self.tenants}
+
+        def work(queue: TenantQueue, item: Any) -> None:
+            try:
+                outcome = handler(queue.name, item)
+            except Exception as e:
+                logger.error(f"Tenant '{queue.name}' item failed: {e}")
+                outcome = e
+            with self._cond:
+                results[queue.name].append((item, outcome))
+                queue.running -= 1
+                self._running -= 1
+                self._cond.notify_all()
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="tenant"
+        ) as executor:
+            with self._cond:
+                while self._pending() or self._running:
+                    if self._running >= self.workers:
+                        self._cond.wait()
+                        continue
+                    queue, wait = self._next()
+                    if queue is None:
+                        timeout = None if wait == float("inf") else wait
+                        self._cond.wait(timeout)
+                        continue
+
+                    start, _, item = queue.items.popleft()
+                    self._virtual_time = max(self._virtual_time, start)
+                    queue.running += 1
+                    if queue.rate_per_minute is not None:
+                        queue.tokens -= 1
+                    self._running += 1
+                    executor.submit(work, queue, item)
+
+        return results
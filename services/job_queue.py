@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "done", "failed"]
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+    pass
+
+
+@dataclass
+class Job:
+    """A unit of work tracked by the queue."""
+
+    id: str
+    status: JobStatus = "queued"
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    future: Future | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Bounded worker pool with job tracking.
+
+    At most ``workers`` jobs run at once and at most ``max_queued`` wait
+    behind them; further submissions fail fast with ``QueueFullError`` so
+    callers can shed load instead of letting latency grow without bound.
+    Finished jobs are kept for ``result_ttl`` seconds for polling.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        *,
+        max_queued: int = 16,
+        result_ttl: float = 3600.0,
+    ) -> None:
+        self.workers = workers
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="job"
+        )
+        self._jobs: dict[str, Job] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs queued or running."""
+        with self._lock:
+            return self._pending
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Job:
+        """Queue ``fn(*args)``; raise ``QueueFullError`` when at capacity."""
+        with self._lock:
+            self._expire()
+            if self._pending >= self.workers + self.max_queued:
+                raise QueueFullError(
+                    f"Queue is full ({self._pending} jobs queued or running)"
+                )
+            self._pending += 1
+            job = Job(id=uuid.uuid4().hex)
+            self._jobs[job.id] = job
+
+        job.future = self._executor.submit(self._run, job, fn, *args)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Look up a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job: Job, timeout: float | None = None) -> bool:
+        """Wait for a job to finish; return False on timeout."""
+        assert job.future is not None  # nosec B101
+        try:
+            job.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        return True
+
+    def _run(self, job: Job, fn: Callable[..., Any], *args: Any) -> None:
+        job.status = "running"
+        try:
+            job.result = fn(*args)
+            job.status = "done"
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._pending -= 1
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and optionally wait for running jobs."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+def current_rss() -> int | None:
+    """Resident set size of this process in bytes (None off Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+@dataclass
+class Admission:
+    """Memory accounted to one file while it is in the pipeline."""
+
+    reserve: int
+    pdf_bytes: int
+    text_bytes: int = 0
+
+    @property
+    def charge(self) -> int:
+        return max(self.reserve, self.pdf_bytes + self.text_bytes)
+
+
+class MemoryGovernor:
+    """Admit files only while the process stays under a memory budget.
+
+    A file is admitted when the current RSS plus the charges of the files
+    in flight and of the new file fit in ``budget_bytes``. A file is
+    charged ``pdf_factor`` times its PDF size up front (rendering, layout
+    models and text copies grow with it), or its PDF plus text size if
+    that is larger. Charges overlap with what RSS already counts, so the
+    check errs on the safe side. One file is always admitted when nothing
+    else is in flight, so an oversized statement still runs, alone.
+
+    RSS is also sampled every ``poll_interval`` seconds while any stage
+    runs, and the peak seen during each stage is kept for ``report``.
+    Stages of concurrent files overlap, so a stage's peak is the process
+    RSS while at least one file was in it. Without a budget only the
+    measurements are made.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int | None = None,
+        *,
+        pdf_factor: float = 20.0,
+        poll_interval: float = 0.5,
+    ) -> None:
+        self.budget_bytes = budget_bytes
+        self.pdf_factor = pdf_factor
+        self.poll_interval = poll_interval
+        self._in_flight: list[Admission] = []
+        self._active_stages: Counter[str] = Counter()
+        self._stage_peaks: dict[str, int] = {}
+        self._peak_rss = 0
+        self._peak_in_flight = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._sampler: threading.Thread | None = None
+
+    def _sample(self) -> int | None:
+        rss = current_rss()
+        if rss is None:
+            return None
+        with self._cond:
+            self._peak_rss = max(self._peak_rss, rss)
+            for stage in self._active_stages:
+                self._stage_peaks[stage] = max(self._stage_peaks.get(stage, 0), rss)
+        return rss
+
+    def _run_sampler(self) -> None:
+        while True:
+            with self._cond:
+                while not self._active_stages:
+                    self._cond.wait()
+            self._sample()
+            time.sleep(self.poll_interval)
+
+    def _fits(self, admission: Admission) -> bool:
+        if self.budget_bytes is None or not self._in_flight:
+            return True
+        rss = current_rss() or 0
+        charged = sum(a.charge for a in self._in_flight)
+        return rss + charged + admission.charge <= self.budget_bytes
+
+    @contextmanager
+    def admit(self, pdf_bytes: int) -> Iterator[Admission]:
+        """Block until a file of ``pdf_bytes`` fits, and hold its charge.
+
+        Text produced while the file is admitted is charged with
+        ``note_text`` from the same thread.
+        """
+        admission = Admission(int(pdf_bytes * self.pdf_factor), pdf_bytes)
+        waited_since: float | None = None
+        with self._cond:
+            while not self._fits(admission):
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self._waits += 1
+                    logger.info(
+                        f"Memory budget reached, waiting to admit a "
+                        f"{pdf_bytes / _MB:.1f} MB PDF"
+                    )
+                # RSS is not observable as an event, so re-check periodically
+                self._cond.wait(self.poll_interval)
+            if waited_since is not None:
+                self._wait_seconds += time.monotonic() - waited_since
+            self._in_flight.append(admission)
+            self._update_in_flight_peak()
+
+        self._local.admission = admission
+        try:
+            yield admission
+        finally:
+            self._local.admission = None
+            with self._cond:
+                self._in_flight.remove(admission)
+                self._cond.notify_all()
+
+    def _update_in_flight_peak(self) -> None:
+        in_flight = sum(a.pdf_bytes + a.text_bytes for a in self._in_flight)
+        self._peak_in_flight = max(self._peak_in_flight, in_flight)
+
+    def note_text(self, text_bytes: int) -> None:
+        """Charge extracted text to the file admitted on this thread."""
+        admission: Admission | None = getattr(self._local, "admission", None)
+        if admission is None:
+            return
+        with self._cond:
+            admission.text_bytes = text_bytes
+            self._update_in_flight_peak()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Record the peak RSS while the body runs under ``name``."""
+        with self._cond:
+            self._active_stages[name] += 1
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run_sampler, daemon=True)
+                self._sampler.start()
+            self._cond.notify_all()
+        self._sample()
+        try:
+            yield
+        finally:
+            self._sample()
+            with self._cond:
+                self._active_stages[name] -= 1
+                if not self._active_stages[name]:
+                    del self._active_stages[name]
+
+    def report(self) -> dict[str, Any]:
+        """Budget, peaks and admission waits so far, in MB and seconds."""
+        with self._cond:
+            return {
+                "budget_mb": (
+                    round(self.budget_bytes / _MB, 1) if self.budget_bytes else None
+                ),
+                "peak_rss_mb": round(self._peak_rss / _MB, 1),
+                "peak_in_flight_mb": round(self._peak_in_flight / _MB, 1),
+                "stage_peak_rss_mb": {
+                    stage: round(peak / _MB, 1)
+                    for stage, peak in self._stage_peaks.items()
+                },
+                "admission_waits": self._waits,
+                "admission_wait_seconds": round(self._wait_seconds, 1),
+            }
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Union
+
+# A PDF given either as in-memory bytes or as a path opened lazily
+PDFSource = Union[bytes, str, Path]
 
 
 class PDFExtractor(ABC):
     """Contract để StatementPipeline không phụ thuộc lib cụ thể."""
 
+    # Distribution whose version is part of the extraction cache key
+    library_name: str | None = None
+    # Put between pages by callers that need the whole document
+    joiner: str = "\f"
+
     @abstractmethod
     def extract(self, pdf_bytes: bytes, *, password: str | None = None) -> str:
         """Extract text content from PDF bytes.
@@ -18,3 +30,55 @@ class PDFExtractor(ABC):
             Extracted text content
         """
         ...
+
+    @abstractmethod
+    def iter_pages(
+        self, source: PDFSource, *, password: str | None = None
+    ) -> Iterator[str]:
+        """Yield the text of each page in order, with bounded memory.
+
+        Paths are opened by the library directly instead of being read into
+        memory first, so only the current page has to be held at a time.
+        Callers that need the whole document join the pages with ``joiner``.
+
+        Args:
+            source: PDF file path or content as bytes
+            password: Optional password for encrypted PDFs
+
+        Yields:
+            Text of one page
+        """
+        ...
+
+    def warm_up(self) -> None:
+        """Load models or other expensive state before the first document.
+
+        Long-running processes call this once at startup; extractors without
+        such state do nothing.
+        """
+        return None
+
+    def cache_options(self) -> dict[str, Any]:
+        """Options that change the extracted text (used in cache keys)."""
+        return {
+            key: value
+            for key, value in vars(self).items()
+            if isinstance(value, (str, int, float, bool, type(None)))
+        }
+
+    def library_version(self) -> str | None:
+        """Installed version of the underlying PDF library."""
+        if self.library_name is None:
+            return None
+        try:
+            return metadata.version(self.library_name)
+        except metadata.PackageNotFoundError:
+            return None
+
+    def cache_fingerprint(self) -> dict[str, Any]:
+        """Identify this extractor, its options and its library version."""
+        return {
+            "extractor": f"{type(self).__module__}.{type(self).__qualname__}",
+            "options": self.cache_options(),
+            "version": self.library_version(),
+        }
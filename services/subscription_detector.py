@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from infrastructure.storage.normalize import fold_text, signed_amount
+
+logger = logging.getLogger(__name__)
+
+# Cadence name -> (nominal period in days, allowed deviation in days)
+CADENCES: dict[str, tuple[float, float]] = {
+    "weekly": (7.0, 1.0),
+    "biweekly": (14.0, 2.0),
+    "monthly": (30.44, 4.0),
+    "quarterly": (91.31, 7.0),
+    "yearly": (365.25, 10.0),
+}
+_CADENCE_NAMES = tuple(CADENCES)
+_PERIODS = np.array([period for period, _ in CADENCES.values()])
+_TOLERANCES = np.array([tolerance for _, tolerance in CADENCES.values()])
+_MONTH_DAYS = CADENCES["monthly"][0]
+_EPOCH = date(1970, 1, 1)  # day 0 of datetime64[D]
+
+
+def receiver_key(text: str | None) -> str:
+    """Fold a receiver name and drop tokens with digits.
+
+    Card processors append terminal and reference numbers, so
+    ``"NETFLIX.COM 8662"`` and ``"Netflix.com 1203"`` share the key
+    ``"netflix com"``.
+    """
+    folded = fold_text(text)
+    tokens = [token for token in folded.split() if not any(c.isdigit() for c in token)]
+    return " ".join(tokens) or folded
+
+
+@dataclass
+class TransactionColumns:
+    """Transactions as parallel arrays, one row per transaction.
+
+    ``groups[i]`` is an index into ``keys``, the ``(receiver, currency)``
+    pairs in order of first appearance; the receiver is the first spelling
+    seen for its ``receiver_key``. Amounts are signed by ``signed_amount``,
+    so spending is negative whether or not the LLM wrote a sign. Unparseable
+    dates are ``NaT`` and unparseable amounts ``NaN``.
+    """
+
+    keys: list[tuple[str, str]]
+    groups: np.ndarray
+    days: np.ndarray
+    amounts: np.ndarray
+    labeled: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    @classmethod
+    def from_transactions(
+        cls, transactions: Iterable[dict[str, Any]]
+    ) -> TransactionColumns:
+        """Build columns from transactions in the output file format.
+
+        Transactions without a receiver fall back to their
+        ``service_subscription``; those with neither are skipped.
+        """
+        keys: list[tuple[str, str]] = []
+        key_ids: dict[tuple[str, str], int] = {}
+        folded: dict[str, str] = {}
+        parsed: dict[tuple[str, bool], float] = {}
+        groups: list[int] = []
+        days: list[str] = []
+        amounts: list[float] = []
+        labeled: list[bool] = []
+
+        for data in transactions:
+            name = (
+                data.get("receiver")
+                or data.get("receiver_name")
+                or data.get("service_subscription")
+            )
+            if not name:
+                continue
+            key = folded.get(name)
+            if key is None:
+                key = folded[name] = receiver_key(name)
+            if not key:
+                continue
+            group_key = (key, data.get("currency") or "")
+            group = key_ids.get(group_key)
+            if group is None:
+                group = key_ids[group_key] = len(keys)
+                keys.append((name, group_key[1]))
+
+            # The sign of an unsigned amount depends on the category
+            amount_key = (str(data.get("amount")), data.get("category") == "Income")
+            amount = parsed.get(amount_key)
+            if amount is None:
+                value = signed_amount(data)
+                amount = parsed[amount_key] = (
+                    float("nan") if value is None else float(value)
+                )
+
+            groups.append(group)
+            days.append(str(data.get("transaction_date") or "")[:10])
+            amounts.append(amount)
+            labeled.append(bool(data.get("service_subscription")))
+
+        return cls(
+            keys=keys,
+            groups=np.array(groups, dtype=np.int64),
+            days=_parse_days(days),
+            amounts=np.array(amounts, dtype=np.float64),
+            labeled=np.array(labeled, dtype=bool),
+        )
+
+    @classmethod
+    def from_directory(cls, directory: Path) -> TransactionColumns:
+        """Load every ``*.json`` output file in a directory."""
+
+        def transactions() -> Iterable[dict[str, Any]]:
+            for path in sorted(directory.glob("*.json")):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        output = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning(f"Skipping unreadable output {path}: {e}")
+                    continue
+                yield from output.get("transactions", [])
+
+        columns = cls.from_transactions(transactions())
+        logger.info(f"Loaded {len(columns)} transactions from {directory}")
+        return columns
+
+
+def _parse_days(values: list[str]) -> np.ndarray:
+    """Parse ISO dates in one pass, or one by one if any is malformed."""
+    try:
+        return np.array(values, dtype="datetime64[D]")
+    except ValueError:
+        days = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[D]")
+        for i, value in enumerate(values):
+            try:
+                days[i] = np.datetime64(value, "D")
+            except ValueError:
+                pass
+        return days
+
+
+@dataclass
+class PriceChange:
+    """A lasting change of a recurring charge's amount."""
+
+    date: date
+    old_amount: float
+    new_amount: float
+
+
+@dataclass
+class RecurringCharge:
+    """A receiver charged at a regular cadence with a stable amount.
+
+    Amounts are positive spending in the charge's currency.
+    ``monthly_amount`` scales the latest amount to a month so charges of
+    different cadences can be totalled. ``labeled_share`` is the fraction
+    of charges the LLM tagged with a ``service_subscription``.
+    """
+
+    receiver: str
+    currency: str
+    cadence: str
+    interval_days: float
+    occurrences: int
+    first_date: date
+    last_date: date
+    next_date: date
+    amount: float
+    monthly_amount: float
+    interval_regularity: float
+    amount_stability: float
+    labeled_share: float
+    is_new: bool
+    active: bool
+    price_changes: list[PriceChange] = field(default_factory=list)
+
+
+class SubscriptionDetector:
+    """Find recurring charges across the whole transaction history.
+
+    Spending is grouped by receiver and currency, and charges of a group on
+    the same day are summed into one. For each group, the median interval
+    between charges picks a cadence from ``CADENCES``; the group is
+    recurring when it has at least ``min_occurrences`` charges, at least
+    ``min_regularity`` of its intervals are within the cadence's tolerance,
+    and at least ``min_stability`` of consecutive amounts differ by no more
+    than ``amount_tolerance`` (relative). A price change is a larger step
+    that the next charge keeps and that the previous charge did not
+    itself step to. A charge is new when its first occurrence
+    is within ``new_periods`` periods of ``as_of``, and active when its
+    next charge is not overdue.
+
+    All per-row and per-group work is done with numpy over the sorted
+    columns, so its cost is a sort of the history; Python code only runs
+    for the groups found recurring.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_occurrences: int = 3,
+        min_regularity: float = 0.75,
+        min_stability: float = 0.75,
+        amount_tolerance: float = 0.05,
+        new_periods: float = 3.0,
+    ) -> None:
+        self.min_occurrences = max(2, min_occurrences)
+        self.min_regularity = min_regularity
+        self.min_stability = min_stability
+        self.amount_tolerance = amount_tolerance
+        self.new_periods = new_periods
+
+    def detect(
+        self, columns: TransactionColumns, *, as_of: date | None = None
+    ) -> list[RecurringCharge]:
+        """Detect recurring charges, largest monthly amount first.
+
+        Args:
+            columns: Transaction history
+            as_of: Day the history is evaluated at (default its last day)
+
+        Returns:
+            The recurring charges found
+        """
+        n_groups = len(columns.keys)
+        valid = (columns.amounts < 0) & ~np.isnat(columns.days)
+        groups = columns.groups[valid]
+        days = columns.days[valid].astype(np.int64)
+        amounts = -columns.amounts[valid]
+        labeled = columns.labeled[valid]
+        if not groups.size:
+            return []
+        as_of_day = (
+            int(days.max())
+            if as_of is None
+            else int(np.datetime64(as_of, "D").astype(np.int64))
+        )
+
+        # Sort by group, then day, and sum same-day charges of a group
+        order = np.lexsort((days, groups))
+        groups, days, amounts, labeled = (
+            groups[order],
+            days[order],
+            amounts[order],
+            labeled[order],
+        )
+        first = np.ones(groups.size, dtype=bool)
+        first[1:] = (groups[1:] != groups[:-1]) | (days[1:] != days[:-1])
+        starts = np.flatnonzero(first)
+        groups, days = groups[starts], days[starts]
+        amounts = np.add.reduceat(amounts, starts)
+        labeled = np.logical_or.reduceat(labeled, starts)
+
+        occurrences = np.bincount(groups, minlength=n_groups)
+        occurrences[occurrences < self.min_occurrences] = 0
+        keep = (occurrences > 0)[groups]
+        groups, days, amounts, labeled = (
+            groups[keep],
+            days[keep],
+            amounts[keep],
+            labeled[keep],
+        )
+        if not groups.size:
+            return []
+        row_ends = np.cumsum(occurrences) - 1
+        row_starts = row_ends - occurrences + 1
+
+        # Consecutive charges of the same group; pair i is rows (i, i + 1)
+        same = groups[1:] == groups[:-1]
+        pair_groups = groups[1:][same]
+        intervals = np.diff(days)[same]
+        n_pairs = np.bincount(pair_groups, minlength=n_groups)
+        has_pairs = n_pairs > 0
+
+        median = np.zeros(n_groups)
+        sorted_intervals = intervals[np.lexsort((intervals, pair_groups))]
+        pair_starts = np.cumsum(n_pairs) - n_pairs
+        low = pair_starts[has_pairs] + (n_pairs[has_pairs] - 1) // 2
+        high = pair_starts[has_pairs] + n_pairs[has_pairs] // 2
+        median[has_pairs] = (sorted_intervals[low] + sorted_intervals[high]) / 2
+
+        deviation = np.abs(median[:, None] - _PERIODS) / _TOLERANCES
+        cadence = deviation.argmin(axis=1)
+        matched = has_pairs & (deviation.min(axis=1) <= 1)
+        period = _PERIODS[cadence]
+
+        on_time = (
+            np.abs(intervals - period[pair_groups]) <= _TOLERANCES[cadence[pair_groups]]
+        )
+        previous = amounts[:-1][same]
+        current = amounts[1:][same]
+        change = np.abs(current - previous) / np.maximum(previous, 1e-9)
+        stable = change <= self.amount_tolerance
+        with np.errstate(invalid="ignore", divide="ignore"):
+            regularity = np.bincount(pair_groups, on_time, n_groups) / n_pairs
+            stability = np.bincount(pair_groups, stable, n_groups) / n_pairs
+        recurring = (
+            matched
+            & (regularity >= self.min_regularity)
+            & (stability >= self.min_stability)
+        )
+        if not recurring.any():
+            return []
+
+        # A step counts as a price change if the following charge keeps it
+        # and it does not come back from a one-off spike
+        row_changed = np.zeros(groups.size, dtype=bool)
+        row_changed[1:][same] = ~stable
+        row_kept = np.ones(groups.size, dtype=bool)
+        row_kept[:-1][same] = stable
+        row_settled = np.ones(groups.size, dtype=bool)
+        row_settled[2:] = row_kept[:-2]
+        price_rows = np.flatnonzero(
+            row_changed & row_kept & row_settled & recurring[groups]
+        )
+
+        first_day = days[row_starts.clip(0, groups.size - 1)]
+        last_day = days[row_ends.clip(0, groups.size - 1)]
+        labeled_share = np.bincount(groups, labeled, n_groups) / np.maximum(
+            occurrences, 1
+        )
+        is_new = first_day >= as_of_day - self.new_periods * period
+        active = as_of_day - last_day <= period + _TOLERANCES[cadence]
+
+        changes: dict[int, list[PriceChange]] = {}
+        for row in price_rows.tolist():
+            changes.setdefault(int(groups[row]), []).append(
+                PriceChange(
+                    _to_date(days[row]),
+                    round(float(amounts[row - 1]), 2),
+                    round(float(amounts[row]), 2),
+                )
+            )
+
+        charges = []
+        for group in np.flatnonzero(recurring).tolist():
+            receiver, currency = columns.keys[group]
+            amount = float(amounts[row_ends[group]])
+            charges.append(
+                RecurringCharge(
+                    receiver=receiver,
+                    currency=currency,
+                    cadence=_CADENCE_NAMES[cadence[group]],
+                    interval_days=float(median[group]),
+                    occurrences=int(occurrences[group]),
+                    first_date=_to_date(first_day[group]),
+                    last_date=_to_date(last_day[group]),
+                    next_date=_to_date(last_day[group] + round(median[group])),
+                    amount=round(amount, 2),
+                    monthly_amount=round(
+                        amount * _MONTH_DAYS / float(period[group]), 2
+                    ),
+                    interval_regularity=round(float(regularity[group]), 3),
+                    amount_stability=round(float(stability[group]), 3),
+                    labeled_share=round(float(labeled_share[group]), 3),
+                    is_new=bool(is_new[group]),
+                    active=bool(active[group]),
+                    price_changes=changes.get(group, []),
+                )
+            )
+        charges.sort(key=lambda charge: charge.monthly_amount, reverse=True)
+        return charges
+
+
+def _to_date(day: Any) -> date:
+    """Date of a ``datetime64[D]`` day number."""
+    return _EPOCH + timedelta(days=int(day))
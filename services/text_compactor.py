@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+# Lines that are never transaction content, whatever the bank
+DEFAULT_BOILERPLATE_PATTERNS = [
+    r"^(page|trang)\s*\d+\s*(/|of|trên)\s*\d+$",
+    r"^\d+\s*/\s*\d+$",
+    r"^<!--\s*image\s*-->$",
+    r"^[-=_*.\s]{3,}$",
+    r"this (is a|statement is) computer[- ]generated",
+    r"does not require (a )?signature",
+    r"không cần (chữ ký|ký)",
+    r"quý khách vui lòng (liên hệ|kiểm tra)",
+    r"please (contact|notify) us within",
+]
+
+_DATE_RE = re.compile(r"\b\d{1,4}[/.-]\d{1,2}[/.-]\d{1,4}\b")
+_AMOUNT_RE = re.compile(r"\d{1,3}(?:[.,]\d{3})+(?:[.,]\d+)?|\d+[.,]\d{2}\b")
+_PAGE_NUMBER_RE = re.compile(r"\d+")
+_MULTI_SPACE_RE = re.compile(r"[ \t ]{2,}")
+_PAGE_MARKER_RE = re.compile(r"^--- page \d+ ---$")
+_MD_SEPARATOR_RE = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?$")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for mixed VN/EN text)."""
+    return math.ceil(len(text) / 4)
+
+
+def looks_like_transaction(line: str) -> bool:
+    """Lines with a date or an amount are kept no matter how often they repeat."""
+    return bool(_DATE_RE.search(line) or _AMOUNT_RE.search(line))
+
+
+def is_page_marker(line: str) -> bool:
+    """Page markers emitted by the table extraction mode are always kept."""
+    return bool(_PAGE_MARKER_RE.match(line))
+
+
+@dataclass
+class CompactionResult:
+    """Compacted text plus the size reduction it achieved."""
+
+    text: str
+    original_tokens: int
+    compacted_tokens: int
+    removed_lines: int
+
+    @property
+    def token_reduction(self) -> float:
+        """Fraction of estimated input tokens removed (0.0 - 1.0)."""
+        if self.original_tokens == 0:
+            return 0.0
+        return 1 - self.compacted_tokens / self.original_tokens
+
+
+class TextCompactor:
+    """Normalize extracted statement text before it is sent to the LLM.
+
+    Removes page headers/footers that repeat across pages, known
+    boilerplate and blank lines, collapses column padding and, optionally,
+    rewrites table rows as compact delimited rows. Pages are split on form
+    feeds (``\\f``) as emitted by PyMuPDF and pdfminer; text without page
+    breaks only drops repeated lines that carry no date or amount.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_page_ratio: float = 0.5,
+        min_repeats: int = 3,
+        boilerplate_patterns: list[str] | None = None,
+        tables: bool = False,
+        delimiter: str = "\t",
+    ) -> None:
+        self.min_page_ratio = min_page_ratio
+        self.min_repeats = min_repeats
+        self.boilerplate = [
+            re.compile(pattern, re.IGNORECASE)
+            for pattern in (boilerplate_patterns or DEFAULT_BOILERPLATE_PATTERNS)
+        ]
+        self.tables = tables
+        self.delimiter = delimiter
+
+    @staticmethod
+    def _repeat_key(line: str) -> str:
+        # "Page 3 of 7" and "Page 4 of 7" are the same footer
+        return _PAGE_NUMBER_RE.sub("#", line.lower())
+
+    def _repeated_lines(self, pages: list[list[str]]) -> set[str]:
+        """Keys of header/footer lines that repeat across pages."""
+        if len(pages) > 1:
+            page_counts: Counter[str] = Counter()
+            for page in pages:
+                page_counts.update({self._repeat_key(line) for line in page})
+            threshold = max(2, math.ceil(len(pages) * self.min_page_ratio))
+            return {key for key, count in page_counts.items() if count >= threshold}
+
+        counts = Counter(
+            self._repeat_key(line)
+            for line in pages[0]
+            if not looks_like_transaction(line)
+        )
+        return {key for key, count in counts.items() if count >= self.min_repeats}
+
+    def _is_boilerplate(self, line: str) -> bool:
+        return any(pattern.search(line) for pattern in self.boilerplate)
+
+    def _normalize(self, line: str) -> str | None:
+        """Collapse whitespace; returns None for lines that should be dropped."""
+        if self.tables and line.startswith("|"):
+            if _MD_SEPARATOR_RE.match(line):
+                return None
+            cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+            return self.delimiter.join(cells)
+        if "\t" in line:
+            # Already delimited (PyMuPDF table mode); keep empty cells aligned
+            cells = [" ".join(cell.split()) for cell in line.split("\t")]
+            return self.delimiter.join(cells) if self.tables else "\t".join(cells)
+        if self.tables:
+            return _MULTI_SPACE_RE.sub(self.delimiter, line)
+        return " ".join(line.split())
+
+    def compact(self, text: str) -> CompactionResult:
+        """Compact statement text.
+
+        Args:
+            text: Raw extracted text, pages separated by form feeds if known
+
+        Returns:
+            CompactionResult with the compacted text and token estimates
+        """
+        pages = [
+            [line.strip(" \r") for line in page.splitlines() if line.strip()]
+            for page in text.split("\f")
+        ]
+        pages = [page for page in pages if page] or [[]]
+        repeated = self._repeated_lines(pages)
+
+        total_lines = sum(len(page) for page in pages)
+        kept: list[str] = []
+        seen_repeats: set[str] = set()
+        for page in pages:
+            for line in page:
+                if is_page_marker(line):
+                    kept.append(line)
+                    continue
+                protected = looks_like_transaction(line)
+                if not protected and self._is_boilerplate(line):
+                    continue
+                key = self._repeat_key(line)
+                if not protected and key in repeated:
+                    # Keep the first copy so column headers stay visible
+                    if key in seen_repeats:
+                        continue
+                    seen_repeats.add(key)
+                normalized = self._normalize(line)
+                if normalized:
+                    kept.append(normalized)
+
+        compacted = "\n".join(kept)
+        return CompactionResult(
+            text=compacted,
+            original_tokens=estimate_tokens(text),
+            compacted_tokens=estimate_tokens(compacted),
+            removed_lines=total_lines - len(kept),
+        )
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Literal
+
+from infrastructure.storage.normalize import fold_text, signed_amount
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexedTransaction:
+    """A transaction in the output file format with its parsed fields."""
+
+    id: int
+    source: str
+    date: datetime
+    amount: Decimal | None
+    data: dict[str, Any]
+
+
+def _as_datetime(value: date | datetime, *, end: bool = False) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time.max if end else time.min)
+
+
+class TransactionIndex:
+    """In-memory query engine over extracted transactions.
+
+    Transactions are kept by id with a date index sorted for binary search
+    range scans, and inverted indexes from category, folded receiver,
+    folded subscription and ``transaction_detail`` tokens to transaction ids.
+    A query starts from whichever is smaller, the date range or the most
+    selective inverted index, and checks the other filters against it, so
+    its cost follows the size of the answer rather than of the history.
+    The date index is appended to and only sorted again by the next query.
+
+    Adding a statement again replaces its previous transactions.
+    """
+
+    def __init__(self) -> None:
+        self._transactions: dict[int, IndexedTransaction] = {}
+        self._next_id = 0
+        self._dates: list[tuple[datetime, int]] = []
+        self._dates_sorted = True
+        self._by_category: dict[str, set[int]] = defaultdict(set)
+        self._by_receiver: dict[str, set[int]] = defaultdict(set)
+        self._by_subscription: dict[str, set[int]] = defaultdict(set)
+        self._by_token: dict[str, set[int]] = defaultdict(set)
+        self._by_source: dict[str, list[int]] = {}
+
+    @classmethod
+    def from_directory(cls, directory: Path) -> TransactionIndex:
+        """Index every ``*.json`` output file in a directory."""
+        index = cls()
+        for path in sorted(directory.glob("*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    output = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Skipping unreadable output {path}: {e}")
+                continue
+            index.add(output.get("transactions", []), source=path.name)
+        logger.info(f"Indexed {len(index)} transactions from {directory}")
+        return index
+
+    def __len__(self) -> int:
+        return len(self._transactions)
+
+    @staticmethod
+    def _index_keys(data: dict[str, Any]) -> tuple[str, str, str, set[str]]:
+        """Category, folded receiver and subscription, and detail tokens."""
+        return (
+            data.get("category") or "",
+            fold_text(data.get("receiver") or data.get("receiver_name")),
+            fold_text(data.get("service_subscription")),
+            set(fold_text(data.get("transaction_detail")).split()),
+        )
+
+    def remove(self, source: str) -> None:
+        """Drop the transactions of a statement from every index."""
+        ids = set(self._by_source.pop(source, []))
+        if not ids:
+            return
+        for transaction_id in ids:
+            transaction = self._transactions.pop(transaction_id)
+            category, receiver, subscription, tokens = self._index_keys(
+                transaction.data
+            )
+            for index, keys in (
+                (self._by_category, [category]),
+                (self._by_receiver, [receiver]),
+                (self._by_subscription, [subscription]),
+                (self._by_token, tokens),
+            ):
+                for key in keys:
+                    bucket = index.get(key)
+                    if bucket is None:
+                        continue
+                    bucket -= ids
+                    if not bucket:
+                        del index[key]
+        self._dates = [entry for entry in self._dates if entry[1] not in ids]
+
+    def add(self, transactions: Iterable[dict[str, Any]], source: str) -> None:
+        """Index the transactions of a statement (output file format)."""
+        self.remove(source)
+        ids: list[int] = []
+        for data in transactions:
+            try:
+                when = datetime.fromisoformat(
+                    str(data["transaction_date"]).replace("T", " ")
+                )
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping transaction without a valid date: {e}")
+                continue
+
+            transaction_id = self._next_id
+            self._next_id += 1
+            self._transactions[transaction_id] = IndexedTransaction(
+                transaction_id, source, when, signed_amount(data), data
+            )
+            ids.append(transaction_id)
+            self._dates.append((when, transaction_id))
+
+            category, receiver, subscription, tokens = self._index_keys(data)
+            if category:
+                self._by_category[category].add(transaction_id)
+            if receiver:
+                self._by_receiver[receiver].add(transaction_id)
+            if subscription:
+                self._by_subscription[subscription].add(transaction_id)
+            for token in tokens:
+                self._by_token[token].add(transaction_id)
+        self._by_source[source] = ids
+        self._dates_sorted = False
+
+    def _date_bounds(
+        self, start: date | datetime | None, end: date | datetime | None
+    ) -> tuple[int, int]:
+        """Slice of the date index covering ``[start, end]``."""
+        if not self._dates_sorted:
+            self._dates.sort()
+            self._dates_sorted = True
+        low = 0
+        high = len(self._dates)
+        if start is not None:
+            low = bisect.bisect_left(self._dates, (_as_datetime(start), -1))
+        if end is not None:
+            high = bisect.bisect_right(
+                self._dates, (_as_datetime(end, end=True), self._next_id)
+            )
+        return low, high
+
+    def query(
+        self,
+        *,
+        start: date | datetime | None = None,
+        end: date | datetime | None = None,
+        category: str | None = None,
+        receiver: str | None = None,
+        subscription: str | None = None,
+        text: str | None = None,
+        direction: Literal["in", "out"] | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Find transactions matching every given filter, oldest first.
+
+        Args:
+            start: First day (or instant) of the range, inclusive
+            end: Last day (or instant) of the range, inclusive
+            category: Exact category, e.g. ``"Food & Dining"``
+            receiver: Receiver name (case and diacritics insensitive)
+            subscription: Service subscription, e.g. ``"Netflix"``
+            text: Words that must all appear in ``transaction_detail``
+            direction: ``"in"`` for income, ``"out"`` for spending (see
+                ``signed_amount``)
+            limit: Maximum number of results
+
+        Returns:
+            Matching transactions in the output file format
+        """
+        candidates: list[set[int]] = []
+        if category is not None:
+            candidates.append(self._by_category.get(category, set()))
+        if receiver is not None:
+            candidates.append(self._by_receiver.get(fold_text(receiver), set()))
+        if subscription is not None:
+            candidates.append(self._by_subscription.get(fold_text(subscription), set()))
+        if text:
+            for token in fold_text(text).split():
+                candidates.append(self._by_token.get(token, set()))
+
+        low, high = self._date_bounds(start, end)
+        candidates.sort(key=len)
+        if candidates and len(candidates[0]) < high - low:
+            # The most selective inverted index is smaller than the date range
+            ids = set(candidates[0]).intersection(*candidates[1:])
+            if start is not None or end is not None:
+                first = _as_datetime(start) if start is not None else datetime.min
+                last = _as_datetime(end, end=True) if end is not None else datetime.max
+                ids = {i for i in ids if first <= self._transactions[i].date <= last}
+            matches = sorted(
+                (self._transactions[i] for i in ids), key=lambda t: (t.date, t.id)
+            )
+        else:
+            # Scan the date range in order, probing the inverted indexes
+            matches = [
+                self._transactions[i]
+                for _, i in self._dates[low:high]
+                if all(i in ids for ids in candidates)
+            ]
+
+        results = []
+        for transaction in matches:
+            if direction is not None:
+                amount = transaction.amount
+                if amount is None or (amount > 0) != (direction == "in"):
+                    continue
+            results.append(transaction.data)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    @staticmethod
+    def totals(transactions: Iterable[dict[str, Any]]) -> dict[str, Decimal]:
+        """Net amount of query results per currency (spending negative)."""
+        sums: dict[str, Decimal] = defaultdict(Decimal)
+        for transaction in transactions:
+            amount = signed_amount(transaction)
+            if amount is not None:
+                currency = (transaction.get("currency") or "").strip().upper()
+                sums[currency] += amount
+        return dict(sums)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+import pytest
+
+from infrastructure.gdrive.ranged_download import (
+    ChecksumMismatchError,
+    DownloadError,
+    RangedDownloader,
+)
+
+DATA = bytes(range(256)) * 4
+MD5 = hashlib.md5(DATA, usedforsecurity=False).hexdigest()
+
+
+class Source:
+    """Serves byte ranges of DATA, failing from ``fail_from`` onwards."""
+
+    def __init__(self, fail_from: int | None = None) -> None:
+        self.fail_from = fail_from
+        self.fetched: list[tuple[int, int]] = []
+
+    def __call__(self, start: int, end: int) -> bytes:
+        if self.fail_from is not None and end > self.fail_from:
+            raise ConnectionError("connection reset")
+        self.fetched.append((start, end))
+        return DATA[start:end]
+
+
+def downloader(source: Source) -> RangedDownloader:
+    return RangedDownloader(
+        source, workers=1, min_chunk=64, max_chunk=64, max_retries=0, backoff=0
+    )
+
+
+def test_download_resumes_with_only_the_missing_ranges(tmp_path):
+    output = tmp_path / "statement.pdf"
+    part = tmp_path / "statement.pdf.part"
+    state = tmp_path / "statement.pdf.part.json"
+
+    with pytest.raises(DownloadError):
+        downloader(Source(fail_from=300)).download(output, len(DATA), MD5)
+
+    assert not output.exists()
+    assert part.exists()
+    assert json.loads(state.read_text())["done"] == [[0, 256]]
+
+    source = Source()
+    downloader(source).download(output, len(DATA), MD5)
+
+    assert output.read_bytes() == DATA
+    assert min(start for start, _ in source.fetched) == 256
+    assert not part.exists()
+    assert not state.exists()
+
+
+def test_partial_download_of_another_version_is_discarded(tmp_path):
+    output = tmp_path / "statement.pdf"
+    with pytest.raises(DownloadError):
+        downloader(Source(fail_from=300)).download(output, len(DATA), "0" * 32)
+
+    source = Source()
+    downloader(source).download(output, len(DATA), MD5)
+
+    assert output.read_bytes() == DATA
+    assert min(start for start, _ in source.fetched) == 0
+
+
+def test_md5_mismatch_discards_the_download(tmp_path):
+    output = tmp_path / "statement.pdf"
+
+    with pytest.raises(ChecksumMismatchError):
+        downloader(Source()).download(output, len(DATA), "0" * 32)
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from infrastructure.llm.pydantic_models.transactions import CompactTransaction
+from infrastructure.llm.streaming import (
+    IncrementalTransactionParser,
+    JsonTransactionSink,
+)
+
+
+def entry(detail: str, date: str = "2024-03-01 09:30:00") -> dict:
+    return {
+        "transaction_date": date,
+        "transaction_detail": detail,
+        "amount": "-12.50",
+        "currency": "EUR",
+        "category": "Miscellaneous/Other",
+        "receiver_name": None,
+    }
+
+
+def feed_in_chunks(parser: IncrementalTransactionParser, text: str, size: int) -> list:
+    entries = []
+    for i in range(0, len(text), size):
+        entries.extend(parser.feed(text[i : i + size]))
+    return entries
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_entries_are_parsed_across_split_chunks(size):
+    # Braces, brackets and escaped quotes inside strings must not confuse it
+    details = ["Shop {A}", 'Pay "B" [ref]', "C \\ } end"]
+    text = json.dumps({"transactions": [entry(d) for d in details]}, indent=2)
+    parser = IncrementalTransactionParser()
+
+    entries = feed_in_chunks(parser, text, size)
+
+    assert [e.transaction_detail for e in entries] == details
+    assert parser.done
+    assert parser.count == 3
+
+
+def test_entries_are_returned_as_soon_as_they_close():
+    parser = IncrementalTransactionParser()
+    first = json.dumps(entry("a"))
+
+    assert parser.feed('{"transactions": [' + first[:-1]) == []
+    assert [e.transaction_detail for e in parser.feed("}, ")] == ["a"]
+    assert not parser.done
+
+
+def test_invalid_entry_is_rejected_without_ending_the_stream():
+    bad = entry("b", date="yesterday")
+    text = json.dumps({"transactions": [entry("a"), bad, entry("c")]})
+    parser = IncrementalTransactionParser()
+
+    entries = feed_in_chunks(parser, text, 5)
+
+    assert [e.transaction_detail for e in entries] == ["a", "c"]
+    assert parser.count == 3
+    assert [(r.index, r.data) for r in parser.rejected] == [(1, bad)]
+
+
+def test_compact_entries_are_expanded():
+    compact = {"d": "2024-03-01", "t": "a", "a": "5", "c": "EUR", "k": "0", "r": "X"}
+    parser = IncrementalTransactionParser(CompactTransaction)
+
+    (expanded,) = parser.feed(json.dumps({"transactions": [compact]}))
+
+    assert expanded.transaction_detail == "a"
+    assert expanded.category == "Income"
+    assert expanded.receiver_name == "X"
+
+
+def test_sink_writes_transactions_and_rejected_entries(tmp_path):
+    path = tmp_path / "out.json"
+    with JsonTransactionSink(path) as sink:
+        sink.write({"amount": "1"})
+        sink.write({"amount": "2"})
+        sink.rejected = [{"index": 2, "error": "bad", "data": {}}]
+
+    assert json.loads(path.read_text()) == {
+        "transactions": [{"amount": "1"}, {"amount": "2"}],
+        "rejected_transactions": [{"index": 2, "error": "bad", "data": {}}],
+    }
+
+
+def test_sink_removes_the_partial_file_on_error(tmp_path):
+    path = tmp_path / "out.json"
+    with pytest.raises(RuntimeError):
+        with JsonTransactionSink(path) as sink:
+            sink.write({"amount": "1"})
+            raise RuntimeError("stream broke")
+
+    assert not path.exists()
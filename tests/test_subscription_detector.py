@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+
+from services.subscription_detector import (
+    PriceChange,
+    SubscriptionDetector,
+    TransactionColumns,
+)
+
+
+def charges(
+    receiver: str,
+    start: date,
+    every_days: int,
+    amounts: list[str],
+    category: str = "Entertainment",
+) -> list[dict]:
+    return [
+        {
+            "transaction_date": f"{start + timedelta(days=i * every_days)} 10:00:00",
+            "receiver": receiver,
+            "amount": amount,
+            "currency": "EUR",
+            "category": category,
+        }
+        for i, amount in enumerate(amounts)
+    ]
+
+
+def detect(transactions: list[dict], **kwargs) -> dict:
+    columns = TransactionColumns.from_transactions(transactions)
+    return {c.receiver: c for c in SubscriptionDetector().detect(columns, **kwargs)}
+
+
+def test_cadence_is_picked_from_the_median_interval():
+    found = detect(
+        charges("Gym", date(2024, 1, 1), 7, ["9.00"] * 6)
+        + charges("NETFLIX.COM 8662", date(2024, 1, 5), 30, ["12.99"] * 5)
+        + charges("Insurance", date(2023, 1, 10), 91, ["120"] * 4)
+    )
+
+    assert found["Gym"].cadence == "weekly"
+    assert found["Gym"].interval_days == 7
+    assert found["NETFLIX.COM 8662"].cadence == "monthly"
+    assert found["NETFLIX.COM 8662"].amount == 12.99
+    assert found["Insurance"].cadence == "quarterly"
+    assert found["Insurance"].monthly_amount == round(120 * 30.44 / 91.31, 2)
+
+
+def test_irregular_and_income_series_are_not_recurring():
+    start = date(2024, 1, 1)
+    irregular = [
+        {**charge, "transaction_date": f"{start + timedelta(days=offset)}"}
+        for charge, offset in zip(
+            charges("Cafe", start, 1, ["4"] * 5), [0, 3, 25, 27, 70]
+        )
+    ]
+    salary = charges("Employer", start, 30, ["3000"] * 5, category="Income")
+
+    assert detect(irregular + salary) == {}
+
+
+def test_lasting_price_change_is_reported():
+    found = detect(
+        charges("Spotify", date(2024, 1, 3), 30, ["9.99"] * 3 + ["11.99"] * 3)
+    )
+
+    spotify = found["Spotify"]
+    assert spotify.amount == 11.99
+    assert spotify.price_changes == [PriceChange(date(2024, 4, 2), 9.99, 11.99)]
+
+
+def test_one_off_amount_spike_is_not_a_price_change():
+    amounts = ["9.99"] * 6 + ["19.99"] + ["9.99"] * 2
+    found = detect(charges("Spotify", date(2024, 1, 3), 30, amounts))
+
+    assert found["Spotify"].price_changes == []
+
+
+def test_new_and_inactive_charges():
+    history = charges("Old", date(2023, 1, 1), 30, ["5"] * 4) + charges(
+        "New", date(2024, 5, 1), 30, ["7"] * 3
+    )
+
+    found = detect(history, as_of=date(2024, 7, 1))
+
+    assert found["New"].is_new and found["New"].active
+    assert not found["Old"].is_new and not found["Old"].active
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from infrastructure.llm.pydantic_models.transactions import (
+    CompactTransactionHistory,
+    TransactionHistory,
+)
+from infrastructure.llm.validation import (
+    ResponseValidationError,
+    validate_response_json,
+)
+
+
+def entry(detail: str, date: str = "2024-03-01 09:30:00") -> dict:
+    return {
+        "transaction_date": date,
+        "transaction_detail": detail,
+        "amount": "-12.50",
+        "currency": "EUR",
+        "category": "Miscellaneous/Other",
+        "receiver_name": None,
+    }
+
+
+def test_valid_response_has_no_rejected_entries():
+    raw = json.dumps({"transactions": [entry("a"), entry("b")]})
+
+    history = validate_response_json(raw, TransactionHistory)
+
+    assert [t.transaction_detail for t in history.transactions] == ["a", "b"]
+    assert history._rejected == []
+
+
+def test_invalid_entries_are_salvaged_into_rejected():
+    bad = entry("b", date="yesterday")
+    raw = json.dumps({"transactions": [entry("a"), bad, entry("c")]})
+
+    history = validate_response_json(raw, TransactionHistory, max_rejected_ratio=0.5)
+
+    assert [t.transaction_detail for t in history.transactions] == ["a", "c"]
+    assert len(history._rejected) == 1
+    rejected = history._rejected[0]
+    assert rejected["index"] == 1
+    assert rejected["error"].startswith("transaction_date:")
+    assert rejected["data"] == bad
+
+
+def test_too_many_invalid_entries_reject_the_response():
+    raw = json.dumps({"transactions": [entry("a"), entry("b", date="yesterday")]})
+
+    with pytest.raises(ResponseValidationError) as excinfo:
+        validate_response_json(raw, TransactionHistory)
+
+    assert [r.index for r in excinfo.value.rejected] == [1]
+
+
+def test_compact_entries_are_salvaged_with_their_wire_model():
+    good = {"d": "2024-03-01", "t": "a", "a": "-1", "c": "EUR", "k": "0", "r": None}
+    bad = {**good, "k": "X"}
+    raw = json.dumps({"transactions": [good, bad, good, good]})
+
+    history = validate_response_json(
+        raw, CompactTransactionHistory, max_rejected_ratio=0.25
+    )
+
+    assert len(history.transactions) == 3
+    assert history._rejected[0]["index"] == 1
+    assert history._rejected[0]["error"].startswith("k:")
+
+
+def test_malformed_json_is_rejected():
+    with pytest.raises(ResponseValidationError):
+        validate_response_json('{"transactions": [', TransactionHistory)
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pytest
+
+from infrastructure.gdrive.drive_gateway import DriveFile
+from infrastructure.storage import work_queue
+from infrastructure.storage.work_queue import WorkQueue
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(work_queue, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock) -> WorkQueue:
+    queue = WorkQueue(tmp_path / "queue.sqlite3", lease_seconds=60, max_attempts=2)
+    queue.enqueue([DriveFile("f1", "a.pdf", "application/pdf", 10, md5_checksum="x")])
+    yield queue
+    queue.close()
+
+
+def test_leased_file_is_not_claimed_again(queue, clock):
+    assert queue.claim("w1").id == "f1"
+    clock.now += 59
+    assert queue.claim("w2") is None
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue, clock):
+    assert queue.claim("w1").id == "f1"
+    clock.now += 61
+
+    reclaimed = queue.claim("w2")
+
+    assert reclaimed.id == "f1"
+    assert reclaimed.md5_checksum == "x"
+    # The first worker lost its lease and can no longer touch the file
+    assert not queue.heartbeat("f1", "w1")
+    assert not queue.complete("f1", "w1")
+    assert queue.complete("f1", "w2")
+    assert queue.stats()["done"] == 1
+
+
+def test_heartbeat_extends_the_lease(queue, clock):
+    queue.claim("w1")
+    clock.now += 50
+    assert queue.heartbeat("f1", "w1")
+    clock.now += 50
+    assert queue.claim("w2") is None
+
+
+def test_file_fails_after_max_attempts_of_expired_leases(queue, clock):
+    for owner in ("w1", "w2"):
+        assert queue.claim(owner).id == "f1"
+        clock.now += 61
+
+    assert queue.claim("w3") is None
+    assert queue.stats() == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
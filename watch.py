@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Long-running watch mode: keep the Drive client, PDF extractor and LLM
+provider warm and process new statements shortly after they are uploaded.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from config import app_settings
+from infrastructure.gdrive.drive_gateway import DriveFile
+from infrastructure.llm.langfuse_wrapper import LangfuseWrapper
+from main import StatementProcessor
+
+logger = logging.getLogger(__name__)
+
+PDF_MIME_TYPE = "application/pdf"
+
+
+class StatementWatcher:
+    """Poll the target folder and process statements not seen before.
+
+    The folder is either listed on every poll or, with
+    ``use_changes_feed``, followed through the Drive changes feed so a poll
+    only costs one small request. Processed files and the feed position are
+    kept in a JSON state file so a restart does not redo finished work.
+    Failed files are retried on later polls up to ``max_attempts`` times;
+    a file whose size changes is processed again.
+    """
+
+    def __init__(
+        self,
+        processor: StatementProcessor,
+        *,
+        interval: float = 30.0,
+        use_changes_feed: bool = False,
+        state_path: Path | None = None,
+        max_attempts: int = 3,
+    ) -> None:
+        self.processor = processor
+        self.interval = interval
+        self.use_changes_feed = use_changes_feed
+        self.state_path = state_path or processor.output_dir / "watch_state.json"
+        self.max_attempts = max_attempts
+        self.state = self._load_state()
+        self.folder: DriveFile | None = None
+        self._stop = threading.Event()
+
+    def _load_state(self) -> dict[str, Any]:
+        if self.state_path.exists():
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        return {"page_token": None, "files": {}}
+
+    def _save_state(self) -> None:
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.state_path)
+
+    def is_due(self, file: DriveFile) -> bool:
+        """Check whether a file still needs processing."""
+        entry = self.state["files"].get(file.id)
+        if entry is None or entry["size"] != file.size:
+            return True
+        return entry["status"] == "failed" and entry["attempts"] < self.max_attempts
+
+    def _pending_retries(self) -> list[DriveFile]:
+        return [
+            DriveFile(file_id, entry["name"], PDF_MIME_TYPE, entry["size"])
+            for file_id, entry in self.state["files"].items()
+            if entry["status"] == "failed" and entry["attempts"] < self.max_attempts
+        ]
+
+    def find_new_files(self) -> list[DriveFile]:
+        """Return the files to process in this poll."""
+        assert self.folder is not None  # nosec B101
+        page_token = self.state.get("page_token")
+
+        if not self.use_changes_feed or page_token is None:
+            if self.use_changes_feed:
+                # Take the token before listing so uploads made while the
+                # folder is being listed show up in the next poll
+                self.state["page_token"] = (
+                    self.processor.drive_gateway.get_start_page_token()
+                )
+            files = self.processor.list_pdf_files(self.folder)
+            return [file for file in files if self.is_due(file)]
+
+        changed, self.state["page_token"] = self.processor.drive_gateway.list_changes(
+            page_token
+        )
+        # The same file may change several times while it is uploaded
+        latest = {
+            file.id: file
+            for file in changed
+            if file.mime_type == PDF_MIME_TYPE
+            and not file.trashed
+            and self.folder.id in file.parents
+        }
+        for file in self._pending_retries():
+            latest.setdefault(file.id, file)
+        return [file for file in latest.values() if self.is_due(file)]
+
+    def poll_once(self) -> dict | None:
+        """Process any new statements; return the summary if there were any."""
+        files = self.find_new_files()
+        if not files:
+            self._save_state()
+            return None
+
+        logger.info(f"🆕 Found {len(files)} new statement(s)")
+        summary = self.processor.process_files(files)
+        for file, result in zip(files, summary["results"]):
+            previous = self.state["files"].get(file.id)
+            # A new version of the file starts with a fresh attempt count
+            attempts = (
+                previous["attempts"]
+                if previous and previous["size"] == file.size
+                else 0
+            )
+            self.state["files"][file.id] = {
+                "name": file.name,
+                "size": file.size,
+                "status": "done" if result["success"] else "failed",
+                "attempts": attempts + 1,
+            }
+        self._save_state()
+        self.processor.print_summary(summary)
+        LangfuseWrapper.flush()
+        return summary
+
+    def stop(self) -> None:
+        """Ask the watch loop to exit after the current poll."""
+        self._stop.set()
+
+    def run(self) -> None:
+        """Poll until stopped."""
+        self.folder = self.processor.find_target_folder()
+        mode = "changes feed" if self.use_changes_feed else "folder listing"
+        logger.info(f"👀 Watching '{self.folder.name}' every {self.interval}s ({mode})")
+
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.poll_once()
+            except Exception as e:
+                # Keep the daemon alive through transient Drive/network errors
+                logger.error(f"❌ Poll failed: {e}")
+            elapsed = time.monotonic() - started
+            self._stop.wait(max(0.0, self.interval - elapsed))
+
+        logger.info("👋 Watcher stopped")
+
+
+def main() -> None:
+    """Start the watcher and run until SIGINT/SIGTERM."""
+    processor = StatementProcessor()
+    # Load models once, before the first statement arrives
+    processor.pdf_extractor.warm_up()
+
+    watcher = StatementWatcher(
+        processor,
+        interval=app_settings.watch_interval,
+        use_changes_feed=app_settings.watch_use_changes_feed,
+        state_path=(
+            Path(app_settings.watch_state_path)
+            if app_settings.watch_state_path
+            else None
+        ),
+        max_attempts=app_settings.watch_max_attempts,
+    )
+
+    def handle_signal(signum: int, frame: Any) -> None:
+        logger.info("🛑 Shutdown requested, finishing current poll...")
+        watcher.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    try:
+        watcher.run()
+    finally:
+        LangfuseWrapper.flush()
+
+
+if __name__ == "__main__":
+    main()